@@ -1,20 +1,74 @@
 from django.contrib import admin
 from django.contrib.auth import admin as user_admin
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 
-from .models import Category, Location, Post
+from blogicum.write_queue import run_write_view
+
+from .exports import CONTENT_TYPES, CSV, JSONL, stream_export
+from .models import Category, Comment, Location, Post
 
 
 admin.site.empty_value_display = 'Пусто'
 
 
+class ExportActionsMixin:
+    """Действия «Выгрузить в CSV/JSON Lines» для выбранных строк.
+
+    Файл отдаётся потоком: строки читаются из базы пачками, а не
+    загружаются в память все сразу.
+    """
+
+    export_name = None
+    actions = ['export_csv', 'export_jsonl']
+
+    def export(self, queryset, export_format):
+        filename = (
+            f'{self.export_name}-{timezone.now():%Y%m%d-%H%M%S}.'
+            f'{export_format}'
+        )
+        response = StreamingHttpResponse(
+            stream_export(self.export_name, export_format, queryset),
+            content_type=CONTENT_TYPES[export_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename={filename}'
+        return response
+
+    @admin.action(description='Выгрузить в CSV')
+    def export_csv(self, request, queryset):
+        return self.export(queryset, CSV)
+
+    @admin.action(description='Выгрузить в JSON Lines')
+    def export_jsonl(self, request, queryset):
+        return self.export(queryset, JSONL)
+
+
+class SerializedChangelistMixin:
+    """Сохраняет правки list_editable через очередь записи.
+
+    Отправка формы списка целиком выполняется в потоке записи
+    (blogicum.write_queue), если он включён.
+    """
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method == 'POST' and '_save' in request.POST:
+            return run_write_view(
+                super().changelist_view, request, extra_context
+            )
+        return super().changelist_view(request, extra_context)
+
+
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(SerializedChangelistMixin, ExportActionsMixin,
+                admin.ModelAdmin):
+    export_name = 'posts'
     list_display = [
         'title',
         'is_published',
         'created_at',
         'pub_date',
-        'category'
+        'category',
+        'comment_count'
     ]
     list_editable = [
         'is_published',
@@ -28,6 +82,19 @@ class PostAdmin(admin.ModelAdmin):
     ]
 
 
+@admin.register(Comment)
+class CommentAdmin(ExportActionsMixin, admin.ModelAdmin):
+    export_name = 'comments'
+    list_display = [
+        'text',
+        'post',
+        'author',
+        'created_at'
+    ]
+    list_select_related = ['post', 'author']
+    raw_id_fields = ['post', 'author']
+
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = [
@@ -0,0 +1,255 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from http import HTTPStatus
+
+from django.core.files.storage import default_storage
+from django.db.models import Case, When
+from django.http import Http404, HttpResponse
+from django.views import View
+
+from blogicum.conditional import ConditionalGetMixin
+
+from .caching import (FEED, GENERATION, SITE, category_scope, page_objects,
+                      version_info)
+from .models import Category, Comment, Post
+from .paginators import CursorPaginator, InvalidCursor
+from .views import (COMMENTS_ORDERING, COMMENTS_PAGINATE_VALUE,
+                    PAGINATE_VALUE, POSTS_ORDERING, ScheduledPublicationMixin)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson не установлен
+    orjson = None
+
+API_CONTENT_TYPE = 'application/json'
+FIELDS_PARAM = 'fields'
+CURSOR_PARAM = 'cursor'
+
+# Поля ответа и выражения для values(): клиент выбирает нужные через
+# ?fields=, и в SELECT попадают только они (и ключи курсора).
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': Case(When(location__is_published=True,
+                          then='location__name')),
+    'image': 'image',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created_at': 'created_at',
+}
+
+
+def json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} не сериализуется в JSON')
+
+
+def dumps(data):
+    """Кодирует ответ в JSON: orjson, если установлен, иначе stdlib.
+
+    Оба пути дают одинаковый результат для данных API: даты в ISO 8601
+    с микросекундами и часовым поясом, UTF-8 без экранирования.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=json_default)
+    return json.dumps(
+        data, default=json_default, ensure_ascii=False,
+        separators=(',', ':')
+    ).encode()
+
+
+class ApiError(Exception):
+
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def json_response(data, status=HTTPStatus.OK):
+    return HttpResponse(
+        dumps(data), status=status, content_type=API_CONTENT_TYPE
+    )
+
+
+class ApiView(ScheduledPublicationMixin, ConditionalGetMixin, View):
+    """Основа JSON API только для чтения.
+
+    Ответы одинаковы для всех клиентов, поэтому ETag не зависит от
+    пользователя, а общим кэшам разрешено хранить копию с обязательной
+    сверкой. ETag строится из тех же версий в кэше, что и у HTML
+    страниц, плюс адреса запроса с его ?fields= и курсором.
+    """
+
+    http_method_names = ['get', 'head', 'options']
+    vary_on_user = False
+    cache_control = {'public': True, 'no_cache': True}
+    api_fields = None
+
+    def get_versioned_objects(self):
+        raise NotImplementedError
+
+    def get_validators(self):
+        version, changed_at = version_info(*self.get_versioned_objects())
+        return (version, self.request.get_full_path()), changed_at
+
+    def get_field_names(self):
+        requested = self.request.GET.get(FIELDS_PARAM)
+        if not requested:
+            return list(self.api_fields)
+        names = list(dict.fromkeys(
+            name.strip() for name in requested.split(',') if name.strip()
+        ))
+        unknown = [name for name in names if name not in self.api_fields]
+        if unknown or not names:
+            raise ApiError(
+                HTTPStatus.BAD_REQUEST,
+                f'Неизвестные поля: {", ".join(unknown)}. Доступны: '
+                f'{", ".join(self.api_fields)}.'
+            )
+        return names
+
+    def project(self, queryset, names, required=()):
+        """values() только с выбранными полями и ключами курсора."""
+        paths = {}
+        expressions = {}
+        for name in dict.fromkeys([*names, *required]):
+            lookup = self.api_fields.get(name, name)
+            if isinstance(lookup, str):
+                paths[name] = lookup
+            else:
+                expressions[f'api_{name}'] = lookup
+        rows = queryset.values(*paths.values(), **expressions)
+        return rows, paths
+
+    def serialize(self, row, names, paths):
+        data = {}
+        for name in names:
+            key = paths.get(name, f'api_{name}')
+            data[name] = row[key]
+        if 'image' in data:
+            data['image'] = (
+                default_storage.url(data['image']) if data['image'] else None
+            )
+        return data
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return json_response({'detail': error.detail}, error.status)
+        except Http404:
+            return json_response(
+                {'detail': 'Не найдено.'}, HTTPStatus.NOT_FOUND
+            )
+
+
+class ApiListView(ApiView):
+    ordering = None
+    paginate_by = None
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def page_url(self, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query[CURSOR_PARAM] = cursor
+        return self.request.build_absolute_uri(
+            f'{self.request.path}?{query.urlencode()}'
+        )
+
+    def get(self, request, *args, **kwargs):
+        names = self.get_field_names()
+        rows, paths = self.project(
+            self.get_queryset(), names,
+            [name.lstrip('-') for name in self.ordering]
+        )
+        paginator = CursorPaginator(rows, self.paginate_by, self.ordering)
+        try:
+            page = paginator.page(request.GET.get(CURSOR_PARAM))
+        except InvalidCursor as error:
+            raise ApiError(HTTPStatus.BAD_REQUEST, str(error))
+        return json_response({
+            'results': [
+                self.serialize(row, names, paths) for row in page
+            ],
+            'next': self.page_url(page.next_cursor),
+            'previous': self.page_url(page.previous_cursor),
+        })
+
+
+def visible_posts():
+    return Post.objects.filter(
+        is_visible=True,
+        category__is_published=True
+    )
+
+
+class PostListApiView(ApiListView):
+    api_fields = POST_FIELDS
+    ordering = POSTS_ORDERING
+    paginate_by = PAGINATE_VALUE
+
+    def get_versioned_objects(self):
+        return page_objects((SITE, FEED))
+
+    def get_queryset(self):
+        return visible_posts()
+
+
+class CategoryPostsApiView(PostListApiView):
+
+    def get_versioned_objects(self):
+        return page_objects((SITE, category_scope(self.kwargs['slug'])))
+
+    def get_queryset(self):
+        category = Category.objects.filter(
+            slug=self.kwargs['slug'], is_published=True
+        ).values_list('id', flat=True).first()
+        if category is None:
+            raise Http404
+        return Post.objects.filter(is_visible=True, category_id=category)
+
+
+class PostApiView(ApiView):
+    api_fields = POST_FIELDS
+
+    def get_versioned_objects(self):
+        return (('post', self.kwargs['pk']), (GENERATION, SITE))
+
+    def get(self, request, *args, pk, **kwargs):
+        names = self.get_field_names()
+        rows, paths = self.project(visible_posts().filter(pk=pk), names)
+        row = rows.first()
+        if row is None:
+            raise Http404
+        return json_response(self.serialize(row, names, paths))
+
+
+class CommentListApiView(ApiListView):
+    api_fields = COMMENT_FIELDS
+    ordering = COMMENTS_ORDERING
+    paginate_by = COMMENTS_PAGINATE_VALUE
+
+    def get_versioned_objects(self):
+        return (('comments', self.kwargs['pk']), (GENERATION, SITE))
+
+    def get_queryset(self):
+        if not visible_posts().filter(pk=self.kwargs['pk']).exists():
+            raise Http404
+        return Comment.objects.filter(post_id=self.kwargs['pk'])
@@ -1,7 +1,22 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from blogicum import checks  # noqa: F401
+        from blogicum.query_budget import (install_query_counter,
+                                           query_counting_enabled)
+        from blogicum.sqlite import configure_connection
+
+        from . import signals  # noqa: F401
+        from .search import install_search_triggers
+        post_migrate.connect(install_search_triggers, sender=self)
+        connection_created.connect(configure_connection)
+        if query_counting_enabled():
+            connection_created.connect(install_query_counter)
@@ -0,0 +1,24 @@
+from django.urls import path
+
+from . import async_views
+from .urls import app_name, urlpatterns as sync_urlpatterns  # noqa: F401
+
+# Адреса, которые через ASGI обслуживают асинхронные view; остальные
+# остаются синхронными, как в blog.urls.
+ASYNC_VIEWS = {
+    'index': async_views.AsyncPostListView,
+    'category_posts': async_views.AsyncCategoryPostsView,
+    'profile': async_views.AsyncUserProfileView,
+    'post_detail': async_views.AsyncPostDetailView,
+    'comments': async_views.AsyncPostCommentsView,
+}
+
+urlpatterns = [
+    path(
+        str(pattern.pattern),
+        ASYNC_VIEWS[pattern.name].as_view(),
+        name=pattern.name
+    )
+    if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
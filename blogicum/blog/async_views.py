@@ -0,0 +1,103 @@
+from blogicum.asynchronous import AsyncViewMixin, run_orm
+
+from .views import (CategoryPostsView, PostCommentsView, PostDetailView,
+                    PostListView, UserProfileView, paginate_comments)
+
+
+class AsyncPostListMixin(AsyncViewMixin):
+    """Асинхронная лента: страница публикаций и кэш страниц для анонимов.
+
+    Отложенные публикации проверяются одновременно с загрузкой
+    пользователя, а страница публикаций — одновременно с другими
+    объектами страницы (категорией, автором). Страницу для кэша анонимов
+    владелец блокировки собирает последовательно в одном потоке пула:
+    так ожидающие её запросы не занимают потоки, нужные для её сборки.
+    """
+
+    loaded_page = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        return self.page_number_redirect() or await super().dispatch(
+            request, *args, **kwargs
+        )
+
+    def get_preparations(self):
+        return [*super().get_preparations(), self.publish_scheduled]
+
+    def get_page_queryset(self):
+        return self.get_queryset()
+
+    def get_loaders(self):
+        return {'page': self.load_page}
+
+    def load_page(self):
+        return self.paginate_queryset(
+            self.get_page_queryset(), self.get_paginate_by(None)
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.loaded_page is not None:
+            return self.loaded_page
+        return super().paginate_queryset(queryset, page_size)
+
+    def render_loaded(self, loaded):
+        self.loaded_page = loaded['page']
+        self.object_list = self.get_page_queryset()
+        response = self.render_to_response(self.get_context_data())
+        response.render()
+        return response
+
+    async def render(self):
+        if self.request.method == 'GET' and (
+            not self.request.user.is_authenticated
+        ):
+            return await run_orm(
+                self.get_cached_response, self.render_sequentially
+            )
+        return await super().render()
+
+
+class AsyncPostListView(AsyncPostListMixin, PostListView):
+    pass
+
+
+class AsyncCategoryPostsView(AsyncPostListMixin, CategoryPostsView):
+
+    def get_page_queryset(self):
+        return self.get_posts()
+
+    def get_loaders(self):
+        return {**super().get_loaders(), 'category': self.get_category}
+
+
+class AsyncUserProfileView(AsyncPostListMixin, UserProfileView):
+
+    def get_page_queryset(self):
+        return self.get_posts()
+
+    def get_loaders(self):
+        return {**super().get_loaders(), 'author': self.get_author}
+
+
+class AsyncPostDetailView(AsyncViewMixin, PostDetailView):
+    """Публикация и первая страница комментариев загружаются одновременно."""
+
+    def get_loaders(self):
+        return {
+            'post': self.get_object,
+            'comments': lambda: paginate_comments(
+                self.request, self.kwargs['pk']
+            ),
+        }
+
+    def render_loaded(self, loaded):
+        self.object = loaded['post']
+        response = self.render_to_response(self.get_context_data(
+            object=self.object, comments=loaded['comments']
+        ))
+        response.render()
+        return response
+
+
+class AsyncPostCommentsView(AsyncPostDetailView):
+    template_name = PostCommentsView.template_name
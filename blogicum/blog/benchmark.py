@@ -0,0 +1,490 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from itertools import cycle
+from http import HTTPStatus
+from http.cookies import SimpleCookie
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPErrorProcessor, Request, build_opener
+
+from django.conf import settings
+from django.core.servers.basehttp import (ThreadedWSGIServer,
+                                          WSGIRequestHandler,
+                                          get_internal_wsgi_application)
+from django.db import connections
+from django.db.models import F
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from blogicum.query_budget import QUERY_BUDGETS, QueryCounter
+
+from .models import Category, Comment, Location, Post, User
+
+DEFAULT_REQUESTS = 50
+DEFAULT_WARMUP = 5
+PERCENTILES = (50, 95, 99)
+ANONYMOUS, AUTHOR = 'anonymous', 'author'
+USERS = (ANONYMOUS, AUTHOR)
+# Адрес вне INTERNAL_IPS: иначе при DEBUG в каждую страницу встраивается
+# панель django-debug-toolbar, и замер показывает её, а не страницу.
+CLIENT_ADDRESS = '192.0.2.1'
+BENCHMARK_COMMENT = 'Комментарий нагрузочного замера.'
+DEFAULT_READERS = 8
+DEFAULT_WRITERS = 2
+DEFAULT_DURATION = 10.0
+# Страницы, которые читатели запрашивают по кругу во время записи.
+READ_VIEWS = (
+    'blog:index',
+    'blog:category_posts',
+    'blog:post_detail',
+    'blog:comments',
+    'blog:api_posts',
+    'blog:search',
+)
+WRITE_VIEW = 'blog:add_comment'
+DEFAULT_CONCURRENCY = 16
+# Страницы с асинхронными вариантами: их сравнивает run_throughput.
+ASYNC_VIEWS = (
+    'blog:index',
+    'blog:category_posts',
+    'blog:profile',
+    'blog:post_detail',
+    'blog:comments',
+    'pages:about',
+    'pages:rules',
+)
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def percentile(values, share):
+    """Значение, не больше которого share процентов values."""
+    ordered = sorted(values)
+    index = max(0, -(-len(ordered) * share // 100) - 1)
+    return ordered[index]
+
+
+def sample_comment():
+    """Комментарий автора к собственной видимой публикации.
+
+    От его имени открываются формы правки публикации и комментария.
+    Берётся публикация с наибольшим числом комментариев — самые
+    тяжёлые страницы из доступных.
+    """
+    comment = Comment.objects.filter(
+        post__is_visible=True,
+        post__category__is_published=True,
+        author=F('post__author'),
+    ).select_related(
+        'post__author', 'post__category'
+    ).order_by('-post__comment_count', 'pk').first()
+    if comment is None:
+        raise BenchmarkError(
+            'В базе нет видимой публикации с комментарием её автора; '
+            'заполните базу командой generate_data.'
+        )
+    return comment
+
+
+def targets(comment):
+    """Один запрос на каждый адрес приложения blog.
+
+    Список: (имя адреса, метод, путь, данные формы). Единственный
+    запрос с записью — POST add_comment: каждый его повтор добавляет
+    комментарий.
+    """
+    post = comment.post
+    slug, username = post.category.slug, post.author.username
+    post_kw = {'pk': post.pk}
+    comment_kw = {'pk': post.pk, 'comment_id': comment.pk}
+    pages = [
+        ('blog:index', (), {}),
+        ('blog:category_posts', (slug,), {}),
+        ('blog:profile', (username,), {}),
+        ('blog:edit_profile', (username,), {}),
+        ('blog:create_post', (), {}),
+        ('blog:post_detail', (), post_kw),
+        ('blog:comments', (), post_kw),
+        ('blog:edit_post', (), post_kw),
+        ('blog:delete_post', (), post_kw),
+        ('blog:edit_comment', (), comment_kw),
+        ('blog:delete_comment', (), comment_kw),
+        ('blog:feed', ('rss',), {}),
+        ('blog:category_feed', (slug, 'atom'), {}),
+        ('blog:author_feed', (username, 'rss'), {}),
+        ('blog:api_posts', (), {}),
+        ('blog:api_post', (), post_kw),
+        ('blog:api_comments', (), post_kw),
+        ('blog:api_category_posts', (slug,), {}),
+        ('blog:sitemap_index', (), {}),
+        ('blog:sitemap_shard', ('posts', 0), {}),
+    ]
+    requests = [
+        (name, 'get', reverse(name, args=args, kwargs=kwargs), None)
+        for name, args, kwargs in pages
+    ]
+    requests += [
+        ('blog:search', 'get', reverse('blog:search'),
+         {'q': post.title}),
+        ('blog:add_comment', 'post', reverse('blog:add_comment',
+                                             kwargs=post_kw),
+         {'text': BENCHMARK_COMMENT}),
+    ]
+    return requests
+
+
+class ClientTransport:
+    """Запросы через тестовый клиент Django в этом же процессе.
+
+    SQL-запросы считаются напрямую, обёрткой execute_wrapper, включая
+    запросы при отдаче тела потоковых ответов.
+    """
+
+    name = 'client'
+
+    def __init__(self, user=None):
+        self.client = Client(
+            HTTP_HOST=settings.ALLOWED_HOSTS[0], REMOTE_ADDR=CLIENT_ADDRESS
+        )
+        if user is not None:
+            self.client.force_login(user)
+
+    def request(self, method, url, data):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = getattr(self.client, method)(url, data or {})
+            if response.streaming:
+                body = b''.join(response.streaming_content)
+            else:
+                body = response.content
+        elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, counter.count, len(body)
+
+
+class AsyncClientTransport:
+    """Запросы через AsyncClient: приложение работает как под ASGI.
+
+    Асинхронные view выполняют SQL в потоках пула, поэтому запросы
+    считаются по заголовку X-Query-Count от QueryBudgetMiddleware.
+    """
+
+    name = 'asgi'
+
+    def __init__(self, user=None):
+        # Заголовок Host AsyncClient в Django 3.2 всегда ставит сам
+        # (testserver, см. async_load), адрес клиента берётся из scope.
+        self.client = AsyncClient(client=[CLIENT_ADDRESS, 0])
+        if user is not None:
+            self.client.force_login(user)
+
+    async def request(self, method, url, data):
+        started = time.perf_counter()
+        response = await getattr(self.client, method)(url, data or {})
+        elapsed = time.perf_counter() - started
+        queries = response.get('X-Query-Count')
+        return (response.status_code, elapsed,
+                int(queries) if queries else None, len(response.content))
+
+
+class KeepRedirects(HTTPErrorProcessor):
+    """Отдаёт ответы 3xx/4xx/5xx как есть, без перехода и исключения."""
+
+    def http_response(self, request, response):
+        return response
+
+    https_response = http_response
+
+
+class ServerTransport:
+    """Запросы по HTTP к запущенному серверу.
+
+    Число SQL-запросов берётся из заголовка X-Query-Count, который
+    ставит QueryBudgetMiddleware при DEBUG; без него оно неизвестно.
+    Пользователь входит по cookie сессии, созданной в этой же базе.
+    """
+
+    name = 'server'
+
+    def __init__(self, base_url, user=None):
+        self.base_url = base_url.rstrip('/')
+        self.opener = build_opener(KeepRedirects)
+        self.csrf_token = get_random_string(64)
+        cookies = SimpleCookie()
+        cookies[settings.CSRF_COOKIE_NAME] = self.csrf_token
+        if user is not None:
+            client = Client()
+            client.force_login(user)
+            cookies[settings.SESSION_COOKIE_NAME] = client.cookies[
+                settings.SESSION_COOKIE_NAME
+            ].value
+        self.cookie = '; '.join(
+            f'{key}={morsel.value}' for key, morsel in cookies.items()
+        )
+
+    def request(self, method, url, data):
+        body = urlencode(data or {}).encode()
+        if method == 'get' and data:
+            url, body = f'{url}?{body.decode()}', None
+        elif method == 'get':
+            body = None
+        request = Request(
+            self.base_url + url, data=body, method=method.upper(),
+            headers={'Cookie': self.cookie, 'X-CSRFToken': self.csrf_token},
+        )
+        started = time.perf_counter()
+        try:
+            with self.opener.open(request) as response:
+                status, headers, content = (
+                    response.status, response.headers, response.read()
+                )
+        except HTTPError as error:
+            status, headers, content = error.code, error.headers, error.read()
+        elapsed = time.perf_counter() - started
+        queries = headers.get('X-Query-Count')
+        return (status, elapsed, int(queries) if queries else None,
+                len(content))
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def local_server():
+    """Многопоточный WSGI-сервер проекта на свободном порту 127.0.0.1."""
+    server = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler)
+    server.set_app(get_internal_wsgi_application())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}'
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def latency_summary(samples):
+    statuses = Counter(status for status, *_ in samples)
+    milliseconds = [elapsed * 1000 for _, elapsed, _, _ in samples]
+    summary = {
+        'status': statuses.most_common(1)[0][0],
+        'statuses': {str(status): count for status, count in statuses.items()},
+        'requests': len(samples),
+        'mean_ms': round(sum(milliseconds) / len(milliseconds), 3),
+    }
+    for share in PERCENTILES:
+        summary[f'p{share}_ms'] = round(percentile(milliseconds, share), 3)
+    return summary
+
+
+def summarize(name, method, url, samples):
+    queries = [count for _, _, count, _ in samples if count is not None]
+    return {
+        'method': method.upper(),
+        'url': url,
+        **latency_summary(samples),
+        'queries': max(queries) if queries else None,
+        'query_budget': QUERY_BUDGETS.get(name),
+        'bytes': round(sum(size for *_, size in samples) / len(samples)),
+    }
+
+
+def run_benchmark(transport, requests, repeat=DEFAULT_REQUESTS,
+                  warmup=DEFAULT_WARMUP, progress=None):
+    """Прогоняет каждый запрос warmup + repeat раз; сводка по адресам."""
+    results = {}
+    for name, method, url, data in requests:
+        for _ in range(warmup):
+            transport.request(method, url, data)
+        samples = [
+            transport.request(method, url, data) for _ in range(repeat)
+        ]
+        results[name] = summarize(name, method, url, samples)
+        if progress:
+            progress(name, results[name])
+    return results
+
+
+def describe_run(transport, user, repeat, warmup):
+    return {
+        'started_at': timezone.now().isoformat(),
+        'transport': transport.name,
+        'user': user,
+        'debug': settings.DEBUG,
+        'requests': repeat,
+        'warmup': warmup,
+        'rows': {
+            model._meta.model_name: model.objects.count()
+            for model in (User, Category, Location, Post, Comment)
+        },
+    }
+
+
+def compare(old, new):
+    """Разница p50/p95/p99 и числа запросов между двумя прогонами."""
+    changes = {}
+    for name, result in new['views'].items():
+        before = old['views'].get(name)
+        if before is None:
+            continue
+        changes[name] = {
+            key: (before[key], result[key])
+            for key in (*(f'p{share}_ms' for share in PERCENTILES),
+                        'queries', 'bytes')
+        }
+    return changes
+
+
+def load_summary(samples, duration):
+    if not samples:
+        return {'requests': 0, 'per_second': 0.0, 'errors': 0}
+    return {
+        **latency_summary(samples),
+        'per_second': round(len(samples) / duration, 1),
+        'errors': sum(
+            1 for status, *_ in samples
+            if status >= HTTPStatus.INTERNAL_SERVER_ERROR
+        ),
+    }
+
+
+def hammer(transport, requests, deadline, samples):
+    for _, method, url, data in cycle(requests):
+        if time.perf_counter() >= deadline:
+            return
+        samples.append(transport.request(method, url, data))
+
+
+def run_concurrent(base_url, requests, author, readers=DEFAULT_READERS,
+                   writers=DEFAULT_WRITERS, duration=DEFAULT_DURATION):
+    """Чтение страниц, пока параллельно пишутся комментарии.
+
+    readers потоков анонимно читают READ_VIEWS, writers потоков от
+    имени author отправляют комментарии — все одновременно, duration
+    секунд, по HTTP к серверу base_url. Сводка по чтению и записи:
+    запросов в секунду, задержки и ответы 5xx (в том числе «database
+    is locked»).
+    """
+    reads = [target for target in requests if target[0] in READ_VIEWS]
+    writes = [target for target in requests if target[0] == WRITE_VIEW]
+    read_samples, write_samples = [], []
+    workers = [
+        (ServerTransport(base_url), reads, read_samples)
+        for _ in range(readers)
+    ] + [
+        (ServerTransport(base_url, author), writes, write_samples)
+        for _ in range(writers)
+    ]
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=hammer, args=(transport, plan, deadline, samples)
+        )
+        for transport, plan, samples in workers
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        'reads': load_summary(read_samples, duration),
+        'writes': load_summary(write_samples, duration),
+    }
+
+
+def async_targets(comment):
+    """Запросы к страницам ASYNC_VIEWS; все только читают."""
+    requests = [
+        target for target in targets(comment) if target[0] in ASYNC_VIEWS
+    ]
+    requests += [
+        (name, 'get', reverse(name), None)
+        for name in ASYNC_VIEWS if name.startswith('pages:')
+    ]
+    return requests
+
+
+def threaded_load(transports, requests, duration):
+    samples = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=hammer, args=(transport, requests, deadline, samples)
+        )
+        for transport in transports
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return load_summary(samples, duration)
+
+
+async def async_hammer(transport, requests, deadline, samples):
+    for _, method, url, data in cycle(requests):
+        if time.perf_counter() >= deadline:
+            return
+        samples.append(await transport.request(method, url, data))
+
+
+def async_load(transports, requests, duration):
+    samples = []
+
+    async def run():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            async_hammer(transport, requests, deadline, samples)
+            for transport in transports
+        ))
+
+    with override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+    ):
+        asyncio.run(run())
+    return load_summary(samples, duration)
+
+
+def run_throughput(requests, user=None, concurrency=DEFAULT_CONCURRENCY,
+                   duration=DEFAULT_DURATION, wsgi_url=None, asgi_url=None):
+    """Пропускная способность одних и тех же страниц под WSGI и ASGI.
+
+    concurrency клиентов duration секунд запрашивают requests по кругу.
+    Без адресов WSGI — это потоки с тестовым Client, ASGI — задачи
+    одного цикла событий с AsyncClient, всё в этом процессе. С
+    wsgi_url/asgi_url — потоки с HTTP-запросами к запущенным серверам
+    (например, gunicorn и uvicorn).
+    """
+    if wsgi_url:
+        wsgi = threaded_load(
+            [ServerTransport(wsgi_url, user) for _ in range(concurrency)],
+            requests, duration
+        )
+    else:
+        wsgi = threaded_load(
+            [ClientTransport(user) for _ in range(concurrency)],
+            requests, duration
+        )
+    if asgi_url:
+        asgi = threaded_load(
+            [ServerTransport(asgi_url, user) for _ in range(concurrency)],
+            requests, duration
+        )
+    else:
+        asgi = async_load(
+            [AsyncClientTransport(user) for _ in range(concurrency)],
+            requests, duration
+        )
+    return {'wsgi': wsgi, 'asgi': asgi}
@@ -0,0 +1,247 @@
+import hashlib
+import time
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .locks import get_lock
+
+FRAGMENT_TIMEOUT = 60 * 60
+PAGE_SOFT_TIMEOUT = 60
+PAGE_HARD_TIMEOUT = 60 * 10
+# Версия, созданная при чтении, а не изменением объекта. Адреса
+# страниц со slug и username может придумать кто угодно, и без срока
+# жизни каждый такой адрес навсегда оставлял бы ключ в кэше.
+VERSION_TIMEOUT = 60 * 60 * 24
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 2
+LOCK_POLL_INTERVAL = 0.05
+VERSION_KEY = 'blog:version:{kind}:{pk}'
+FRAGMENT_KEY = 'blog:fragment:{name}:{pk}'
+PAGE_KEY = 'blog:page:{url}'
+GENERATION = 'generation'
+SITE = 'site'
+FEED = 'feed'
+STATS_KEY = 'blog:stats:{name}:{outcome}'
+HIT, MISS = 'hits', 'misses'
+
+
+def new_token():
+    """Уникальная версия, которая помнит время своего создания."""
+    return f'{time.time():.6f}-{uuid4().hex}'
+
+
+def token_time(token):
+    try:
+        return float(str(token).split('-', 1)[0])
+    except ValueError:
+        return None
+
+
+def bump_version(kind, pk):
+    """Меняет версию объекта после коммита текущей транзакции.
+
+    До коммита читатели видят старые данные; смени версию раньше, они
+    закэшировали бы старую страницу под новой версией.
+    """
+    if pk is None:
+        return
+    key = VERSION_KEY.format(kind=kind, pk=pk)
+    transaction.on_commit(lambda: cache.set(key, new_token(), None))
+
+
+def add_missing_tokens(keys, versions):
+    """Дополняет versions версиями ключей, которых не нашлось в кэше.
+
+    Потерянная (вытесненная или истёкшая) версия заменяется новой,
+    поэтому устаревший фрагмент после этого никогда не вернётся.
+    """
+    missing = [key for key in keys if key not in versions]
+    for key in missing:
+        cache.add(key, new_token(), VERSION_TIMEOUT)
+    if missing:
+        versions.update(cache.get_many(missing))
+
+
+def get_tokens(*objects):
+    """Версии набора объектов вида (kind, pk) в том же порядке."""
+    keys = [VERSION_KEY.format(kind=kind, pk=pk) for kind, pk in objects]
+    versions = cache.get_many(keys)
+    add_missing_tokens(keys, versions)
+    return [str(versions[key]) for key in keys]
+
+
+def get_version(*objects):
+    """Составная версия набора объектов вида (kind, pk)."""
+    return '.'.join(get_tokens(*objects))
+
+
+def version_info(*objects):
+    """Составная версия и время последнего изменения объектов (kind, pk).
+
+    Время берётся из самих версий: версия меняется при каждом изменении
+    объекта, а после вытеснения создаётся заново с текущим временем.
+    """
+    tokens = get_tokens(*objects)
+    times = [token_time(token) for token in tokens]
+    changed = max((t for t in times if t is not None), default=None)
+    return '.'.join(tokens), changed if changed is not None else time.time()
+
+
+def post_card_objects(post):
+    return (
+        ('post', post.pk),
+        ('category', post.category_id),
+        ('location', post.location_id),
+        ('user', post.author_id),
+    )
+
+
+def get_fragments(name, cards):
+    """Версии и фрагменты карточек одним обращением к кэшу.
+
+    cards — {pk: объекты (kind, pk), от которых зависит карточка}.
+    Возвращает {pk: (version, fragment)}; fragment — None, если его нет
+    в кэше или он собран под другой версией. Попадания и промахи
+    записываются в статистику один раз на все карточки.
+    """
+    version_keys = {
+        pk: [VERSION_KEY.format(kind=kind, pk=object_pk)
+             for kind, object_pk in objects]
+        for pk, objects in cards.items()
+    }
+    fragment_keys = {pk: FRAGMENT_KEY.format(name=name, pk=pk)
+                     for pk in cards}
+    keys = list(dict.fromkeys(
+        key for pk_keys in version_keys.values() for key in pk_keys
+    ))
+    found = cache.get_many([*keys, *fragment_keys.values()])
+    add_missing_tokens(keys, found)
+    fragments = {}
+    for pk, pk_keys in version_keys.items():
+        version = '.'.join(str(found[key]) for key in pk_keys)
+        stored_version, fragment = found.get(fragment_keys[pk], (None, None))
+        fragments[pk] = (
+            version, fragment if stored_version == version else None
+        )
+    hits = sum(fragment is not None for _, fragment in fragments.values())
+    record_lookups(name, hits=hits, misses=len(fragments) - hits)
+    return fragments
+
+
+def set_fragment(name, pk, version, fragment):
+    cache.set(
+        FRAGMENT_KEY.format(name=name, pk=pk),
+        (version, fragment),
+        FRAGMENT_TIMEOUT
+    )
+
+
+def record_lookups(name, hits=0, misses=0):
+    for outcome, count in ((HIT, hits), (MISS, misses)):
+        if not count:
+            continue
+        key = STATS_KEY.format(name=name, outcome=outcome)
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            if not cache.add(key, count, None):
+                cache.incr(key, count)
+
+
+def lookup_stats(name):
+    stats = cache.get_many(
+        [STATS_KEY.format(name=name, outcome=outcome)
+         for outcome in (HIT, MISS)]
+    )
+    hits = stats.get(STATS_KEY.format(name=name, outcome=HIT), 0)
+    misses = stats.get(STATS_KEY.format(name=name, outcome=MISS), 0)
+    total = hits + misses
+    return {
+        HIT: hits,
+        MISS: misses,
+        'ratio': hits / total if total else 0.0,
+    }
+
+
+def reset_stats(name):
+    cache.delete_many(
+        [STATS_KEY.format(name=name, outcome=outcome)
+         for outcome in (HIT, MISS)]
+    )
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def bump_generations(*scopes):
+    for scope in set(scopes):
+        bump_version(GENERATION, scope)
+
+
+def page_cache_key(request):
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return PAGE_KEY.format(url=url)
+
+
+def page_objects(scopes):
+    return tuple((GENERATION, scope) for scope in scopes)
+
+
+def page_version(scopes):
+    return get_version(*page_objects(scopes))
+
+
+def copy_of(entry, version, on_stale):
+    stored_version, _, value = entry
+    if on_stale is not None and stored_version != version:
+        return on_stale(value)
+    return value
+
+
+def get_or_set_fresh(key, producer, version='',
+                     soft_timeout=PAGE_SOFT_TIMEOUT,
+                     hard_timeout=PAGE_HARD_TIMEOUT,
+                     cacheable=None, on_stale=None):
+    """cache.get_or_set с защитой от лавины промахов.
+
+    Запись свежая, пока не истёк soft_timeout и не сменилась version.
+    Устаревшую запись пересобирает только владелец блокировки,
+    остальные до hard_timeout получают устаревшую копию. Если копии
+    нет совсем, ожидающие коротко ждут результата владельца. Копию,
+    собранную под другой version, перед выдачей обрабатывает
+    on_stale(value).
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        stored_version, fresh_until, value = entry
+        if stored_version == version and fresh_until > time.time():
+            return value
+    lock = get_lock(key, LOCK_TIMEOUT)
+    if lock.acquire():
+        try:
+            value = producer()
+            if cacheable is None or cacheable(value):
+                cache.set(
+                    key,
+                    (version, time.time() + soft_timeout, value),
+                    hard_timeout
+                )
+            return value
+        finally:
+            lock.release()
+    if entry is not None:
+        return copy_of(entry, version, on_stale)
+    deadline = time.time() + LOCK_WAIT
+    while time.time() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return copy_of(entry, version, on_stale)
+    return producer()
@@ -0,0 +1,223 @@
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import date, datetime
+from itertools import chain
+
+from .models import Comment, Post
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_CHECKPOINT_SIZE = 20000
+JSONL, CSV = 'jsonl', 'csv'
+FORMATS = (JSONL, CSV)
+CONTENT_TYPES = {
+    JSONL: 'application/x-ndjson; charset=utf-8',
+    CSV: 'text/csv; charset=utf-8',
+}
+CHECKPOINT_SUFFIX = '.checkpoint'
+
+# Колонки выгрузки и выражения для values(): связанные объекты
+# выгружаются читаемыми ключами, а не id. Первая колонка — id, по нему
+# ставятся контрольные точки.
+EXPORTS = {
+    'posts': (Post, {
+        'id': 'id',
+        'title': 'title',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'created_at': 'created_at',
+        'is_published': 'is_published',
+        'author': 'author__username',
+        'category': 'category__slug',
+        'location': 'location__name',
+        'image': 'image',
+        'comment_count': 'comment_count',
+    }),
+    'comments': (Comment, {
+        'id': 'id',
+        'post': 'post_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created_at': 'created_at',
+        'is_published': 'is_published',
+    }),
+}
+
+
+def export_columns(name):
+    return list(EXPORTS[name][1])
+
+
+def iter_rows(name, queryset=None, after_pk=0, limit=None,
+              chunk_size=DEFAULT_CHUNK_SIZE):
+    """Строки выгрузки по возрастанию id после after_pk.
+
+    Читаются только колонки выгрузки (values()) и пачками по
+    chunk_size через iterator(), поэтому память не растёт с числом
+    строк.
+    """
+    model, columns = EXPORTS[name]
+    if queryset is None:
+        queryset = model.objects.all()
+    rows = queryset.filter(pk__gt=after_pk).order_by('pk').values_list(
+        *columns.values()
+    )
+    if limit is not None:
+        rows = rows[:limit]
+    for values in rows.iterator(chunk_size=chunk_size):
+        yield [
+            value.isoformat() if isinstance(value, (datetime, date))
+            else value
+            for value in values
+        ]
+
+
+class JsonLinesWriter:
+
+    def __init__(self, stream, columns):
+        self.stream = stream
+        self.columns = columns
+
+    def write_header(self):
+        pass
+
+    def write(self, row):
+        self.stream.write(json.dumps(
+            dict(zip(self.columns, row)), ensure_ascii=False
+        ))
+        self.stream.write('\n')
+
+
+class CsvWriter:
+
+    def __init__(self, stream, columns):
+        self.columns = columns
+        self.writer = csv.writer(stream)
+
+    def write_header(self):
+        self.writer.writerow(self.columns)
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+
+WRITERS = {
+    JSONL: JsonLinesWriter,
+    CSV: CsvWriter,
+}
+
+
+def stream_export(name, export_format, queryset=None,
+                  chunk_size=DEFAULT_CHUNK_SIZE):
+    """Выгрузка по кускам текста — для StreamingHttpResponse."""
+    buffer = io.StringIO()
+    writer = WRITERS[export_format](buffer, export_columns(name))
+    writer.write_header()
+    for index, row in enumerate(
+        iter_rows(name, queryset, chunk_size=chunk_size), 1
+    ):
+        writer.write(row)
+        if index % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+class Exporter:
+    """Выгружает публикации или комментарии в файл с возобновлением.
+
+    Файл пишется окнами по checkpoint_size строк. После каждого окна
+    рядом с файлом сохраняется контрольная точка: последний выгруженный
+    id, число строк и длина файла в байтах. Прерванная выгрузка при
+    resume обрезает файл до последней контрольной точки и продолжает
+    со следующего id, поэтому строки не теряются и не дублируются.
+    Со сжатием каждое окно — отдельный член gzip; такой файл читают
+    gzip, zcat и модуль gzip.
+    """
+
+    def __init__(self, name, path, export_format=JSONL, compress=False,
+                 chunk_size=DEFAULT_CHUNK_SIZE,
+                 checkpoint_size=DEFAULT_CHECKPOINT_SIZE):
+        self.name = name
+        self.path = path
+        self.export_format = export_format
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.checkpoint_size = checkpoint_size
+        self.checkpoint_path = f'{path}{CHECKPOINT_SUFFIX}'
+
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as source:
+                return json.load(source)
+        except FileNotFoundError:
+            return None
+
+    def save_checkpoint(self, checkpoint):
+        temporary = f'{self.checkpoint_path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as output:
+            json.dump(checkpoint, output)
+            output.flush()
+            os.fsync(output.fileno())
+        os.replace(temporary, self.checkpoint_path)
+
+    def run(self, resume=False, progress=None):
+        """Выгружает строки; возвращает общее число строк в файле."""
+        checkpoint = self.load_checkpoint() if resume else None
+        if checkpoint is None:
+            checkpoint = {'last_pk': 0, 'rows': 0, 'size': 0}
+        with open(self.path, 'ab') as raw:
+            raw.truncate(checkpoint['size'])
+            raw.seek(checkpoint['size'])
+            first_window = checkpoint['size'] == 0
+            while True:
+                written, last_pk = self.write_window(
+                    raw, checkpoint['last_pk'], header=first_window
+                )
+                if not written:
+                    break
+                first_window = False
+                raw.flush()
+                os.fsync(raw.fileno())
+                checkpoint = {
+                    'last_pk': last_pk,
+                    'rows': checkpoint['rows'] + written,
+                    'size': raw.tell(),
+                }
+                self.save_checkpoint(checkpoint)
+                if progress:
+                    progress(checkpoint)
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return checkpoint['rows']
+
+    def write_window(self, raw, after_pk, header):
+        rows = iter_rows(
+            self.name, after_pk=after_pk, limit=self.checkpoint_size,
+            chunk_size=self.chunk_size
+        )
+        first = next(rows, None)
+        if first is None:
+            return 0, after_pk
+        binary = (
+            gzip.GzipFile(fileobj=raw, mode='wb') if self.compress else raw
+        )
+        text = io.TextIOWrapper(binary, encoding='utf-8', newline='')
+        writer = WRITERS[self.export_format](
+            text, export_columns(self.name)
+        )
+        if header:
+            writer.write_header()
+        written, last_pk = 0, after_pk
+        for values in chain((first,), rows):
+            writer.write(values)
+            written += 1
+            last_pk = values[0]
+        text.flush()
+        text.detach()
+        if self.compress:
+            binary.close()
+        return written, last_pk
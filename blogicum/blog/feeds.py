@@ -0,0 +1,257 @@
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+
+from django.core.cache import cache
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views import View
+
+from blogicum.conditional import ConditionalGetMixin
+
+from .caching import (FEED, SITE, author_scope, category_scope, page_objects,
+                      version_info)
+from .models import Category, User
+from .views import (POSTS_ORDERING, POSTS_RELATED_OBJECTS,
+                    ScheduledPublicationMixin)
+
+FEED_ITEMS = 50
+FEED_CHUNK_SIZE = 100
+FEED_FLUSH_SIZE = 16 * 1024
+FEED_MAX_AGE = 60
+FEED_TIMEOUT = 60 * 60
+FEED_KEY = 'blog:feed:{url}'
+FEED_TITLE = 'Блогикум'
+FEED_DESCRIPTION = 'Новые публикации Блогикума'
+
+
+class StreamingFeedMixin:
+    """Пишет ленту по частям, не собирая все записи в памяти.
+
+    Заголовок ленты, каждая пачка записей и закрывающие теги отдаются
+    отдельными кусками; записи берутся из итератора по одной.
+    """
+
+    item_element = None
+
+    def __init__(self, *args, updated, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.updated = updated
+
+    def latest_post_date(self):
+        return self.updated
+
+    def start_document(self, handler):
+        raise NotImplementedError
+
+    def end_document(self, handler):
+        raise NotImplementedError
+
+    def make_item(self, **fields):
+        self.add_item(**fields)
+        return self.items.pop()
+
+    def stream(self, items, encoding='utf-8'):
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(buffer, encoding,
+                                      short_empty_elements=True)
+
+        def flush():
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk.encode(encoding)
+
+        handler.startDocument()
+        self.start_document(handler)
+        yield flush()
+        for item in items:
+            handler.startElement(self.item_element,
+                                 self.item_attributes(item))
+            self.add_item_elements(handler, item)
+            handler.endElement(self.item_element)
+            if buffer.tell() >= FEED_FLUSH_SIZE:
+                yield flush()
+        self.end_document(handler)
+        yield flush()
+
+
+class StreamingRssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    item_element = 'item'
+
+    def start_document(self, handler):
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def end_document(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class StreamingAtomFeed(StreamingFeedMixin, Atom1Feed):
+    item_element = 'entry'
+
+    def start_document(self, handler):
+        handler.startElement('feed', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def end_document(self, handler):
+        handler.endElement('feed')
+
+
+FEED_TYPES = {
+    'rss': StreamingRssFeed,
+    'atom': StreamingAtomFeed,
+}
+
+
+def cached_stream(key, version, chunks):
+    """Отдаёт куски ленты и кладёт её в кэш, если поток дочитан."""
+    body = []
+    for chunk in chunks:
+        body.append(chunk)
+        yield chunk
+    cache.set(key, (version, b''.join(body)), FEED_TIMEOUT)
+
+
+class PostFeedView(ScheduledPublicationMixin, ConditionalGetMixin, View):
+    """RSS/Atom лента последних видимых публикаций.
+
+    Лента одинакова для всех читателей, поэтому кэшируется целиком и
+    разрешает общим кэшам хранить копию FEED_MAX_AGE секунд. Версия
+    кэша и ETag — поколения страниц, которые сбрасываются при
+    сохранении публикаций, категорий, мест и авторов.
+    """
+
+    vary_on_user = False
+    cache_control = {'public': True, 'max_age': FEED_MAX_AGE}
+
+    def get_cache_scopes(self):
+        return (SITE, FEED)
+
+    def load_feed_owner(self):
+        """Загружает категорию или автора ленты перед её сборкой.
+
+        Закэшированная лента собрана при той же версии поколений, что и
+        сейчас, поэтому для неё повторная проверка не нужна.
+        """
+
+    def get_feed_title(self):
+        return FEED_TITLE
+
+    def get_feed_link(self):
+        return reverse('blog:index')
+
+    def get_posts(self):
+        return POSTS_RELATED_OBJECTS.filter(
+            is_visible=True,
+            category__is_published=True
+        )
+
+    def get_validators(self):
+        self.version, self.changed_at = version_info(
+            *page_objects(self.get_cache_scopes())
+        )
+        return (self.version, self.kwargs['feed_format']), self.changed_at
+
+    def get(self, request, *args, feed_format, **kwargs):
+        feed_class = FEED_TYPES.get(feed_format)
+        if feed_class is None:
+            raise Http404('Неизвестный формат ленты.')
+        key = FEED_KEY.format(url=hashlib.md5(
+            request.build_absolute_uri().encode()
+        ).hexdigest())
+        entry = cache.get(key)
+        if entry is not None and entry[0] == self.version:
+            chunks = [entry[1]]
+        else:
+            self.load_feed_owner()
+            chunks = cached_stream(
+                key, self.version, self.render_feed(feed_class)
+            )
+        return StreamingHttpResponse(
+            chunks, content_type=feed_class.content_type
+        )
+
+    def render_feed(self, feed_class):
+        feed = feed_class(
+            title=self.get_feed_title(),
+            link=self.request.build_absolute_uri(self.get_feed_link()),
+            description=FEED_DESCRIPTION,
+            feed_url=self.request.build_absolute_uri(),
+            language='ru',
+            updated=datetime.fromtimestamp(self.changed_at, dt_timezone.utc),
+        )
+        posts = self.get_posts().order_by(*POSTS_ORDERING)[:FEED_ITEMS]
+        items = (
+            feed.make_item(**self.item_fields(post))
+            for post in posts.iterator(chunk_size=FEED_CHUNK_SIZE)
+        )
+        return feed.stream(items)
+
+    def item_fields(self, post):
+        link = self.request.build_absolute_uri(
+            reverse('blog:post_detail', args=[post.pk])
+        )
+        return {
+            'title': post.title,
+            'link': link,
+            'description': post.text,
+            'author_name': post.author.username,
+            'pubdate': post.pub_date,
+            'unique_id': link,
+            'categories': [post.category.title] if post.category else None,
+        }
+
+
+class CategoryFeedView(PostFeedView):
+
+    def get_cache_scopes(self):
+        return (SITE, category_scope(self.kwargs['slug']))
+
+    def load_feed_owner(self):
+        self.category = get_object_or_404(
+            Category.objects.all(),
+            slug=self.kwargs['slug'],
+            is_published=True
+        )
+
+    def get_feed_title(self):
+        return f'{FEED_TITLE} — {self.category.title}'
+
+    def get_feed_link(self):
+        return reverse('blog:category_posts', args=[self.category.slug])
+
+    def get_posts(self):
+        return POSTS_RELATED_OBJECTS.filter(
+            is_visible=True,
+            category__id=self.category.id
+        )
+
+
+class AuthorFeedView(PostFeedView):
+
+    def get_cache_scopes(self):
+        return (SITE, author_scope(self.kwargs['username']))
+
+    def load_feed_owner(self):
+        self.author = get_object_or_404(
+            User.objects.all(),
+            username=self.kwargs['username']
+        )
+
+    def get_feed_title(self):
+        return f'{FEED_TITLE} — @{self.author.username}'
+
+    def get_feed_link(self):
+        return reverse('blog:profile', args=[self.author.username])
+
+    def get_posts(self):
+        return POSTS_RELATED_OBJECTS.filter(
+            is_visible=True,
+            author__id=self.author.id
+        )
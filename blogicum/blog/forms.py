@@ -1,7 +1,14 @@
 from django import forms
+from django.contrib.auth.forms import PasswordResetForm
 from django.forms import ModelForm
 
+from jobs.queue import enqueue
+
 from .models import Post, Comment
+from .tasks import send_password_reset_email
+
+# Поля контекста письма, которые строит задача, а не форма.
+RESET_SECRET_CONTEXT = ('user', 'uid', 'token')
 
 
 class CreatePostForm(ModelForm):
@@ -19,3 +26,28 @@ class AddCommentForm(ModelForm):
     class Meta:
         model = Comment
         fields = ('text',)
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Письмо для сброса пароля уходит фоновой задачей.
+
+    В задачу попадают только id пользователя и шаблоны: ссылку со
+    сбросом пароля задача строит сама (blog.tasks). Токен делает
+    default_token_generator, как у PasswordResetView.
+    """
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        enqueue(
+            send_password_reset_email,
+            context['user'].pk,
+            subject_template_name,
+            email_template_name,
+            {
+                key: value for key, value in context.items()
+                if key not in RESET_SECRET_CONTEXT
+            },
+            from_email,
+            html_email_template_name=html_email_template_name,
+        )
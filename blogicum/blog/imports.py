@@ -0,0 +1,322 @@
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+from itertools import islice
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import connections
+from django.utils import timezone
+
+from blogicum.sqlite import write_transaction
+
+from .caching import SITE, bump_generations, bump_version
+from .models import Category, Comment, Location, Post, User
+from .publication import forget_next_publication
+from .search import comments_indexed_after
+
+READ_SIZE = 64 * 1024
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_TRANSACTION_SIZE = 10000
+# Виды версий в кэше (см. caching.post_card_objects) для моделей,
+# строки которых могут быть закэшированы во фрагментах страниц.
+CACHED_KINDS = {
+    Post: 'post',
+    Category: 'category',
+    Location: 'location',
+    User: 'user',
+}
+
+
+class JsonArrayReader:
+    """Читает JSON-массив из файла по одному элементу.
+
+    В памяти держится только текущий элемент и непрочитанный хвост
+    буфера, поэтому размер дампа не ограничен памятью.
+    """
+
+    decoder = json.JSONDecoder()
+
+    def __init__(self, stream, read_size=READ_SIZE):
+        self.stream = stream
+        self.read_size = read_size
+        self.buffer = ''
+        self.position = 0
+        self.exhausted = False
+
+    def fill(self):
+        chunk = self.stream.read(self.read_size)
+        self.exhausted = not chunk
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+    def peek(self):
+        """Пропускает пробелы и возвращает следующий символ ('' в конце)."""
+        while True:
+            while (self.position < len(self.buffer)
+                   and self.buffer[self.position].isspace()):
+                self.position += 1
+            if self.position < len(self.buffer) or self.exhausted:
+                return self.buffer[self.position:self.position + 1]
+            self.fill()
+
+    def decode(self):
+        while True:
+            self.peek()
+            try:
+                item, end = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+            except json.JSONDecodeError as error:
+                if self.exhausted:
+                    raise DeserializationError(f'Дамп повреждён: {error}')
+            else:
+                # Элемент, дочитанный до конца буфера, мог оборваться
+                # (например, число): нужен хотя бы один символ после него.
+                if end < len(self.buffer) or self.exhausted:
+                    self.position = end
+                    return item
+            self.fill()
+
+    def __iter__(self):
+        if self.peek() != '[':
+            raise DeserializationError('Дамп должен быть JSON-массивом.')
+        self.position += 1
+        if self.peek() == ']':
+            return
+        while True:
+            yield self.decode()
+            separator = self.peek()
+            if separator == ']':
+                return
+            if not separator:
+                raise DeserializationError('Дамп оборвался до конца массива.')
+            if separator != ',':
+                raise DeserializationError(
+                    'Дамп повреждён: между объектами нет запятой.'
+                )
+            self.position += 1
+
+
+def iter_json_array(stream, read_size=READ_SIZE):
+    return iter(JsonArrayReader(stream, read_size))
+
+
+def iter_batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def dependency_order(models):
+    """Модели в порядке, при котором связанные строки уже загружены."""
+    order = []
+    visiting = set()
+
+    def visit(model):
+        if model in order or model in visiting:
+            return
+        visiting.add(model)
+        for relation in model._meta.get_fields():
+            related = relation.related_model
+            if (relation.concrete and relation.is_relation
+                    and related in models and related is not model):
+                visit(related)
+        visiting.discard(model)
+        order.append(model)
+
+    for model in sorted(models, key=lambda model: model._meta.label):
+        visit(model)
+    return order
+
+
+class ImportStats:
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.seconds = 0.0
+
+    @property
+    def rows(self):
+        return self.created + self.updated
+
+    @property
+    def rate(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class BulkImporter:
+    """Загружает дамп dumpdata пачками bulk_create/bulk_update.
+
+    Дамп читается потоково и раскладывается по временным файлам JSON
+    Lines — по одному на модель. Затем модели загружаются в порядке
+    зависимостей: пачка из batch_size строк за один запрос, транзакция
+    на transaction_size строк. Строки с уже существующим id
+    обновляются, как в loaddata. Сигналы моделей не отправляются,
+    поэтому производные данные (видимость и счётчики публикаций, версии
+    кэша) пересчитываются после загрузки.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE,
+                 transaction_size=DEFAULT_TRANSACTION_SIZE,
+                 using='default', progress=None):
+        self.batch_size = batch_size
+        self.transaction_size = transaction_size
+        self.using = using
+        self.progress = progress
+        self.stats = {}
+
+    def run(self, stream):
+        with tempfile.TemporaryDirectory() as directory:
+            files = self.split_by_model(stream, directory)
+            order = dependency_order(set(files))
+            for model in order:
+                with open(files[model], encoding='utf-8') as rows:
+                    self.stats[model] = self.load_model_indexed(model, rows)
+                if self.progress:
+                    self.progress(model, self.stats[model])
+        self.reset_sequences(order)
+        self.refresh_derived_data()
+        return self.stats
+
+    def split_by_model(self, stream, directory):
+        files, outputs = {}, {}
+        try:
+            for item in iter_json_array(stream):
+                try:
+                    model = apps.get_model(item['model'])
+                except (KeyError, LookupError, TypeError, ValueError):
+                    raise DeserializationError(
+                        f'Неизвестная модель в дампе: {item!r:.80}'
+                    )
+                if model not in outputs:
+                    files[model] = os.path.join(
+                        directory, f'{model._meta.label_lower}.jsonl'
+                    )
+                    outputs[model] = open(files[model], 'w', encoding='utf-8')
+                outputs[model].write(json.dumps(item, ensure_ascii=False))
+                outputs[model].write('\n')
+        finally:
+            for output in outputs.values():
+                output.close()
+        return files
+
+    def load_model_indexed(self, model, rows):
+        # Триггеры поиска пересобирают индекс публикации на каждый её
+        # комментарий; загрузку комментариев индексируем один раз после.
+        if model is not Comment:
+            return self.load_model(model, rows)
+        with comments_indexed_after(self.using) as changed:
+            return self.load_model(model, rows, changed)
+
+    def load_model(self, model, rows, changed=None):
+        stats = ImportStats()
+        started = time.perf_counter()
+        objects = Deserializer(
+            (json.loads(row) for row in rows),
+            using=self.using,
+            ignorenonexistent=True,
+        )
+        batches = iter_batches(objects, self.batch_size)
+        per_transaction = max(1, self.transaction_size // self.batch_size)
+        for first in batches:
+            with write_transaction(using=self.using):
+                self.save_batch(model, first, stats, changed)
+                for batch in islice(batches, per_transaction - 1):
+                    self.save_batch(model, batch, stats, changed)
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+    def save_batch(self, model, batch, stats, changed=None):
+        objects = [deserialized.object for deserialized in batch]
+        if model is Post:
+            now = timezone.now()
+            for post in objects:
+                post.is_visible = post.is_due(now)
+        manager = model._base_manager.using(self.using)
+        existing = set(manager.filter(
+            pk__in=[obj.pk for obj in objects if obj.pk is not None]
+        ).values_list('pk', flat=True))
+        new = [obj for obj in objects if obj.pk not in existing]
+        old = [obj for obj in objects if obj.pk in existing]
+        self.insert(model, [obj for obj in new if obj.pk is not None])
+        manager.bulk_create(
+            [obj for obj in new if obj.pk is None],
+            batch_size=self.batch_size
+        )
+        if changed is not None:
+            changed.update(obj.pk for obj in objects if obj.pk is not None)
+        if old:
+            manager.bulk_update(
+                old,
+                [field.name for field in model._meta.concrete_fields
+                 if not field.primary_key],
+                batch_size=self.batch_size,
+            )
+            kind = CACHED_KINDS.get(model)
+            if kind:
+                for obj in old:
+                    bump_version(kind, obj.pk)
+        self.save_m2m(model, batch)
+        stats.created += len(new)
+        stats.updated += len(old)
+
+    def insert(self, model, objects):
+        """INSERT строк с id из дампа, как raw-сохранение в loaddata.
+
+        В отличие от bulk_create, значения полей не проходят через
+        pre_save(), и даты auto_now_add берутся из дампа, а не
+        заменяются текущим временем.
+        """
+        if not objects:
+            return
+        fields = model._meta.concrete_fields
+        size = connections[self.using].ops.bulk_batch_size(fields, objects)
+        for batch in iter_batches(objects, size):
+            model._base_manager._insert(
+                batch, fields=fields, using=self.using, raw=True
+            )
+
+    def save_m2m(self, model, batch):
+        for name in {name for item in batch for name in item.m2m_data}:
+            relation = model._meta.get_field(name)
+            through = relation.remote_field.through
+            source = relation.m2m_field_name()
+            target = relation.m2m_reverse_field_name()
+            through._base_manager.using(self.using).bulk_create(
+                [
+                    through(**{f'{source}_id': item.object.pk,
+                               f'{target}_id': related_pk})
+                    for item in batch
+                    for related_pk in item.m2m_data.get(name, ())
+                ],
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+
+    def reset_sequences(self, models):
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def refresh_derived_data(self):
+        if Post in self.stats or Comment in self.stats:
+            call_command(
+                'recount_comments', database=self.using, stdout=StringIO()
+            )
+        forget_next_publication()
+        bump_generations(SITE)
@@ -0,0 +1,75 @@
+import hashlib
+import os
+import time
+from uuid import uuid4
+
+from django.core.cache import cache as default_cache
+from django.core.cache.backends.filebased import FileBasedCache
+
+LOCK_KEY = 'blog:lock:{key}'
+
+
+class CacheAddLock:
+    """Блокировка на атомарном cache.add (locmem, memcached, redis)."""
+
+    def __init__(self, key, timeout, cache):
+        self.key = LOCK_KEY.format(key=key)
+        self.timeout = timeout
+        self.cache = cache
+        self.token = uuid4().hex
+
+    def acquire(self):
+        return self.cache.add(self.key, self.token, self.timeout)
+
+    def release(self):
+        if self.cache.get(self.key) == self.token:
+            self.cache.delete(self.key)
+
+
+class FileLock:
+    """Блокировка файлом, созданным с O_EXCL, рядом с файловым кэшем.
+
+    FileBasedCache.add не атомарен (has_key + set), поэтому для него
+    используется файловая система. Брошенный файл старше timeout
+    считается протухшим и перехватывается.
+    """
+
+    def __init__(self, key, timeout, directory):
+        name = hashlib.md5(key.encode()).hexdigest()
+        self.path = os.path.join(directory, f'{name}.lock')
+        self.timeout = timeout
+
+    def acquire(self):
+        if self._create():
+            return True
+        if not self._expired():
+            return False
+        self.release()
+        return self._create()
+
+    def release(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _create(self):
+        try:
+            os.close(os.open(
+                self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY
+            ))
+        except FileExistsError:
+            return False
+        return True
+
+    def _expired(self):
+        try:
+            return time.time() - os.path.getmtime(self.path) > self.timeout
+        except FileNotFoundError:
+            return True
+
+
+def get_lock(key, timeout, cache=default_cache):
+    if isinstance(cache, FileBasedCache):
+        return FileLock(key, timeout, cache._dir)
+    return CacheAddLock(key, timeout, cache)
@@ -0,0 +1,107 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from blog.benchmark import (ANONYMOUS, AUTHOR, DEFAULT_CONCURRENCY,
+                            DEFAULT_DURATION, USERS, BenchmarkError,
+                            async_targets, run_throughput, sample_comment)
+
+
+def sync_only_middleware():
+    """Middleware без async_capable: под ASGI каждое — переход в поток."""
+    return [
+        path for path in settings.MIDDLEWARE
+        if not getattr(import_string(path), 'async_capable', False)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность страниц чтения под WSGI '
+        '(синхронные view) и ASGI (асинхронные view) при одновременных '
+        'запросах: запросов в секунду, p50/p95/p99 и ошибки 5xx.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+            help='Одновременных клиентов.'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=DEFAULT_DURATION,
+            help='Длительность замера каждого варианта в секундах.'
+        )
+        parser.add_argument(
+            '--user', choices=USERS, default=ANONYMOUS,
+            help='Анонимный посетитель или автор замеряемой публикации.'
+        )
+        parser.add_argument(
+            '--wsgi-url',
+            help='Адрес запущенного WSGI-сервера; без него — тестовый '
+                 'клиент в этом процессе.'
+        )
+        parser.add_argument(
+            '--asgi-url',
+            help='Адрес запущенного ASGI-сервера; без него — AsyncClient '
+                 'в этом процессе.'
+        )
+        parser.add_argument('--output', help='Куда записать результат JSON.')
+
+    def handle(self, *args, concurrency, duration, user, wsgi_url, asgi_url,
+               output, **options):
+        if concurrency < 1 or duration <= 0:
+            raise CommandError(
+                '--concurrency и --duration должны быть положительными.'
+            )
+        try:
+            comment = sample_comment()
+        except BenchmarkError as error:
+            raise CommandError(str(error))
+        if settings.DEBUG:
+            self.stderr.write(self.style.WARNING(
+                'DEBUG = True: замер не похож на боевой сервер.'
+            ))
+        sync_only = sync_only_middleware()
+        if sync_only:
+            self.stderr.write(self.style.WARNING(
+                'Под ASGI эти middleware выполняются в отдельном потоке: '
+                + ', '.join(sync_only)
+            ))
+        result = {
+            'meta': {
+                'concurrency': concurrency,
+                'duration': duration,
+                'user': user,
+                'debug': settings.DEBUG,
+                'orm_workers': settings.ASYNC_ORM_WORKERS,
+                'sync_only_middleware': sync_only,
+                'wsgi_url': wsgi_url,
+                'asgi_url': asgi_url,
+            },
+            **run_throughput(
+                async_targets(comment),
+                comment.post.author if user == AUTHOR else None,
+                concurrency, duration, wsgi_url, asgi_url,
+            ),
+        }
+        connections.close_all()
+        for kind in ('wsgi', 'asgi'):
+            self.report(kind, result[kind])
+        if output:
+            with open(output, 'w', encoding='utf-8') as destination:
+                json.dump(result, destination, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Результат: {output}.'))
+
+    def report(self, kind, summary):
+        if not summary['requests']:
+            return
+        self.stdout.write(
+            f'{kind:<5} {summary["per_second"]:8.1f} запросов/с  '
+            f'p50 {summary["p50_ms"]:8.2f} мс  '
+            f'p95 {summary["p95_ms"]:8.2f} мс  '
+            f'p99 {summary["p99_ms"]:8.2f} мс  '
+            f'ошибок {summary["errors"]}'
+        )
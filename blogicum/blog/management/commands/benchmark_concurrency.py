@@ -0,0 +1,123 @@
+import json
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import override_settings
+
+from blog.benchmark import (DEFAULT_DURATION, DEFAULT_READERS,
+                            DEFAULT_WRITERS, BenchmarkError, local_server,
+                            run_concurrent, sample_comment, targets)
+from blogicum.sqlite import SQLITE_DEFAULTS, current_pragmas
+from blogicum.write_queue import reset_write_stats, write_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет чтение страниц блога, пока параллельно пишутся '
+        'комментарии: запросы в секунду, p50/p95/p99 и ошибки 5xx '
+        'отдельно для чтения и записи. Комментарии остаются в базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers', type=int, default=DEFAULT_READERS,
+            help='Потоков чтения.'
+        )
+        parser.add_argument(
+            '--writers', type=int, default=DEFAULT_WRITERS,
+            help='Потоков записи комментариев.'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=DEFAULT_DURATION,
+            help='Длительность замера в секундах.'
+        )
+        parser.add_argument(
+            '--base-url',
+            help='Адрес уже запущенного сервера; без него сервер '
+                 'поднимается в этом процессе.'
+        )
+        parser.add_argument(
+            '--sqlite-defaults', action='store_true',
+            help='Замерить без SQLITE_PRAGMAS: с настройками SQLite по '
+                 'умолчанию и обычным BEGIN.'
+        )
+        parser.add_argument(
+            '--write-queue', action='store_true',
+            help='Замерить с очередью записи (WRITE_QUEUE_ENABLED).'
+        )
+        parser.add_argument('--output', help='Куда записать результат JSON.')
+
+    def handle(self, *args, readers, writers, duration, base_url,
+               sqlite_defaults, write_queue, output, **options):
+        self.check_options(readers, writers, duration, base_url,
+                           sqlite_defaults or write_queue)
+        try:
+            comment = sample_comment()
+        except BenchmarkError as error:
+            raise CommandError(str(error))
+        overrides = {}
+        if sqlite_defaults:
+            overrides.update(SQLITE_PRAGMAS=SQLITE_DEFAULTS,
+                             SQLITE_IMMEDIATE_TRANSACTIONS=False)
+        if write_queue:
+            overrides.update(WRITE_QUEUE_ENABLED=True)
+        server = nullcontext(base_url) if base_url else local_server()
+        with override_settings(**overrides), server as url:
+            # Уже открытые соединения настроены по-старому.
+            connections.close_all()
+            reset_write_stats()
+            result = {
+                'meta': {
+                    'readers': readers,
+                    'writers': writers,
+                    'duration': duration,
+                    'sqlite': current_pragmas(connection, SQLITE_DEFAULTS),
+                    'write_queue': write_queue,
+                },
+                **run_concurrent(url, targets(comment), comment.post.author,
+                                 readers, writers, duration),
+            }
+            if write_queue:
+                result['write_queue'] = write_stats()
+        connections.close_all()
+        self.report_result(result)
+        if output:
+            with open(output, 'w', encoding='utf-8') as destination:
+                json.dump(result, destination, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Результат: {output}.'))
+
+    def check_options(self, readers, writers, duration, base_url,
+                      in_process):
+        if readers < 0 or writers < 0 or not readers + writers:
+            raise CommandError('Нужен хотя бы один поток чтения или записи.')
+        if duration <= 0:
+            raise CommandError('--duration должен быть положительным.')
+        if in_process and base_url:
+            raise CommandError(
+                '--sqlite-defaults и --write-queue меняют настройки только '
+                'сервера в этом процессе и несовместимы с --base-url.'
+            )
+
+    def report_result(self, result):
+        for kind in ('reads', 'writes'):
+            self.report(kind, result[kind])
+        stats = result.get('write_queue')
+        if stats:
+            self.stdout.write(
+                f'очередь записи: {stats["batches"]} пачек, '
+                f'{stats["batch_size"]:.1f} записей в пачке, '
+                f'ожидание {stats["wait_ms"]:.2f} мс, '
+                f'пачка {stats["commit_ms"]:.2f} мс'
+            )
+
+    def report(self, kind, summary):
+        if not summary['requests']:
+            return
+        self.stdout.write(
+            f'{kind:<7} {summary["per_second"]:8.1f} запросов/с  '
+            f'p50 {summary["p50_ms"]:8.2f} мс  '
+            f'p95 {summary["p95_ms"]:8.2f} мс  '
+            f'p99 {summary["p99_ms"]:8.2f} мс  '
+            f'ошибок {summary["errors"]}'
+        )
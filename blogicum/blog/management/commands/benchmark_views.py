@@ -0,0 +1,114 @@
+import json
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.benchmark import (ANONYMOUS, AUTHOR, DEFAULT_REQUESTS,
+                            DEFAULT_WARMUP, USERS, BenchmarkError,
+                            ClientTransport, ServerTransport, compare,
+                            describe_run, local_server, run_benchmark,
+                            sample_comment, targets)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет все адреса приложения blog: p50/p95/p99 времени ответа, '
+        'SQL-запросы и байты на ответ. Результат пишется в JSON, чтобы '
+        'прогоны можно было сравнить. POST add_comment добавляет '
+        'комментарии в базу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--transport', choices=('client', 'server'), default='client',
+            help='Тестовый клиент в процессе или HTTP к WSGI-серверу.'
+        )
+        parser.add_argument(
+            '--base-url',
+            help='Адрес уже запущенного сервера (для --transport server); '
+                 'без него сервер поднимается на свободном порту.'
+        )
+        parser.add_argument(
+            '--user', choices=USERS, default=ANONYMOUS,
+            help='Анонимный посетитель или автор замеряемой публикации.'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=DEFAULT_REQUESTS, dest='repeat',
+            help='Замеряемых запросов на адрес.'
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=DEFAULT_WARMUP,
+            help='Незамеряемых запросов на адрес перед замером.'
+        )
+        parser.add_argument('--output', help='Куда записать результат JSON.')
+        parser.add_argument(
+            '--compare', metavar='JSON',
+            help='Прошлый результат для сравнения.'
+        )
+
+    def handle(self, *args, transport, base_url, user, repeat, warmup,
+               output, compare, **options):
+        if repeat < 1 or warmup < 0:
+            raise CommandError(
+                '--requests должен быть положительным, --warmup — '
+                'неотрицательным.'
+            )
+        baseline = self.load(compare) if compare else None
+        if settings.DEBUG:
+            self.stderr.write(self.style.WARNING(
+                'DEBUG = True: в замер входят подсчёт SQL-запросов и, для '
+                'запросов с 127.0.0.1, панель отладки.'
+            ))
+        try:
+            comment = sample_comment()
+        except BenchmarkError as error:
+            raise CommandError(str(error))
+        login = comment.post.author if user == AUTHOR else None
+        if transport == 'client':
+            server = nullcontext()
+        else:
+            server = nullcontext(base_url) if base_url else local_server()
+        with server as url:
+            client = (
+                ClientTransport(login) if url is None
+                else ServerTransport(url, login)
+            )
+            result = {'meta': describe_run(client, user, repeat, warmup)}
+            result['views'] = run_benchmark(
+                client, targets(comment), repeat, warmup, self.report
+            )
+        if output:
+            with open(output, 'w', encoding='utf-8') as destination:
+                json.dump(result, destination, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Результат: {output}.'))
+        if baseline:
+            self.report_changes(baseline, result)
+
+    def load(self, path):
+        try:
+            with open(path, encoding='utf-8') as source:
+                return json.load(source)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Не прочитан прошлый результат: {error}')
+
+    def report(self, name, result):
+        queries = '?' if result['queries'] is None else result['queries']
+        self.stdout.write(
+            f'{name:<26} {result["status"]} '
+            f'p50 {result["p50_ms"]:8.2f} мс  '
+            f'p95 {result["p95_ms"]:8.2f} мс  '
+            f'p99 {result["p99_ms"]:8.2f} мс  '
+            f'SQL {queries:>3}  {result["bytes"]} Б'
+        )
+
+    def report_changes(self, baseline, result):
+        self.stdout.write('Изменения p95 относительно прошлого прогона:')
+        for name, changes in compare(baseline, result).items():
+            before, after = changes['p95_ms']
+            delta = (after - before) / before * 100 if before else 0.0
+            self.stdout.write(
+                f'{name:<26} {before:8.2f} → {after:8.2f} мс '
+                f'({delta:+.1f}%), SQL {changes["queries"][0]} → '
+                f'{changes["queries"][1]}'
+            )
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.sitemaps import build_sitemaps
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает сжатую карту сайта (индекс и части по диапазонам id) '
+        'в SITEMAP_ROOT, чтобы роботы получали готовые файлы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'base_url',
+            help='Адрес сайта без завершающего «/», например '
+                 'https://blogicum.example.'
+        )
+        parser.add_argument(
+            '--output', default=settings.SITEMAP_ROOT,
+            help='Каталог для файлов (по умолчанию SITEMAP_ROOT).'
+        )
+
+    def handle(self, *args, base_url, output, **options):
+        written = build_sitemaps(str(output), base_url.rstrip('/'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано файлов карты сайта: {len(written)}.'
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from blog.caching import lookup_stats, reset_stats
+from blog.templatetags.blog_cache import POST_CARD
+
+CACHED_FRAGMENTS = (POST_CARD,)
+
+
+class Command(BaseCommand):
+    help = 'Показывает долю попаданий в кэш фрагментов блога.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Обнулить счётчики после вывода.'
+        )
+
+    def handle(self, *args, reset, **options):
+        for name in CACHED_FRAGMENTS:
+            stats = lookup_stats(name)
+            self.stdout.write(
+                f'{name}: попаданий {stats["hits"]}, '
+                f'промахов {stats["misses"]}, '
+                f'доля попаданий {stats["ratio"]:.1%}'
+            )
+            if reset:
+                reset_stats(name)
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.exports import (DEFAULT_CHECKPOINT_SIZE, DEFAULT_CHUNK_SIZE,
+                          EXPORTS, FORMATS, JSONL, Exporter)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает публикации или комментарии в JSON Lines или CSV '
+        '(по желанию со сжатием gzip) с контрольными точками по id, '
+        'чтобы прерванную выгрузку можно было продолжить.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(EXPORTS))
+        parser.add_argument('output', help='Путь к файлу выгрузки.')
+        parser.add_argument(
+            '--format', choices=FORMATS, default=JSONL, dest='export_format'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true', dest='compress',
+            help='Сжимать выгрузку gzip.'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить с последней контрольной точки.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Строк, читаемых из базы за один раз.'
+        )
+        parser.add_argument(
+            '--checkpoint-size', type=int, default=DEFAULT_CHECKPOINT_SIZE,
+            help='Строк между контрольными точками.'
+        )
+
+    def handle(self, *args, model, output, export_format, compress, resume,
+               chunk_size, checkpoint_size, **options):
+        if chunk_size < 1 or checkpoint_size < 1:
+            raise CommandError(
+                '--chunk-size и --checkpoint-size должны быть '
+                'положительными.'
+            )
+        exporter = Exporter(
+            model, output, export_format, compress,
+            chunk_size=chunk_size, checkpoint_size=checkpoint_size,
+        )
+        try:
+            rows = exporter.run(resume=resume, progress=self.report)
+        except OSError as error:
+            raise CommandError(f'Выгрузка не записана: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено строк: {rows} в {output}.'
+        ))
+
+    def report(self, checkpoint):
+        self.stdout.write(
+            f'Контрольная точка: id {checkpoint["last_pk"]}, '
+            f'строк {checkpoint["rows"]}.'
+        )
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.synthetic import DEFAULT_BATCH_SIZE, DEFAULT_PASSWORD, DataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей, категории, места, '
+        'публикации и комментарии для нагрузочных замеров. Публикации и '
+        'комментарии распределены неравномерно (закон Ципфа).'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (('users', 50), ('categories', 10),
+                              ('locations', 20), ('posts', 1000),
+                              ('comments', 5000)):
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Сколько создать (по умолчанию {default}).'
+            )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одинаковое зерно — одинаковые данные.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Строк в одном запросе INSERT.'
+        )
+        parser.add_argument(
+            '--password', default=DEFAULT_PASSWORD,
+            help='Пароль всех созданных пользователей.'
+        )
+
+    def handle(self, *args, users, categories, locations, posts, comments,
+               seed, batch_size, password, **options):
+        if min(users, categories, locations, posts, comments) < 0:
+            raise CommandError('Количество не может быть отрицательным.')
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        created = DataGenerator(seed, batch_size, password).generate(
+            users, categories, locations, posts, comments
+        )
+        self.stdout.write(self.style.SUCCESS('Создано: ' + ', '.join(
+            f'{name} — {count}' for name, count in created.items()
+        ) + '.'))
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import IntegrityError
+
+from blog.imports import (DEFAULT_BATCH_SIZE, DEFAULT_TRANSACTION_SIZE,
+                          BulkImporter)
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает JSON-дамп dumpdata (например, db.json): читает '
+        'его потоково и пишет пачками bulk_create в порядке зависимостей '
+        'моделей. Сигналы моделей не отправляются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к JSON-дампу.')
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Строк в одном запросе INSERT/UPDATE.'
+        )
+        parser.add_argument(
+            '--transaction-size', type=int,
+            default=DEFAULT_TRANSACTION_SIZE,
+            help='Строк в одной транзакции.'
+        )
+        parser.add_argument(
+            '--database', default='default',
+            help='Псевдоним базы данных для загрузки.'
+        )
+
+    def handle(self, *args, path, batch_size, transaction_size, database,
+               **options):
+        if batch_size < 1 or transaction_size < 1:
+            raise CommandError(
+                '--batch-size и --transaction-size должны быть '
+                'положительными.'
+            )
+        importer = BulkImporter(
+            batch_size=batch_size,
+            transaction_size=transaction_size,
+            using=database,
+            progress=self.report,
+        )
+        try:
+            with open(path, encoding='utf-8') as stream:
+                stats = importer.run(stream)
+        except (OSError, DeserializationError, IntegrityError) as error:
+            raise CommandError(f'Дамп не загружен: {error}')
+        rows = sum(model_stats.rows for model_stats in stats.values())
+        seconds = sum(model_stats.seconds for model_stats in stats.values())
+        rate = rows / seconds if seconds else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено строк: {rows} за {seconds:.2f} с '
+            f'({rate:.0f} строк/с).'
+        ))
+
+    def report(self, model, stats):
+        self.stdout.write(
+            f'{model._meta.label}: создано {stats.created}, обновлено '
+            f'{stats.updated} за {stats.seconds:.2f} с '
+            f'({stats.rate:.0f} строк/с)'
+        )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.thumbnails import update_thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт уменьшенные копии фото публикаций (WebP и JPEG) '
+        'для публикаций, у которых их ещё нет.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true', dest='rebuild',
+            help='Пересоздать копии для всех публикаций с фото.'
+        )
+
+    def handle(self, *args, rebuild, **options):
+        posts = Post.objects.exclude(image='').order_by('pk')
+        if not rebuild:
+            posts = posts.filter(thumbnails={})
+        done = failed = 0
+        for post in posts.iterator():
+            try:
+                update_thumbnails(post)
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f'Публикация {post.pk}: {error}')
+                continue
+            done += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано публикаций: {done}, с ошибками: {failed}.'
+        ))
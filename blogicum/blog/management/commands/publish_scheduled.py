@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from blog.publication import (PUBLISH_POLL_INTERVAL, next_publication_at,
+                              publish_due_posts)
+
+MIN_SLEEP = 0.5
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит в ленту отложенные публикации, дата которых наступила. '
+        'С флагом --loop работает постоянно и просыпается '
+        'к ближайшей запланированной публикации.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать в цикле, а не выполнить один проход.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=PUBLISH_POLL_INTERVAL,
+            help='Максимальная пауза между проходами, в секундах.'
+        )
+
+    def handle(self, *args, loop, interval, **options):
+        if interval <= 0:
+            raise CommandError('--interval должен быть положительным.')
+        while True:
+            published = publish_due_posts()
+            if published:
+                self.stdout.write(f'Опубликовано записей: {published}')
+            if not loop:
+                return
+            try:
+                time.sleep(self.seconds_to_next(interval))
+            except KeyboardInterrupt:
+                return
+
+    @staticmethod
+    def seconds_to_next(interval):
+        next_at = next_publication_at()
+        if next_at is None:
+            return interval
+        delay = (next_at - timezone.now()).total_seconds()
+        return min(interval, max(delay, MIN_SLEEP))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import SEARCH_BATCH_SIZE, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает поисковый индекс публикаций и комментариев '
+        'пачками по id.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=SEARCH_BATCH_SIZE,
+            help='Сколько строк индексировать за одну транзакцию.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        total = rebuild_search_index(batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано публикаций и комментариев: {total}.'
+        ))
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count
+
+from blog.models import Comment, Post
+from blogicum.sqlite import write_transaction
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает денормализованные счётчики комментариев '
+        'Post.comment_count пакетами по первичному ключу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество публикаций в одной транзакции.'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только проверить счётчики, ничего не исправляя.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Псевдоним базы данных (по умолчанию default).'
+        )
+
+    def handle(self, *args, batch_size, check, database, **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        checked = mismatched = 0
+        last_pk = 0
+        posts_queryset = Post.objects.using(database).order_by('pk').only(
+            'pk', 'comment_count'
+        )
+        while True:
+            # Проверка только читает и не берёт блокировку записи.
+            begin = transaction.atomic if check else write_transaction
+            with begin(using=database):
+                posts = list(
+                    posts_queryset.filter(pk__gt=last_pk)[:batch_size]
+                )
+                if not posts:
+                    break
+                last_pk = posts[-1].pk
+                actual = dict(
+                    Comment.objects.using(database).filter(
+                        post_id__in=[post.pk for post in posts]
+                    ).order_by().values_list('post_id').annotate(Count('pk'))
+                )
+                stale = []
+                for post in posts:
+                    count = actual.get(post.pk, 0)
+                    if post.comment_count != count:
+                        post.comment_count = count
+                        stale.append(post)
+                if stale and not check:
+                    Post.objects.using(database).bulk_update(
+                        stale, ['comment_count']
+                    )
+            checked += len(posts)
+            mismatched += len(stale)
+        summary = (
+            f'Проверено публикаций: {checked}, '
+            f'расхождений: {mismatched}.'
+        )
+        if check and mismatched:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blogicum.replicas import ReplicaError, replica_aliases, sync_replica
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную базу SQLite в реплики для чтения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', action='append', dest='aliases',
+            help='Реплика из DATABASE_REPLICAS; по умолчанию все.'
+        )
+        parser.add_argument(
+            '--interval', type=float,
+            help='Повторять копирование раз в столько секунд.'
+        )
+
+    def handle(self, *args, aliases, interval, **options):
+        aliases = aliases or replica_aliases()
+        unknown = set(aliases) - set(replica_aliases())
+        if unknown:
+            raise CommandError(
+                f'Нет в DATABASE_REPLICAS: {", ".join(sorted(unknown))}'
+            )
+        if not aliases:
+            raise CommandError('Реплики не настроены (DATABASE_REPLICAS).')
+        while True:
+            for alias in aliases:
+                started = time.perf_counter()
+                try:
+                    sync_replica(alias)
+                except ReplicaError as error:
+                    raise CommandError(error)
+                self.stdout.write(
+                    f'{alias}: скопирована за '
+                    f'{(time.perf_counter() - started) * 1000:.0f} мс'
+                )
+            if interval is None:
+                return
+            time.sleep(interval)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blogicum.write_queue import reset_write_stats, write_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает, как очередь записи группирует записи в пачки.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Обнулить счётчики после вывода.'
+        )
+
+    def handle(self, *args, reset, **options):
+        stats = write_stats()
+        self.stdout.write(
+            f'пачек {stats["batches"]}, записей {stats["writes"]}, '
+            f'в среднем {stats["batch_size"]:.1f} в пачке, '
+            f'ожидание в очереди {stats["wait_ms"]:.2f} мс, '
+            f'пачка {stats["commit_ms"]:.2f} мс, '
+            f'ошибок {stats["failures"]}, не дождались {stats["timeouts"]}'
+        )
+        if reset:
+            reset_write_stats()
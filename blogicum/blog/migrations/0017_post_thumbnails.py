@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 22:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Размеры оригинала и ширины созданных копий.', verbose_name='Уменьшенные копии фото'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Поисковый индекс FTS5; триггеры ставит blog.search на post_migrate."""
+
+    dependencies = [
+        ('blog', '0017_post_thumbnails'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            [
+                '''
+                CREATE VIRTUAL TABLE blog_post_search USING fts5(
+                    title, text, comments, post_id UNINDEXED,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+                ''',
+                '''
+                INSERT INTO blog_post_search
+                    (rowid, title, text, comments, post_id)
+                SELECT id, title, text, '', id FROM blog_post
+                ''',
+                '''
+                INSERT INTO blog_post_search
+                    (rowid, title, text, comments, post_id)
+                SELECT -id, '', '', text, post_id FROM blog_comment
+                ''',
+            ],
+            [
+                'DROP TRIGGER IF EXISTS blog_comment_search_delete',
+                'DROP TRIGGER IF EXISTS blog_comment_search_update',
+                'DROP TRIGGER IF EXISTS blog_comment_search_insert',
+                'DROP TRIGGER IF EXISTS blog_post_search_delete',
+                'DROP TRIGGER IF EXISTS blog_post_search_update',
+                'DROP TRIGGER IF EXISTS blog_post_search_insert',
+                'DROP TABLE blog_post_search',
+            ],
+        ),
+    ]
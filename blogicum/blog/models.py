@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 TITLE_MAX_LENGTH = 256
 
@@ -56,11 +58,61 @@ class Post(BaseModel):
         blank=True,
         verbose_name='Фото'
     )
+    thumbnails = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии фото',
+        help_text='Размеры оригинала и ширины созданных копий.'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Виден в ленте',
+        help_text='Выставляется автоматически, когда публикация '
+                  'опубликована и наступила дата публикации.'
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=Q(is_visible=True),
+                name='post_visible_feed_idx'
+            ),
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=Q(is_visible=True),
+                name='post_visible_category_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx'
+            ),
+            models.Index(
+                fields=['pub_date'],
+                condition=Q(is_published=True, is_visible=False),
+                name='post_scheduled_idx'
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.is_visible = self.is_due(timezone.now())
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'is_visible'}
+        super().save(*args, **kwargs)
+
+    def is_due(self, now):
+        return self.is_published and self.pub_date <= now
 
 
 class Category(BaseModel):
@@ -121,3 +173,9 @@ class Comment(BaseModel):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at'],
+                name='comment_post_created_idx'
+            ),
+        ]
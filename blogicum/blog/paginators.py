@@ -0,0 +1,138 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class ValuesRow:
+    """Строка values() с доступом к полям как к атрибутам объекта."""
+
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+
+class CursorPage(Sequence):
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<CursorPage of %s items>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по набору полей сортировки.
+
+    Вместо OFFSET/LIMIT страница выбирается условием по значениям
+    ключей последней показанной записи, поэтому стоимость запроса
+    не зависит от глубины прокрутки, а COUNT(*) не выполняется.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = self.ordering[0].startswith('-')
+
+    def page(self, cursor=None):
+        direction, values = self.decode_cursor(cursor)
+        queryset = self.queryset
+        backwards = direction == PREVIOUS
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(values, backwards))
+        if backwards:
+            ordering = [self._reverse(name) for name in self.ordering]
+        else:
+            ordering = self.ordering
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or backwards:
+                next_cursor = self.encode_cursor(rows[-1], NEXT)
+            if (has_more and backwards) or (values and not backwards):
+                previous_cursor = self.encode_cursor(rows[0], PREVIOUS)
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+    def encode_cursor(self, obj, direction):
+        if isinstance(obj, dict):
+            obj = ValuesRow(obj)
+        values = [
+            self._field(name).value_to_string(obj) for name in self.fields
+        ]
+        payload = json.dumps([direction] + values, separators=(',', ':'))
+        return base64.urlsafe_b64encode(
+            payload.encode()
+        ).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return NEXT, None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, *raw_values = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            if direction not in (NEXT, PREVIOUS):
+                raise ValueError
+            if len(raw_values) != len(self.fields):
+                raise ValueError
+            values = [
+                self._field(name).to_python(raw)
+                for name, raw in zip(self.fields, raw_values)
+            ]
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise InvalidCursor('Некорректный курсор страницы.')
+        return direction, values
+
+    def _keyset_filter(self, values, backwards):
+        after = self.descending == backwards
+        lookup = 'gt' if after else 'lt'
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            step = Q(**{f'{name}__{lookup}': values[index]})
+            for prev_name, prev_value in zip(self.fields, values[:index]):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        return condition
+
+    def _field(self, name):
+        return self.queryset.model._meta.get_field(name)
+
+    @staticmethod
+    def _reverse(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
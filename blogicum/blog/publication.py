@@ -0,0 +1,85 @@
+from django.core.cache import cache
+from django.db.models import Min
+from django.dispatch import Signal
+from django.utils import timezone
+
+from blogicum.sqlite import write_transaction
+
+from .locks import get_lock
+from .models import Post
+
+NEXT_PUBLICATION_KEY = 'blog:publication:next'
+NOTHING_SCHEDULED = 'nothing'
+# Как часто publish_scheduled проверяет очередь. Столько же живёт
+# отметка NOTHING_SCHEDULED: если сброс отметки не дошёл (запись в
+# обход сигналов, кэш другого процесса), публикация опоздает не больше,
+# чем при работе только publish_scheduled.
+PUBLISH_POLL_INTERVAL = 60
+# Сколько секунд держится блокировка публикации, если её владелец упал.
+PUBLISH_LOCK_TIMEOUT = 30
+
+# Отправляется после того, как отложенные публикации попали в ленту;
+# аргументы: post_ids, category_ids, author_ids.
+posts_published = Signal()
+
+
+def scheduled_posts():
+    return Post.objects.filter(is_published=True, is_visible=False)
+
+
+def next_publication_at():
+    return scheduled_posts().aggregate(next=Min('pub_date'))['next']
+
+
+def forget_next_publication():
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def publish_due_posts(now=None):
+    now = now or timezone.now()
+    with write_transaction():
+        due = list(
+            scheduled_posts().filter(pub_date__lte=now).values_list(
+                'pk', 'category_id', 'author_id'
+            )
+        )
+        if due:
+            Post.objects.filter(
+                pk__in=[pk for pk, _, _ in due]
+            ).update(is_visible=True)
+    forget_next_publication()
+    if due:
+        post_ids, category_ids, author_ids = zip(*due)
+        posts_published.send(
+            sender=Post,
+            post_ids=list(post_ids),
+            category_ids={pk for pk in category_ids if pk is not None},
+            author_ids=set(author_ids),
+        )
+    return len(due)
+
+
+def publish_if_due(now=None):
+    """Публикует наступившие отложенные публикации из запроса чтения.
+
+    Время следующей публикации берётся из кэша. Когда оно наступило,
+    публикует только один запрос — владелец блокировки; остальные
+    ничего не пишут и не ждут его.
+    """
+    now = now or timezone.now()
+    due_at = cache.get(NEXT_PUBLICATION_KEY)
+    if due_at is None:
+        due_at = next_publication_at() or NOTHING_SCHEDULED
+        cache.set(
+            NEXT_PUBLICATION_KEY, due_at,
+            PUBLISH_POLL_INTERVAL if due_at == NOTHING_SCHEDULED else None
+        )
+    if due_at == NOTHING_SCHEDULED or due_at > now:
+        return 0
+    lock = get_lock(NEXT_PUBLICATION_KEY, PUBLISH_LOCK_TIMEOUT)
+    if not lock.acquire():
+        return 0
+    try:
+        return publish_due_posts(now)
+    finally:
+        lock.release()
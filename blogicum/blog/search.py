@@ -0,0 +1,330 @@
+import re
+from contextlib import contextmanager
+
+from django.db import connections, models
+from django.db.models import Max, Min
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from blogicum.sqlite import write_transaction
+
+from .models import Comment, Post
+from .paginators import CursorPaginator
+
+# Виртуальная таблица FTS5 (миграция 0018_post_search): строка на
+# каждую публикацию (rowid = id, колонки title и text) и на каждый
+# комментарий (rowid = -id, колонка comments). post_id — публикация
+# строки, по ней найденное собирается в публикации. Таблицу
+# поддерживают триггеры SEARCH_TRIGGERS, и каждая запись в блог меняет
+# в индексе одну строку.
+SEARCH_TABLE = 'blog_post_search'
+# Вес совпадений в заголовке, тексте и комментариях для bm25().
+SEARCH_WEIGHTS = (10.0, 5.0, 1.0)
+SEARCH_ORDERING = ('rank', 'id')
+SEARCH_MAX_TERMS = 8
+SEARCH_BATCH_SIZE = 500
+SNIPPET_TOKENS = 24
+# Границы совпадений — управляющие символы, которых нет в тексте:
+# текст сначала экранируется, и только потом они заменяются на <mark>.
+MARK_START, MARK_END = '\x02', '\x03'
+
+# Функция скрытой колонки rank. bm25() нельзя вызвать внутри
+# агрегата, а rank — можно: MIN(rank) — лучшая строка публикации.
+RANK_FUNCTION = 'bm25({weights})'.format(
+    weights=', '.join(str(weight) for weight in SEARCH_WEIGHTS),
+)
+HIGHLIGHTS_SQL = f'''
+    SELECT rowid, post_id,
+        highlight({SEARCH_TABLE}, 0, '{MARK_START}', '{MARK_END}'),
+        snippet({SEARCH_TABLE}, -1, '{MARK_START}', '{MARK_END}', '…',
+                {SNIPPET_TOKENS})
+    FROM {SEARCH_TABLE}
+    WHERE {SEARCH_TABLE} MATCH %s AND rank MATCH %s
+        AND post_id IN ({{placeholders}})
+    ORDER BY rank
+'''
+# SQLite удаляет триггеры вместе с таблицей, а миграции Django
+# пересоздают таблицу при изменении полей. Поэтому триггеры не
+# замораживаются в миграции, а ставятся (IF NOT EXISTS) после каждой.
+SEARCH_TRIGGERS = (
+    f'''
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_insert
+    AFTER INSERT ON blog_post
+    BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, title, text, comments, post_id)
+        VALUES (new.id, new.title, new.text, '', new.id);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_update
+    AFTER UPDATE OF title, text ON blog_post
+    BEGIN
+        UPDATE {SEARCH_TABLE} SET title = new.title, text = new.text
+        WHERE rowid = new.id;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS blog_post_search_delete
+    AFTER DELETE ON blog_post
+    BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS blog_comment_search_insert
+    AFTER INSERT ON blog_comment
+    BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, title, text, comments, post_id)
+        VALUES (-new.id, '', '', new.text, new.post_id);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS blog_comment_search_update
+    AFTER UPDATE OF text, post_id ON blog_comment
+    BEGIN
+        UPDATE {SEARCH_TABLE} SET comments = new.text, post_id = new.post_id
+        WHERE rowid = -new.id;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS blog_comment_search_delete
+    AFTER DELETE ON blog_comment
+    BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = -old.id;
+    END
+    ''',
+)
+# Триггеры комментариев, которые снимаются на время массовой загрузки.
+COMMENT_TRIGGERS = (
+    'blog_comment_search_insert',
+    'blog_comment_search_update',
+    'blog_comment_search_delete',
+)
+# Строки индекса для каждой модели: заполнение диапазона id, условие
+# на rowid строк этого диапазона и строк за последним id.
+SEARCH_SOURCES = (
+    (
+        Post,
+        f'''
+        INSERT INTO {SEARCH_TABLE} (rowid, title, text, comments, post_id)
+        SELECT id, title, text, '', id FROM blog_post
+        WHERE id > %s AND id <= %s
+        ''',
+        'rowid > %s AND rowid <= %s',
+        'rowid > %s',
+    ),
+    (
+        Comment,
+        f'''
+        INSERT INTO {SEARCH_TABLE} (rowid, title, text, comments, post_id)
+        SELECT -id, '', '', text, post_id FROM blog_comment
+        WHERE id > %s AND id <= %s
+        ''',
+        'rowid < -%s AND rowid >= -%s',
+        'rowid < -%s',
+    ),
+)
+COMMENT_SOURCE = SEARCH_SOURCES[1]
+# Строки отдельных комментариев: для изменённых при массовой загрузке.
+COMMENT_ROWS_SQL = f'''
+    INSERT INTO {SEARCH_TABLE} (rowid, title, text, comments, post_id)
+    SELECT -id, '', '', text, post_id FROM blog_comment
+    WHERE id IN ({{placeholders}})
+'''
+
+
+def match_expression(query):
+    """Запрос FTS5 из пользовательской строки.
+
+    Каждое слово берётся в кавычки (синтаксис FTS5 не интерпретируется)
+    и ищется по префиксу; слова объединяются через AND.
+    """
+    terms = re.findall(r'\w+', query)[:SEARCH_MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_posts(queryset, query):
+    """Оставляет в queryset только найденные публикации.
+
+    Публикация найдена, если запросу соответствует она сама или один из
+    её комментариев. Добавляет rank — bm25 лучшей из этих строк (чем
+    меньше, тем релевантнее); подсветку совпадений добавляет
+    add_highlights().
+    """
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[
+            f'{SEARCH_TABLE}.post_id = blog_post.id',
+            f'{SEARCH_TABLE} MATCH %s',
+            f'{SEARCH_TABLE}.rank MATCH %s',
+        ],
+        params=[match_expression(query), RANK_FUNCTION],
+    ).annotate(
+        rank=Min(RawSQL(f'{SEARCH_TABLE}.rank', (),
+                        output_field=models.FloatField())),
+    )
+
+
+def add_highlights(posts, query):
+    """Добавляет публикациям из search_posts() фрагменты с подсветкой.
+
+    search_title — заголовок, search_snippet — фрагмент лучшей по rank
+    строки публикации: её текста или комментария. Фрагменты ищутся
+    одним запросом и только для показанных публикаций.
+    """
+    posts = {post.pk: post for post in posts}
+    for post in posts.values():
+        post.search_title, post.search_snippet = post.title, ''
+    if not posts:
+        return
+    found = set()
+    database = connections[next(iter(posts.values()))._state.db]
+    with database.cursor() as cursor:
+        cursor.execute(
+            HIGHLIGHTS_SQL.format(placeholders=', '.join(['%s'] * len(posts))),
+            [match_expression(query), RANK_FUNCTION, *posts]
+        )
+        for rowid, post_id, title, snippet in cursor.fetchall():
+            post = posts[post_id]
+            if rowid == post_id:
+                post.search_title = title
+            if post_id not in found:
+                found.add(post_id)
+                post.search_snippet = snippet
+
+
+def mark_highlights(value):
+    html = escape(value).replace(MARK_START, '<mark>')
+    return mark_safe(html.replace(MARK_END, '</mark>'))
+
+
+class SearchPaginator(CursorPaginator):
+    """Курсор по (rank, id): rank — аннотация, а не поле модели."""
+
+    rank_field = models.FloatField()
+    rank_field.set_attributes_from_name('rank')
+
+    def __init__(self, queryset, per_page, ordering=SEARCH_ORDERING):
+        super().__init__(queryset, per_page, ordering)
+
+    def _field(self, name):
+        if name == 'rank':
+            return self.rank_field
+        return super()._field(name)
+
+
+def install_search_triggers(using='default', **kwargs):
+    """Ставит недостающие триггеры индекса (обработчик post_migrate)."""
+    database = connections[using]
+    if database.vendor != 'sqlite':
+        return
+    with database.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [SEARCH_TABLE]
+        )
+        if cursor.fetchone() is None:
+            return
+        for statement in SEARCH_TRIGGERS:
+            cursor.execute(statement)
+
+
+def backfill_search_rows(source, last_id=0, batch_size=SEARCH_BATCH_SIZE,
+                         using='default'):
+    """Заполняет строки индекса модели source для id больше last_id.
+
+    Каждая пачка заменяет свой диапазон id в отдельной транзакции;
+    строки индекса за последним id модели удаляются. Возвращает число
+    проиндексированных строк.
+    """
+    model, backfill, rows, rows_after = source
+    database = connections[using]
+    total = 0
+    while True:
+        ids = list(model.objects.using(using).filter(
+            pk__gt=last_id
+        ).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        with write_transaction(using), database.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE {rows}',
+                [last_id, ids[-1]]
+            )
+            cursor.execute(backfill, [last_id, ids[-1]])
+        total += len(ids)
+        last_id = ids[-1]
+    with database.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE {rows_after}', [last_id]
+        )
+    return total
+
+
+def rebuild_search_index(batch_size=SEARCH_BATCH_SIZE, using='default'):
+    """Заново заполняет поисковый индекс пачками по id.
+
+    Сначала строки публикаций, затем комментариев. Каждая пачка
+    заменяет свой диапазон id в отдельной транзакции: блокировка базы не
+    держится всё перестроение, а поиск продолжает работать по ещё не
+    обновлённым строкам. Возвращает число проиндексированных строк.
+    """
+    total = sum(
+        backfill_search_rows(source, batch_size=batch_size, using=using)
+        for source in SEARCH_SOURCES
+    )
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')"
+        )
+    return total
+
+
+def reindex_comments(ids, batch_size=SEARCH_BATCH_SIZE, using='default'):
+    """Заменяет строки индекса комментариев с данными id."""
+    ids = sorted(ids)
+    database = connections[using]
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start:start + batch_size]
+        placeholders = ', '.join(['%s'] * len(batch))
+        with write_transaction(using), database.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})',
+                [-pk for pk in batch]
+            )
+            cursor.execute(
+                COMMENT_ROWS_SQL.format(placeholders=placeholders), batch
+            )
+
+
+@contextmanager
+def comments_indexed_after(using='default'):
+    """Откладывает индексацию комментариев до конца блока.
+
+    Для массовой загрузки комментариев: внутри блока триггеры
+    комментариев сняты, и строки не пишутся в индекс по одной. Блок
+    получает множество, в которое добавляет id изменённых им
+    комментариев. После блока пачками индексируются только они и новые
+    комментарии (id больше последнего до блока), и триггеры
+    возвращаются.
+    """
+    changed = set()
+    database = connections[using]
+    if database.vendor != 'sqlite':
+        yield changed
+        return
+    last_id = Comment.objects.using(using).aggregate(
+        last=Max('pk')
+    )['last'] or 0
+    with database.cursor() as cursor:
+        for name in COMMENT_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    try:
+        yield changed
+    finally:
+        install_search_triggers(using)
+        reindex_comments(
+            [pk for pk in changed if pk <= last_id], using=using
+        )
+        backfill_search_rows(COMMENT_SOURCE, last_id, using=using)
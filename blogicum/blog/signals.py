@@ -0,0 +1,132 @@
+from threading import local
+
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from .caching import (FEED, SITE, author_scope, bump_generations,
+                      bump_version, category_scope)
+from .models import Category, Comment, Location, Post, User
+from .publication import forget_next_publication, posts_published
+
+# id удаляемых сейчас авторов: их публикации удаляются каскадом.
+deleted_authors = local()
+
+
+def authors_being_deleted():
+    if not hasattr(deleted_authors, 'ids'):
+        deleted_authors.ids = set()
+    return deleted_authors.ids
+
+
+def expire_feed_pages(slugs=(), usernames=()):
+    bump_generations(
+        FEED,
+        *(category_scope(slug) for slug in slugs if slug),
+        *(author_scope(username) for username in usernames if username),
+    )
+
+
+def expire_pages_of_posts(post_ids):
+    rows = Post.objects.filter(pk__in=post_ids).values_list(
+        'category__slug', 'author__username'
+    )
+    slugs, usernames = zip(*rows) if rows else ((), ())
+    expire_feed_pages(slugs, usernames)
+
+
+def change_comment_count(post_id, delta):
+    if post_id is None:
+        return
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comment_count__gte=-delta)
+    posts.update(comment_count=F('comment_count') + delta)
+    bump_version('post', post_id)
+    expire_pages_of_posts([post_id])
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    instance._saved_post_id = instance.__dict__.get('post_id')
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    bump_version('comments', instance.post_id)
+    if created:
+        change_comment_count(instance.post_id, 1)
+    elif instance.post_id != instance._saved_post_id:
+        change_comment_count(instance._saved_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+    instance._saved_post_id = instance.post_id
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    bump_version('comments', instance.post_id)
+    change_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Post)
+def reschedule_publication(sender, instance, **kwargs):
+    if instance.is_published and not instance.is_visible:
+        forget_next_publication()
+
+
+@receiver(post_init, sender=Post)
+def remember_post_category(sender, instance, **kwargs):
+    instance._saved_category_id = instance.__dict__.get('category_id')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def expire_post_card(sender, instance, signal, **kwargs):
+    bump_version('post', instance.pk)
+    if signal is post_delete and (
+        instance.author_id in authors_being_deleted()
+    ):
+        # Удаление автора и так обновляет все страницы сайта, а чтение
+        # его имени и категорий стоило бы запросов на каждую публикацию.
+        return
+    slugs = Category.objects.filter(
+        pk__in={instance.category_id, instance._saved_category_id} - {None}
+    ).values_list('slug', flat=True)
+    expire_feed_pages(slugs, [instance.author.username])
+    instance._saved_category_id = instance.category_id
+
+
+@receiver(posts_published)
+def expire_published_pages(sender, post_ids, **kwargs):
+    expire_pages_of_posts(post_ids)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def expire_category_cards(sender, instance, **kwargs):
+    bump_version('category', instance.pk)
+    bump_generations(SITE)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def expire_location_cards(sender, instance, **kwargs):
+    bump_version('location', instance.pk)
+    bump_generations(SITE)
+
+
+@receiver(pre_delete, sender=User)
+def remember_deleted_author(sender, instance, **kwargs):
+    authors_being_deleted().add(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def expire_author_cards(sender, instance, update_fields=None, **kwargs):
+    authors_being_deleted().discard(instance.pk)
+    if update_fields is None or 'username' in update_fields:
+        bump_version('user', instance.pk)
+        bump_generations(SITE)
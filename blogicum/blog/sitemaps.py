@@ -0,0 +1,293 @@
+import gzip
+import os
+import posixpath
+import zlib
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Max
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views import View
+
+from .models import Category, Post, User
+
+# Ширина диапазона id одной части карты сайта. Протокол допускает до
+# 50 000 адресов в файле; диапазон меньше, чтобы часть строилась одним
+# коротким проходом по первичному ключу.
+SHARD_SIZE = 10000
+SITEMAP_CHUNK_SIZE = 1000
+SITEMAP_MAX_AGE = 60 * 60
+SITEMAP_CONTENT_TYPE = 'application/xml; charset=utf-8'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+INDEX_FILE = 'sitemap.xml'
+SHARD_FILE = 'sitemap-{section}-{shard}.xml'
+GZIP_SUFFIX = '.gz'
+
+
+class Section:
+    """Раздел карты сайта: модель, видимые объекты и их адреса."""
+
+    name = None
+    model = None
+    fields = ('pk',)
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def location(self, *values):
+        raise NotImplementedError
+
+    def lastmod(self, *values):
+        return None
+
+    def shard_count(self):
+        """Число частей по максимальному id в таблице (индекс PK)."""
+        max_pk = self.model.objects.aggregate(max_pk=Max('pk'))['max_pk']
+        return (max_pk - 1) // SHARD_SIZE + 1 if max_pk else 0
+
+    def entries(self, shard):
+        rows = self.get_queryset().filter(
+            pk__gt=shard * SHARD_SIZE,
+            pk__lte=(shard + 1) * SHARD_SIZE,
+        ).order_by('pk').values_list(*self.fields)
+        for values in rows.iterator(chunk_size=SITEMAP_CHUNK_SIZE):
+            yield self.location(*values), self.lastmod(*values)
+
+
+class PostSection(Section):
+    name = 'posts'
+    model = Post
+    fields = ('pk', 'pub_date')
+
+    def get_queryset(self):
+        return Post.objects.filter(
+            is_visible=True,
+            category__is_published=True
+        )
+
+    def location(self, pk, pub_date):
+        return reverse('blog:post_detail', args=[pk])
+
+    def lastmod(self, pk, pub_date):
+        return pub_date
+
+
+class CategorySection(Section):
+    name = 'categories'
+    model = Category
+    fields = ('slug',)
+
+    def get_queryset(self):
+        return Category.objects.filter(is_published=True)
+
+    def location(self, slug):
+        return reverse('blog:category_posts', args=[slug])
+
+
+class ProfileSection(Section):
+    name = 'profiles'
+    model = User
+    fields = ('username',)
+
+    def get_queryset(self):
+        return User.objects.filter(is_active=True)
+
+    def location(self, username):
+        return reverse('blog:profile', args=[username])
+
+
+SECTIONS = {
+    section.name: section
+    for section in (PostSection(), CategorySection(), ProfileSection())
+}
+
+
+def shard_name(section, shard):
+    return SHARD_FILE.format(section=section, shard=shard)
+
+
+def url_tag(tag, location, lastmod=None):
+    parts = [f'<{tag}><loc>{escape(location)}</loc>']
+    if lastmod is not None:
+        parts.append(f'<lastmod>{lastmod.date().isoformat()}</lastmod>')
+    parts.append(f'</{tag}>\n')
+    return ''.join(parts)
+
+
+def stream_index(base_url):
+    yield f'{XML_HEADER}<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for section in SECTIONS.values():
+        yield ''.join(
+            url_tag('sitemap', base_url + reverse(
+                'blog:sitemap_shard', args=[section.name, shard]
+            ))
+            for shard in range(section.shard_count())
+        )
+    yield '</sitemapindex>\n'
+
+
+def stream_shard(base_url, section, shard):
+    yield f'{XML_HEADER}<urlset xmlns="{SITEMAP_NS}">\n'
+    chunk = []
+    for location, lastmod in section.entries(shard):
+        chunk.append(url_tag('url', base_url + location, lastmod))
+        if len(chunk) >= SITEMAP_CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append('</urlset>\n')
+    yield ''.join(chunk)
+
+
+def gzip_stream(chunks):
+    """Сжимает поток кусков в gzip, не собирая его целиком."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding):
+    """Принимает ли клиент gzip по заголовку Accept-Encoding.
+
+    Учитывает веса: «gzip;q=0» означает отказ от gzip, а «*» без
+    явного gzip — согласие на любое сжатие.
+    """
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, *params = (value.strip() for value in part.split(';'))
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights.setdefault(coding.lower(), weight)
+    return weights.get('gzip', weights.get('*', 0.0)) > 0
+
+
+def indexed_files(directory):
+    """Имена файлов частей из индекса, собранного в directory раньше."""
+    path = os.path.join(directory, INDEX_FILE + GZIP_SUFFIX)
+    loc_tag = f'{{{SITEMAP_NS}}}loc'
+    try:
+        with gzip.open(path) as index:
+            locations = [
+                element.text
+                for _, element in ElementTree.iterparse(index)
+                if element.tag == loc_tag and element.text
+            ]
+    except (OSError, EOFError, ElementTree.ParseError):
+        return set()
+    return {
+        posixpath.basename(urlsplit(location).path) + GZIP_SUFFIX
+        for location in locations
+    }
+
+
+def write_sitemap(directory, filename, chunks):
+    """Пишет сжатую часть карты сайта атомарно (через временный файл)."""
+    path = os.path.join(directory, filename + GZIP_SUFFIX)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as output:
+        for data in gzip_stream(chunks):
+            output.write(data)
+    os.replace(temporary, path)
+    return path
+
+
+def build_sitemaps(directory, base_url):
+    """Собирает индекс и все части карты сайта в directory.
+
+    Возвращает список записанных файлов. Части из прошлого индекса,
+    которых больше нет, удаляются, чтобы не отдавать устаревшие адреса;
+    остальные файлы в directory не трогаются.
+    """
+    os.makedirs(directory, exist_ok=True)
+    previous = indexed_files(directory)
+    written = [write_sitemap(directory, INDEX_FILE, stream_index(base_url))]
+    for section in SECTIONS.values():
+        for shard in range(section.shard_count()):
+            written.append(write_sitemap(
+                directory, shard_name(section.name, shard),
+                stream_shard(base_url, section, shard),
+            ))
+    for name in previous:
+        path = os.path.join(directory, name)
+        if path not in written and os.path.exists(path):
+            os.remove(path)
+    return written
+
+
+class SitemapView(View):
+    """Отдаёт часть карты сайта: готовый файл с диска или поток.
+
+    Файлы, собранные командой build_sitemaps, отдаются как есть с
+    Content-Encoding: gzip. Без них ответ строится на лету и тоже
+    сжимается, если клиент принимает gzip.
+    """
+
+    def get_filename(self):
+        raise NotImplementedError
+
+    def stream(self, base_url):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        filename = self.get_filename()
+        use_gzip = accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        prebuilt = os.path.join(
+            settings.SITEMAP_ROOT, filename + GZIP_SUFFIX
+        )
+        if use_gzip and os.path.exists(prebuilt):
+            response = FileResponse(
+                open(prebuilt, 'rb'), content_type=SITEMAP_CONTENT_TYPE
+            )
+            response['Content-Encoding'] = 'gzip'
+        else:
+            chunks = self.stream(request.build_absolute_uri('/')[:-1])
+            if use_gzip:
+                response = StreamingHttpResponse(
+                    gzip_stream(chunks), content_type=SITEMAP_CONTENT_TYPE
+                )
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = StreamingHttpResponse(
+                    (chunk.encode() for chunk in chunks),
+                    content_type=SITEMAP_CONTENT_TYPE
+                )
+        patch_vary_headers(response, ('Accept-Encoding',))
+        patch_cache_control(response, public=True, max_age=SITEMAP_MAX_AGE)
+        return response
+
+
+class SitemapIndexView(SitemapView):
+
+    def get_filename(self):
+        return INDEX_FILE
+
+    def stream(self, base_url):
+        return stream_index(base_url)
+
+
+class SitemapShardView(SitemapView):
+
+    def get(self, request, *args, section, shard, **kwargs):
+        self.section = SECTIONS.get(section)
+        if self.section is None or shard >= self.section.shard_count():
+            raise Http404('Такой части карты сайта нет.')
+        return super().get(request, *args, **kwargs)
+
+    def get_filename(self):
+        return shard_name(self.section.name, self.kwargs['shard'])
+
+    def stream(self, base_url):
+        return stream_shard(base_url, self.section, self.kwargs['shard'])
@@ -0,0 +1,204 @@
+import random
+from collections import Counter
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from blogicum.sqlite import write_transaction
+
+from .caching import SITE, bump_generations
+from .models import Category, Comment, Location, Post, User
+from .publication import forget_next_publication
+from .search import comments_indexed_after
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_PASSWORD = 'blogicum'
+# Показатель закона Ципфа: несколько авторов, категорий и публикаций
+# собирают большую часть публикаций и комментариев, как в живом блоге.
+ZIPF_EXPONENT = 1.1
+UNPUBLISHED_SHARE = 0.05
+SCHEDULED_SHARE = 0.03
+NO_LOCATION_SHARE = 0.3
+MAX_PARAGRAPHS = 6
+HISTORY = timedelta(days=3 * 365)
+SCHEDULE = timedelta(days=30)
+
+
+def zipf_weights(size, exponent=ZIPF_EXPONENT):
+    """Накопленные веса для random.choices(cum_weights=...)."""
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, size + 1)
+    ))
+
+
+def last_pk(model):
+    return model.objects.aggregate(last=Max('pk'))['last'] or 0
+
+
+class DataGenerator:
+    """Наполняет базу правдоподобными данными для замеров.
+
+    Тексты генерирует Faker, распределения — генератор случайных чисел
+    с заданным зерном, поэтому при одинаковых параметрах данные
+    повторяются. Строки пишутся bulk_create пачками по batch_size;
+    сигналы не отправляются, поэтому счётчики комментариев и видимость
+    публикаций заполняются сразу, а версии кэша сбрасываются в конце.
+    Комментарии попадают в поисковый индекс одним перестроением после
+    загрузки.
+    """
+
+    def __init__(self, seed=0, batch_size=DEFAULT_BATCH_SIZE,
+                 password=DEFAULT_PASSWORD):
+        self.random = random.Random(seed)
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(seed)
+        self.batch_size = batch_size
+        self.password = password
+        self.now = timezone.now()
+
+    def generate(self, users, categories, locations, posts, comments):
+        author_ids = self.make_users(users)
+        category_ids = self.make_categories(categories)
+        location_ids = self.make_locations(locations)
+        post_ids = []
+        if author_ids and category_ids and posts:
+            comment_targets = self.skewed(range(posts), comments)
+            post_ids = self.make_posts(
+                posts, author_ids, category_ids, location_ids,
+                Counter(comment_targets)
+            )
+            with comments_indexed_after():
+                self.make_comments(
+                    [post_ids[index] for index in comment_targets],
+                    author_ids
+                )
+        forget_next_publication()
+        bump_generations(SITE)
+        return {
+            'users': len(author_ids),
+            'categories': len(category_ids),
+            'locations': len(location_ids),
+            'posts': len(post_ids),
+            'comments': comments if post_ids else 0,
+        }
+
+    def skewed(self, population, k):
+        """Выборка из k элементов population: немногие выпадают чаще."""
+        population = list(population)
+        if not population:
+            return []
+        self.random.shuffle(population)
+        return self.random.choices(
+            population, cum_weights=zipf_weights(len(population)), k=k
+        )
+
+    def save(self, model, objects):
+        """Пишет объекты пачками и возвращает их id по порядку.
+
+        SQLite не возвращает id из bulk_create, поэтому новые id
+        читаются как всё, что больше последнего id до вставки.
+        """
+        before = last_pk(model)
+        with write_transaction():
+            model.objects.bulk_create(objects, batch_size=self.batch_size)
+        return list(model.objects.filter(pk__gt=before).order_by(
+            'pk'
+        ).values_list('pk', flat=True))
+
+    def make_users(self, count):
+        password = make_password(self.password)
+        first = last_pk(User) + 1
+        return self.save(User, [
+            User(
+                username=f'{self.faker.user_name()}_{first + index}',
+                first_name=self.faker.first_name(),
+                last_name=self.faker.last_name(),
+                email=self.faker.email(),
+                password=password,
+            )
+            for index in range(count)
+        ])
+
+    def make_categories(self, count):
+        first = last_pk(Category) + 1
+        return self.save(Category, [
+            Category(
+                title=self.faker.sentence(nb_words=2).rstrip('.'),
+                description=self.faker.paragraph(nb_sentences=2),
+                slug=f'category-{first + index}',
+                is_published=self.random.random() > UNPUBLISHED_SHARE,
+            )
+            for index in range(count)
+        ])
+
+    def make_locations(self, count):
+        return self.save(Location, [
+            Location(
+                name=self.faker.city(),
+                is_published=self.random.random() > UNPUBLISHED_SHARE,
+            )
+            for _ in range(count)
+        ])
+
+    def make_post(self, author_id, category_id, location_ids,
+                  comment_count):
+        scheduled = self.random.random() < SCHEDULED_SHARE
+        is_published = self.random.random() > UNPUBLISHED_SHARE
+        if scheduled:
+            pub_date = self.now + SCHEDULE * self.random.random()
+        else:
+            pub_date = self.now - HISTORY * self.random.random()
+        has_location = (
+            location_ids and self.random.random() > NO_LOCATION_SHARE
+        )
+        return Post(
+            title=self.faker.sentence(nb_words=5).rstrip('.'),
+            text='\n\n'.join(self.faker.paragraphs(
+                nb=self.random.randint(1, MAX_PARAGRAPHS)
+            )),
+            pub_date=pub_date,
+            author_id=author_id,
+            category_id=category_id,
+            location_id=(
+                self.random.choice(location_ids) if has_location else None
+            ),
+            is_published=is_published,
+            is_visible=is_published and not scheduled,
+            comment_count=comment_count,
+            thumbnails={},
+        )
+
+    def make_posts(self, count, author_ids, category_ids, location_ids,
+                   comment_counts):
+        authors = self.skewed(author_ids, count)
+        categories = self.skewed(category_ids, count)
+        post_ids = []
+        for start in range(0, count, self.batch_size):
+            post_ids += self.save(Post, [
+                self.make_post(authors[index], categories[index],
+                               location_ids, comment_counts[index])
+                for index in range(start, min(start + self.batch_size, count))
+            ])
+        return post_ids
+
+    def make_comments(self, post_ids, author_ids):
+        commenters = self.skewed(author_ids, len(post_ids))
+        for start in range(0, len(post_ids), self.batch_size):
+            end = start + self.batch_size
+            with write_transaction():
+                Comment.objects.bulk_create([
+                    Comment(
+                        text=self.faker.sentence(
+                            nb_words=self.random.randint(3, 30)
+                        ),
+                        post_id=post_id,
+                        author_id=author_id,
+                    )
+                    for post_id, author_id in zip(
+                        post_ids[start:end], commenters[start:end]
+                    )
+                ])
@@ -0,0 +1,52 @@
+from django.contrib.auth.tokens import default_token_generator
+from django.template import loader
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from jobs.mail import deliver
+
+from .models import Post, User
+from .thumbnails import update_thumbnails
+
+
+def make_post_thumbnails(post_id, image_name, previous_name=''):
+    """Фоновая задача: копии фото публикации после создания или правки.
+
+    Если фото успели заменить ещё раз, задача ничего не делает — копии
+    построит задача, поставленная последней правкой.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or post.image.name != image_name:
+        return
+    update_thumbnails(post, previous_name)
+
+
+def send_password_reset_email(user_id, subject_template_name,
+                              email_template_name, context, from_email,
+                              html_email_template_name=None):
+    """Фоновая задача: письмо со ссылкой для сброса пароля.
+
+    Ссылка (uid и токен) строится здесь, а не при постановке задачи:
+    аргументы задач лежат в базе открытым текстом и видны в админке.
+    """
+    user = User.objects.filter(pk=user_id, is_active=True).first()
+    if user is None:
+        return
+    context = {
+        **context,
+        'user': user,
+        'uid': urlsafe_base64_encode(force_bytes(user.pk)),
+        'token': default_token_generator.make_token(user),
+    }
+    subject = ''.join(
+        loader.render_to_string(subject_template_name, context).splitlines()
+    )
+    body = loader.render_to_string(email_template_name, context)
+    html_message = None
+    if html_email_template_name is not None:
+        html_message = loader.render_to_string(
+            html_email_template_name, context
+        )
+    deliver(subject, body, from_email, [getattr(
+        user, User.get_email_field_name()
+    )], html_message)
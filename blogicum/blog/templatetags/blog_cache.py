@@ -0,0 +1,71 @@
+from django import template
+
+from blog.caching import get_fragments, post_card_objects, set_fragment
+
+register = template.Library()
+
+POST_CARD = 'post_card'
+# Переменная контекста с фрагментами карточек, загруженными тегом
+# prefetch_post_cards для всей страницы.
+PREFETCHED_CARDS = 'prefetched_post_cards'
+
+
+def load_cards(posts):
+    return get_fragments(
+        POST_CARD, {post.pk: post_card_objects(post) for post in posts}
+    )
+
+
+class PostCardCacheNode(template.Node):
+
+    def __init__(self, nodelist, post):
+        self.nodelist = nodelist
+        self.post = post
+
+    def render(self, context):
+        post = self.post.resolve(context)
+        prefetched = context.get(PREFETCHED_CARDS) or {}
+        if post.pk not in prefetched:
+            prefetched = load_cards([post])
+        version, fragment = prefetched[post.pk]
+        if fragment is None:
+            fragment = self.nodelist.render(context)
+            set_fragment(POST_CARD, post.pk, version, fragment)
+        return fragment
+
+
+class PrefetchPostCardsNode(template.Node):
+
+    def __init__(self, posts):
+        self.posts = posts
+
+    def render(self, context):
+        context[PREFETCHED_CARDS] = load_cards(self.posts.resolve(context))
+        return ''
+
+
+@register.tag
+def cache_post_card(parser, token):
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            f'Тег {bits[0]} принимает ровно один аргумент — публикацию.'
+        )
+    nodelist = parser.parse(('endcache_post_card',))
+    parser.delete_first_token()
+    return PostCardCacheNode(nodelist, parser.compile_filter(bits[1]))
+
+
+@register.tag
+def prefetch_post_cards(parser, token):
+    """Загружает кэш карточек всех публикаций страницы одним запросом.
+
+    Карточки cache_post_card ниже по шаблону берут версии и фрагменты
+    из этой загрузки, а не обращаются к кэшу каждая по отдельности.
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            f'Тег {bits[0]} принимает ровно один аргумент — публикации.'
+        )
+    return PrefetchPostCardsNode(parser.compile_filter(bits[1]))
@@ -0,0 +1,40 @@
+from django import template
+
+from blog.thumbnails import image_variants
+
+register = template.Library()
+
+# Карточка публикации не шире 40rem, на узких экранах — во всю ширину.
+POST_IMAGE_SIZES = '(max-width: 40rem) 100vw, 40rem'
+
+
+def _srcset(candidates):
+    return ', '.join(f'{url} {width}w' for url, width in candidates)
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, lazy=False):
+    """Фото публикации с srcset по уменьшенным копиям.
+
+    Ширина и высота оригинала выводятся в атрибутах img, чтобы браузер
+    резервировал место под фото до загрузки.
+    """
+    variants = image_variants(post)
+    original = post.image.url
+    width = post.thumbnails.get('width')
+    return {
+        'post': post,
+        'src': variants[0][2]['jpg'] if variants else original,
+        'original': original,
+        'width': width,
+        'height': post.thumbnails.get('height'),
+        'webp_srcset': _srcset(
+            (urls['webp'], width) for width, _, urls in variants
+        ),
+        'jpeg_srcset': _srcset(
+            [(urls['jpg'], width) for width, _, urls in variants]
+            + [(original, width)]
+        ) if variants else '',
+        'sizes': POST_IMAGE_SIZES,
+        'lazy': lazy,
+    }
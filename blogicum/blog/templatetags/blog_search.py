@@ -0,0 +1,11 @@
+from django import template
+
+from blog.search import mark_highlights
+
+register = template.Library()
+
+
+@register.filter
+def highlighted(value):
+    """Экранирует найденный фрагмент и выделяет совпадения тегом mark."""
+    return mark_highlights(value)
@@ -0,0 +1,129 @@
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Ширины уменьшенных копий фото публикации. Копии шире оригинала
+# не создаются.
+THUMBNAIL_WIDTHS = (320, 640, 960, 1280)
+# Расширение файла -> (формат Pillow, параметры сохранения).
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+# Копии каждого фото лежат в своём каталоге с полным именем оригинала:
+# имена оригиналов в хранилище уникальны, поэтому копии photo.jpg и
+# photo.png не пересекаются ни друг с другом, ни с оригиналами.
+THUMBNAIL_NAME = '{directory}/thumbnails/{filename}/{width}w.{ext}'
+
+
+def thumbnail_name(name, width, ext):
+    directory, filename = posixpath.split(name)
+    return THUMBNAIL_NAME.format(
+        directory=directory, filename=filename, width=width, ext=ext
+    ).lstrip('/')
+
+
+def thumbnail_widths(original_width):
+    return [width for width in THUMBNAIL_WIDTHS if width < original_width]
+
+
+def scaled_height(width, original_width, original_height):
+    return max(1, round(original_height * width / original_width))
+
+
+def image_variants(post):
+    """Уменьшенные копии фото публикации для srcset.
+
+    Возвращает список (ширина, высота, {расширение: url}) по
+    возрастанию ширины — только для копий, записанных в
+    post.thumbnails при их создании.
+    """
+    if not (post.image and post.thumbnails):
+        return []
+    storage = post.image.storage
+    original_width = post.thumbnails['width']
+    original_height = post.thumbnails['height']
+    return [
+        (
+            width,
+            scaled_height(width, original_width, original_height),
+            {
+                ext: storage.url(thumbnail_name(post.image.name, width, ext))
+                for ext in THUMBNAIL_FORMATS
+            },
+        )
+        for width in post.thumbnails['widths']
+    ]
+
+
+def delete_thumbnails(storage, name):
+    """Удаляет уменьшенные копии файла name из storage."""
+    for width in THUMBNAIL_WIDTHS:
+        for ext in THUMBNAIL_FORMATS:
+            thumbnail = thumbnail_name(name, width, ext)
+            if storage.exists(thumbnail):
+                storage.delete(thumbnail)
+
+
+def _encode(image, image_format, options):
+    buffer = BytesIO()
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    image.save(buffer, image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def make_thumbnails(post):
+    """Создаёт копии фото публикации и описывает их в post.thumbnails.
+
+    Файлы кладутся в то же хранилище в каталог копий оригинала, старые
+    копии с теми же именами перезаписываются.
+    """
+    if not post.image:
+        post.thumbnails = {}
+        return
+    storage = post.image.storage
+    post.image.open('rb')
+    try:
+        with Image.open(post.image) as source:
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    finally:
+        post.image.close()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    original_width, original_height = image.size
+    widths = thumbnail_widths(original_width)
+    for width in widths:
+        resized = image.resize(
+            (width, scaled_height(width, original_width, original_height)),
+            Image.LANCZOS,
+        )
+        for ext, (image_format, options) in THUMBNAIL_FORMATS.items():
+            name = thumbnail_name(post.image.name, width, ext)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, _encode(resized, image_format, options))
+    post.thumbnails = {
+        'width': original_width,
+        'height': original_height,
+        'widths': widths,
+    }
+
+
+def update_thumbnails(post, previous_name=''):
+    """Пересобирает копии после сохранения публикации с новым фото.
+
+    previous_name — имя прежнего файла фото; его копии удаляются, если
+    фото заменили или убрали и больше ни одна публикация его не
+    показывает. Описание копий сохраняется через save(), чтобы сбросить
+    закэшированные карточки и страницы.
+    """
+    if previous_name and previous_name != post.image.name and not (
+        type(post).objects.filter(image=previous_name).exists()
+    ):
+        delete_thumbnails(post.image.storage, previous_name)
+    make_thumbnails(post)
+    post.save(update_fields=('thumbnails',))
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, sitemaps, views
 
 app_name = 'blog'
 
@@ -10,6 +10,11 @@ urlpatterns = [
         views.UserProfileView.as_view(),
         name='profile'
     ),
+    path(
+        'profile/<slug:username>/feed/<str:feed_format>/',
+        feeds.AuthorFeedView.as_view(),
+        name='author_feed'
+    ),
     path(
         'profile/<slug:username>/edit/',
         views.EditProfileView.as_view(),
@@ -35,6 +40,11 @@ urlpatterns = [
         views.DeletePostView.as_view(),
         name='delete_post'
     ),
+    path(
+        'posts/<int:pk>/comments/',
+        views.PostCommentsView.as_view(),
+        name='comments'
+    ),
     path(
         'posts/<int:pk>/comment/',
         views.AddCommentView.as_view(),
@@ -50,6 +60,51 @@ urlpatterns = [
         views.DeleteCommentView.as_view(),
         name='delete_comment'
     ),
+    path(
+        'category/<slug:slug>/feed/<str:feed_format>/',
+        feeds.CategoryFeedView.as_view(),
+        name='category_feed'
+    ),
+    path(
+        'feed/<str:feed_format>/',
+        feeds.PostFeedView.as_view(),
+        name='feed'
+    ),
+    path(
+        'api/posts/',
+        api.PostListApiView.as_view(),
+        name='api_posts'
+    ),
+    path(
+        'api/posts/<int:pk>/',
+        api.PostApiView.as_view(),
+        name='api_post'
+    ),
+    path(
+        'api/posts/<int:pk>/comments/',
+        api.CommentListApiView.as_view(),
+        name='api_comments'
+    ),
+    path(
+        'api/categories/<slug:slug>/posts/',
+        api.CategoryPostsApiView.as_view(),
+        name='api_category_posts'
+    ),
+    path(
+        'search/',
+        views.SearchView.as_view(),
+        name='search'
+    ),
+    path(
+        'sitemap.xml',
+        sitemaps.SitemapIndexView.as_view(),
+        name='sitemap_index'
+    ),
+    path(
+        'sitemap-<slug:section>-<int:shard>.xml',
+        sitemaps.SitemapShardView.as_view(),
+        name='sitemap_shard'
+    ),
     path
     (
         'category/<slug:slug>/',
@@ -1,8 +1,7 @@
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
-from django.http import Http404
-from django.utils import timezone
-from django.db.models import Count
+from django.http import (Http404, HttpResponsePermanentRedirect,
+                         HttpResponseRedirect)
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic.edit import FormMixin
 from django.views.generic import (ListView,
@@ -12,14 +11,33 @@ from django.views.generic import (ListView,
                                   UpdateView
                                   )
 
+from blogicum.conditional import (ConditionalGetMixin, mark_outdated,
+                                  templates_mtime)
+from blogicum.replicas import read_from_replica, service_writes
+from blogicum.sqlite import write_transaction
+from blogicum.write_queue import WriteTimeout, overloaded_response, run_write
+from jobs.queue import enqueue
+
 from .models import (Post,
                      Category,
                      User,
                      Comment)
+from .caching import (FEED, GENERATION, PAGE_HARD_TIMEOUT,
+                      PAGE_SOFT_TIMEOUT, SITE, author_scope, category_scope,
+                      get_or_set_fresh, page_cache_key, page_objects,
+                      page_version, version_info)
 from .forms import (CreatePostForm,
                     AddCommentForm,)
+from .paginators import CursorPaginator, InvalidCursor
+from .publication import publish_if_due
+from .search import (SEARCH_ORDERING, SearchPaginator, add_highlights,
+                     match_expression, search_posts)
+from .tasks import make_post_thumbnails
 
 PAGINATE_VALUE = 10
+COMMENTS_PAGINATE_VALUE = 10
+POSTS_ORDERING = ('-pub_date', '-id')
+COMMENTS_ORDERING = ('created_at', 'id')
 POSTS_RELATED_OBJECTS = Post.objects.select_related(
     'category',
     'location',
@@ -27,65 +45,313 @@ POSTS_RELATED_OBJECTS = Post.objects.select_related(
 )
 
 
-class PostListView(ListView):
+def paginate_comments(request, post_id):
+    paginator = CursorPaginator(
+        Comment.objects.select_related('author').filter(post_id=post_id),
+        COMMENTS_PAGINATE_VALUE,
+        COMMENTS_ORDERING
+    )
+    try:
+        return paginator.page(request.GET.get('cursor'))
+    except InvalidCursor as error:
+        raise Http404(str(error))
+
+
+class CursorPaginationMixin:
+    """Страницы списка по курсору.
+
+    Старые ссылки с номером страницы (?page=N) перенаправляются на
+    первую страницу: номер требует COUNT(*) и OFFSET, цена которых
+    растёт с глубиной страницы.
+    """
+
+    cursor_kwarg = 'cursor'
+    cursor_ordering = POSTS_ORDERING
+    cursor_paginator_class = CursorPaginator
+
+    def dispatch(self, request, *args, **kwargs):
+        return self.page_number_redirect() or super().dispatch(
+            request, *args, **kwargs
+        )
+
+    def page_number_redirect(self):
+        if self.page_kwarg not in self.request.GET:
+            return None
+        query = self.request.GET.copy()
+        query.pop(self.page_kwarg)
+        query.pop(self.cursor_kwarg, None)
+        url = self.request.path
+        if query:
+            url = f'{url}?{query.urlencode()}'
+        return HttpResponsePermanentRedirect(url)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.cursor_paginator_class(
+            queryset, page_size, self.cursor_ordering
+        )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class ScheduledPublicationMixin:
+
+    def dispatch(self, request, *args, **kwargs):
+        self.publish_scheduled()
+        return super().dispatch(request, *args, **kwargs)
+
+    def publish_scheduled(self):
+        with service_writes():
+            return publish_if_due()
+
+
+class AnonymousPageCacheMixin:
+    page_cache_soft_timeout = PAGE_SOFT_TIMEOUT
+    page_cache_hard_timeout = PAGE_HARD_TIMEOUT
+
+    def get_cache_scopes(self):
+        return (SITE, FEED)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        def render_page():
+            response = super(AnonymousPageCacheMixin, self).dispatch(
+                request, *args, **kwargs
+            )
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+
+        return self.get_cached_response(render_page)
+
+    def get_cached_response(self, render_page):
+        return get_or_set_fresh(
+            page_cache_key(self.request),
+            render_page,
+            version=page_version(self.get_cache_scopes()),
+            soft_timeout=self.page_cache_soft_timeout,
+            hard_timeout=self.page_cache_hard_timeout,
+            cacheable=lambda response: (
+                response.status_code == 200 and not response.cookies
+            ),
+            on_stale=mark_outdated,
+        )
+
+
+class VersionedConditionalMixin(ConditionalGetMixin):
+    """Валидаторы страницы из версий в кэше и времени правки шаблонов.
+
+    Версии меняются сигналами при любом изменении публикаций,
+    комментариев, категорий, мест и авторов, поэтому для ответа 304
+    хватает чтения кэша без запросов к публикациям.
+    """
+
+    def get_versioned_objects(self):
+        return page_objects(self.get_cache_scopes())
+
+    def get_validators(self):
+        version, changed_at = version_info(*self.get_versioned_objects())
+        templates_changed_at = templates_mtime()
+        return (
+            (version, templates_changed_at),
+            max(changed_at, templates_changed_at),
+        )
+
+
+class ReplicaReadMixin:
+    """Читает страницу с реплики, если реплика не отстала от неё.
+
+    Время последнего изменения данных страницы берётся из тех же
+    валидаторов, что и для ответа 304, поэтому выбор реплики не стоит
+    лишних запросов. Ставится перед VersionedConditionalMixin.
+    """
+
+    def get_validators(self):
+        parts, changed_at = super().get_validators()
+        read_from_replica(changed_at)
+        return parts, changed_at
+
+
+class SingleObjectCacheMixin:
+    """Загружает объект страницы один раз за запрос.
+
+    Проверки доступа в dispatch и обработчики UpdateView/DeleteView
+    получают один и тот же экземпляр, поэтому повторного запроса к базе
+    нет.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if getattr(self, '_cached_object', None) is None:
+            self._cached_object = super().get_object()
+        return self._cached_object
+
+
+class AuthorRequiredMixin(LoginRequiredMixin, SingleObjectCacheMixin):
+    """Пускает к изменению объекта только его автора.
+
+    Остальных пользователей отправляет на страницу публикации.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        if self.get_object().author_id != request.user.id:
+            return redirect('blog:post_detail', pk=kwargs['pk'])
+        return super().dispatch(request, *args, **kwargs)
+
+
+class PostObjectMixin(SingleObjectCacheMixin):
+    model = Post
+    queryset = POSTS_RELATED_OBJECTS
+
+
+class CommentObjectMixin(SingleObjectCacheMixin):
+    model = Comment
+    pk_url_kwarg = 'comment_id'
+
+    def get_queryset(self):
+        return Comment.objects.filter(post_id=self.kwargs['pk'])
+
+
+class SerializedWriteMixin:
+    """Сохраняет проверенную форму через очередь записи.
+
+    При WRITE_QUEUE_ENABLED в общем потоке записи (blogicum.write_queue)
+    выполняется только save_form(); проверка формы и ответ остаются в
+    потоке запроса. Без очереди save_form() вызывается здесь же.
+    """
+
+    def save_form(self, form):
+        return form.save()
+
+    def form_valid(self, form):
+        try:
+            self.object = run_write(self.save_form, form)
+        except WriteTimeout:
+            return overloaded_response()
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class PostListView(CursorPaginationMixin,
+                   ScheduledPublicationMixin,
+                   ReplicaReadMixin,
+                   VersionedConditionalMixin,
+                   AnonymousPageCacheMixin,
+                   ListView):
     template_name = 'blog/index.html'
     model = Post
     queryset = POSTS_RELATED_OBJECTS.filter(
-        pub_date__lt=timezone.now(),
-        is_published=True,
+        is_visible=True,
         category__is_published=True
-    ).annotate(comment_count=Count('comment'))
-    ordering = '-pub_date'
+    )
+    ordering = POSTS_ORDERING
     paginate_by = PAGINATE_VALUE
 
 
-class PostDetailView(FormMixin, DetailView):
-    model = Post
+class PostDetailView(ReplicaReadMixin, VersionedConditionalMixin,
+                     PostObjectMixin, FormMixin, DetailView):
     form_class = AddCommentForm
-    queryset = POSTS_RELATED_OBJECTS
 
-    def dispatch(self, request, *args, **kwargs):
-        post = get_object_or_404(Post, pk=kwargs['pk'])
-        if not post.is_published and post.author != request.user:
+    def get_versioned_objects(self):
+        return (
+            ('post', self.kwargs['pk']),
+            ('comments', self.kwargs['pk']),
+            (GENERATION, SITE),
+        )
+
+    def get_object(self, queryset=None):
+        post = super().get_object(queryset)
+        if not post.is_published and post.author_id != self.request.user.id:
             raise Http404
-        return super().dispatch(request, *args, **kwargs)
+        return post
 
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['comments'] = Comment.objects.select_related(
-            'author',
-            'post'
-        ).filter(post__id=self.kwargs['pk'])
-        return context
+        if 'comments' not in kwargs:
+            kwargs['comments'] = paginate_comments(
+                self.request, self.kwargs['pk']
+            )
+        return super().get_context_data(**kwargs)
+
 
+class PostCommentsView(PostDetailView):
+    template_name = 'includes/comment_list.html'
 
-class CategoryPostsView(ListView):
+
+class CategoryPostsView(CursorPaginationMixin,
+                        ScheduledPublicationMixin,
+                        ReplicaReadMixin,
+                        VersionedConditionalMixin,
+                        AnonymousPageCacheMixin,
+                        ListView):
     template_name = 'blog/category.html'
+    category = None
     paginate_by = PAGINATE_VALUE
 
+    def get_cache_scopes(self):
+        return (SITE, category_scope(self.kwargs['slug']))
+
+    def get_category(self):
+        if self.category is None:
+            self.category = get_object_or_404(
+                Category.objects.all(),
+                slug=self.kwargs['slug'],
+                is_published=True
+            )
+        return self.category
+
     def get_queryset(self):
-        category = get_object_or_404(
-            Category.objects.all(),
-            slug=self.kwargs['slug'],
-            is_published=True
-        )
+        self.get_category()
+        return self.get_posts()
+
+    def get_posts(self):
         return POSTS_RELATED_OBJECTS.filter(
-            is_published=True,
-            pub_date__lt=timezone.now(),
-            category__id=category.id
+            is_visible=True,
+            category__slug=self.kwargs['slug'],
+            category__is_published=True
         ).order_by(
-            '-pub_date'
-        ).annotate(
-            comment_count=Count('comment')
+            *POSTS_ORDERING
         )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category.objects.all(),
-            is_published=True,
-            slug=self.kwargs['slug']
+        context['category'] = self.get_category()
+        return context
+
+
+class SearchView(CursorPaginationMixin, ScheduledPublicationMixin, ListView):
+    """Поиск по заголовкам, текстам и комментариям публикаций.
+
+    Результаты упорядочены по релевантности (bm25) и листаются курсором
+    по (rank, id); видимость та же, что в общей ленте.
+    """
+
+    template_name = 'blog/search.html'
+    paginate_by = PAGINATE_VALUE
+    cursor_ordering = SEARCH_ORDERING
+    cursor_paginator_class = SearchPaginator
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        posts = POSTS_RELATED_OBJECTS.filter(
+            is_visible=True,
+            category__is_published=True
         )
+        query = self.get_query()
+        found = search_posts(posts, query)
+        return found if match_expression(query) else found.none()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_query()
+        add_highlights(context['page_obj'], context['query'])
         return context
 
 
@@ -93,45 +359,42 @@ class CreatePostView(LoginRequiredMixin, CreateView):
     form_class = CreatePostForm
     template_name = 'blog/create.html'
 
+    @write_transaction()
     def form_valid(self, form):
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        if self.object.image:
+            enqueue(make_post_thumbnails, self.object.pk,
+                    self.object.image.name)
+        return response
 
     def get_success_url(self):
         return reverse('blog:profile', kwargs={'username': self.request.user})
 
 
-class EditPostView(LoginRequiredMixin, UpdateView):
-    model = Post
+class EditPostView(SerializedWriteMixin, AuthorRequiredMixin, PostObjectMixin,
+                   UpdateView):
     template_name = 'blog/create.html'
     fields = ('title', 'text', 'category', 'location', 'image')
 
-    def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(Post, pk=kwargs['pk'])
-        if instance.author != request.user:
-            return redirect('blog:post_detail', pk=kwargs['pk'])
-        return super().dispatch(request, *args, **kwargs)
+    def save_form(self, form):
+        previous_image = form.initial.get('image')
+        post = super().save_form(form)
+        if 'image' in form.changed_data:
+            enqueue(make_post_thumbnails, post.pk, post.image.name,
+                    previous_image.name if previous_image else '')
+        return post
 
     def get_success_url(self):
         return reverse('blog:post_detail', kwargs={'pk': self.kwargs['pk']})
 
 
-class DeletePostView(LoginRequiredMixin, DeleteView):
-    model = Post
+class DeletePostView(AuthorRequiredMixin, PostObjectMixin, DeleteView):
     template_name = 'blog/create.html'
     success_url = reverse_lazy('blog:index')
 
-    def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(Post, pk=kwargs['pk'])
-        if instance.author != request.user:
-            return redirect('blog:post_detail', pk=kwargs['pk'])
-        return super().dispatch(request, *args, **kwargs)
-
-    def get_object(self, queryset=None):
-        return get_object_or_404(Post, id=self.kwargs['pk'])
-
 
-class AddCommentView(LoginRequiredMixin, CreateView):
+class AddCommentView(SerializedWriteMixin, LoginRequiredMixin, CreateView):
     related_post = None
     model = Comment
     form_class = AddCommentForm
@@ -147,82 +410,74 @@ class AddCommentView(LoginRequiredMixin, CreateView):
         form.instance.post = self.related_post
         return super().form_valid(form)
 
+    @write_transaction()
+    def save_form(self, form):
+        return super().save_form(form)
+
     def get_success_url(self):
         return reverse('blog:post_detail',
                        kwargs={'pk': self.related_post.id})
 
 
-class EditCommentView(LoginRequiredMixin, UpdateView):
-    model = Comment
+class EditCommentView(SerializedWriteMixin, AuthorRequiredMixin,
+                      CommentObjectMixin, UpdateView):
     template_name = 'blog/create.html'
     fields = ('text',)
 
-    def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(Comment, pk=kwargs['comment_id'])
-        if instance.author != request.user:
-            return redirect('blog:post_detail', pk=kwargs['pk'])
-        return super().dispatch(request, *args, **kwargs)
-
-    def get_object(self, queryset=None):
-        return get_object_or_404(Comment.objects.all(),
-                                 post__id=self.kwargs['pk'],
-                                 id=self.kwargs['comment_id'])
-
     def get_success_url(self):
         return reverse('blog:post_detail', kwargs={'pk': self.kwargs['pk']})
 
 
-class DeleteCommentView(LoginRequiredMixin, DeleteView):
-    model = Comment
+class DeleteCommentView(AuthorRequiredMixin, CommentObjectMixin,
+                        DeleteView):
     template_name = 'blog/comment_form.html'
 
-    def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(Comment, pk=kwargs['comment_id'])
-        if instance.author != request.user:
-            return redirect('blog:post_detail', pk=kwargs['pk'])
-        return super().dispatch(request, *args, **kwargs)
-
-    def get_object(self, queryset=None):
-        return get_object_or_404(Comment, id=self.kwargs['comment_id'],
-                                 post__id=self.kwargs['pk'])
+    @write_transaction()
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
 
     def get_success_url(self):
         return reverse('blog:post_detail',
                        kwargs={'pk': self.kwargs['pk']})
 
 
-class UserProfileView(ListView):
+class UserProfileView(CursorPaginationMixin,
+                      ScheduledPublicationMixin,
+                      ReplicaReadMixin,
+                      VersionedConditionalMixin,
+                      AnonymousPageCacheMixin,
+                      ListView):
     template_name = 'blog/profile.html'
     author = None
     model = Post
     paginate_by = PAGINATE_VALUE
 
-    def get_queryset(self):
-        self.author = get_object_or_404(
-            User.objects.all(),
-            username=self.kwargs['username']
-        )
-        if str(self.request.user) == self.author.username:
-            return POSTS_RELATED_OBJECTS.filter(
-                author__id=self.author.id
-            ).order_by(
-                '-pub_date'
-            ).annotate(
-                comment_count=Count('comment')
+    def get_cache_scopes(self):
+        return (SITE, author_scope(self.kwargs['username']))
+
+    def get_author(self):
+        if self.author is None:
+            self.author = get_object_or_404(
+                User.objects.all(),
+                username=self.kwargs['username']
             )
-        return POSTS_RELATED_OBJECTS.filter(
-            is_published=True,
-            pub_date__lt=timezone.now(),
-            author__id=self.author.id
-        ).order_by(
-            '-pub_date'
-        ).annotate(
-            comment_count=Count('comment')
+        return self.author
+
+    def get_queryset(self):
+        self.get_author()
+        return self.get_posts()
+
+    def get_posts(self):
+        posts = POSTS_RELATED_OBJECTS.filter(
+            author__username=self.kwargs['username']
         )
+        if str(self.request.user) != self.kwargs['username']:
+            posts = posts.filter(is_visible=True)
+        return posts.order_by(*POSTS_ORDERING)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = self.author
+        context['profile'] = self.get_author()
         return context
 
 
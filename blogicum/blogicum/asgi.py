@@ -2,6 +2,8 @@
 ASGI config for blogicum project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests served through it use ASGI_ROOT_URLCONF, where the read-only
+pages are async views (see blogicum.asynchronous).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -11,6 +13,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from blogicum.checks import warn_on_startup
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+warn_on_startup()
@@ -0,0 +1,155 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.cache import get_conditional_response
+
+DEFAULT_ORM_WORKERS = 8
+
+orm_executor = None
+orm_executor_lock = threading.Lock()
+
+
+def get_orm_executor():
+    """Общий пул потоков для синхронной работы асинхронных view.
+
+    Размер пула (ASYNC_ORM_WORKERS) ограничивает число соединений с
+    базой, которые асинхронные view держат одновременно.
+    """
+    global orm_executor
+    with orm_executor_lock:
+        if orm_executor is None:
+            orm_executor = ThreadPoolExecutor(
+                max_workers=getattr(
+                    settings, 'ASYNC_ORM_WORKERS', DEFAULT_ORM_WORKERS
+                ),
+                thread_name_prefix='orm',
+            )
+        return orm_executor
+
+
+def call_in_worker(function, args, kwargs):
+    # Потоки пула живут дольше запроса, поэтому устаревшие и сломанные
+    # соединения закрываются здесь, как в начале обычного запроса.
+    close_old_connections()
+    return function(*args, **kwargs)
+
+
+async def run_orm(function, *args, **kwargs):
+    """Выполняет синхронную function в пуле get_orm_executor().
+
+    Вызов видит контекст текущего запроса (contextvars), поэтому
+    маршрутизация по репликам и счётчики запросов работают и в потоках
+    пула.
+    """
+    return await sync_to_async(
+        call_in_worker, thread_sensitive=False, executor=get_orm_executor()
+    )(function, args, kwargs)
+
+
+async def run_orm_together(*functions):
+    """Выполняет независимые функции без аргументов одновременно."""
+    return await asyncio.gather(
+        *(run_orm(function) for function in functions)
+    )
+
+
+class AsyncViewMixin:
+    """Асинхронный вариант view чтения с ConditionalGetMixin.
+
+    Ставится перед синхронным классом и переиспользует его валидаторы,
+    запросы и шаблоны. Всё, что обращается к базе, кэшу и шаблонам,
+    выполняется через run_orm, а независимые части — одновременно:
+    сначала get_preparations(), затем, если не 304, загрузчики из
+    get_loaders(). Страница собирается render_loaded() из их
+    результатов.
+    """
+
+    http_method_names = ['get', 'head']
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Django 3.2 запускает view без перехода в поток, только если
+        # as_view() вернул корутинную функцию.
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        return functools.update_wrapper(async_view, view)
+
+    def get_preparations(self):
+        return [self.resolve_user]
+
+    def resolve_user(self):
+        # Ленивый request.user читает сессию и пользователя из базы;
+        # в цикле событий это запрещено.
+        return self.request.user.pk
+
+    def get_loaders(self):
+        return {}
+
+    def render_loaded(self, loaded):
+        response = self.render_to_response(self.get_context_data(**loaded))
+        response.render()
+        return response
+
+    def render_sequentially(self):
+        return self.render_loaded({
+            name: load() for name, load in self.get_loaders().items()
+        })
+
+    async def render(self):
+        loaders = self.get_loaders()
+        values = await run_orm_together(*loaders.values())
+        return await run_orm(self.render_loaded, dict(zip(loaders, values)))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() not in self.http_method_names:
+            return self.http_method_not_allowed(request, *args, **kwargs)
+        await run_orm_together(*self.get_preparations())
+        parts, changed_at = await run_orm(self.get_validators)
+        etag = self.get_etag(parts)
+        last_modified = int(changed_at)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = await self.render()
+            if response.status_code != 200:
+                return response
+        return self.add_validators(response, etag, last_modified)
+
+
+class AsyncUrlconfMiddleware:
+    """Направляет запросы через ASGI на ASGI_ROOT_URLCONF.
+
+    Там страницы чтения заменены асинхронными вариантами; через WSGI
+    те же адреса обслуживают обычные view, которым не нужен цикл
+    событий.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Как MiddlewareMixin: Django проверяет этот признак, чтобы
+            # вызывать middleware как корутину.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        urlconf = getattr(settings, 'ASGI_ROOT_URLCONF', None)
+        if urlconf:
+            request.urlconf = urlconf
+        return await self.get_response(request)
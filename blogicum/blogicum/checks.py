@@ -0,0 +1,75 @@
+import logging
+
+from django.conf import settings
+from django.core.checks import Warning, register
+
+logger = logging.getLogger(__name__)
+
+DEBUG_APPS = ('debug_toolbar',)
+DEBUG_MIDDLEWARE = (
+    'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'blogicum.query_budget.QueryBudgetMiddleware',
+)
+# Кэши, которые не видны другим процессам сервера: версии страниц в
+# них расходятся между процессами, и страницы отдаются устаревшими.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+
+
+def uses_cached_loader(template_settings):
+    loaders = template_settings.get('OPTIONS', {}).get('loaders') or ()
+    return any(
+        (loader[0] if isinstance(loader, (list, tuple)) else loader)
+        == CACHED_LOADER
+        for loader in loaders
+    )
+
+
+@register()
+def check_production_settings(app_configs=None, **kwargs):
+    """Предупреждает об отладочных компонентах в боевом окружении."""
+    if getattr(settings, 'ENVIRONMENT', None) != 'prod':
+        return []
+    warnings = []
+    if settings.DEBUG:
+        warnings.append(Warning(
+            'DEBUG включён в боевом окружении.', id='blogicum.W001'
+        ))
+    for app in DEBUG_APPS:
+        if app in settings.INSTALLED_APPS:
+            warnings.append(Warning(
+                f'Отладочное приложение {app} в INSTALLED_APPS.',
+                id='blogicum.W002',
+            ))
+    for middleware in DEBUG_MIDDLEWARE:
+        if middleware in settings.MIDDLEWARE:
+            warnings.append(Warning(
+                f'Отладочный middleware {middleware} в MIDDLEWARE.',
+                id='blogicum.W003',
+            ))
+    if settings.CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES:
+        warnings.append(Warning(
+            'Кэш по умолчанию не общий для процессов сервера.',
+            hint='Задайте MEMCACHED_LOCATION или файловый кэш.',
+            id='blogicum.W004',
+        ))
+    if not all(uses_cached_loader(engine) for engine in settings.TEMPLATES):
+        warnings.append(Warning(
+            'Шаблоны загружаются без кэширующего загрузчика.',
+            id='blogicum.W005',
+        ))
+    return warnings
+
+
+def warn_on_startup():
+    """Пишет предупреждения проверки в лог при запуске сервера.
+
+    Проверки Django выполняются командами manage.py, но не при
+    запуске через gunicorn или uvicorn; поэтому wsgi.py и asgi.py
+    вызывают проверку сами.
+    """
+    for warning in check_production_settings():
+        logger.warning('%s', warning)
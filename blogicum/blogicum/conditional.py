@@ -0,0 +1,92 @@
+import functools
+import hashlib
+import os
+
+from django.conf import settings
+from django.template import engines
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def templates_mtime():
+    """Время последнего изменения шаблонов проекта (каталоги DIRS).
+
+    С DEBUG каталоги обходятся при каждом вызове, и правка шаблона сразу
+    меняет валидаторы страниц. Без DEBUG шаблоны меняются только с
+    выкладкой и перезапуском, поэтому обход делается раз на процесс.
+    """
+    if settings.DEBUG:
+        return scan_templates_mtime()
+    return deployed_templates_mtime()
+
+
+def scan_templates_mtime():
+    latest = 0.0
+    for engine in engines.all():
+        for directory in engine.dirs:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    latest = max(
+                        latest, os.path.getmtime(os.path.join(root, name))
+                    )
+    return latest
+
+
+@functools.lru_cache(maxsize=None)
+def deployed_templates_mtime():
+    return scan_templates_mtime()
+
+
+def mark_outdated(response):
+    """Помечает ответ, который не соответствует текущим валидаторам."""
+    response.outdated = True
+    return response
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 Not Modified, не выполняя основную работу view.
+
+    Наследник задаёт get_validators(), которая дёшево (по версиям в
+    кэше, времени изменения файлов) возвращает части ETag и время
+    последнего изменения в секундах. По умолчанию страница зависит от
+    пользователя, поэтому его id входит в ETag, а ответ помечается
+    private и no-cache: браузер обязан сверяться с сервером перед
+    показом копии. Общие для всех ответы задают vary_on_user = False и
+    свои cache_control. Ответ, помеченный mark_outdated(), собран по
+    старым данным и уходит без валидаторов: иначе клиент получил бы
+    устаревшую страницу с ETag новой и дальше получал бы на неё 304.
+    """
+
+    vary_on_user = True
+    cache_control = {'private': True, 'no_cache': True}
+
+    def get_validators(self):
+        raise NotImplementedError
+
+    def get_etag(self, parts):
+        if self.vary_on_user:
+            parts = (*parts, self.request.user.pk or 0)
+        key = ':'.join(str(part) for part in parts)
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        parts, changed_at = self.get_validators()
+        etag = self.get_etag(parts)
+        last_modified = int(changed_at)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return self.add_validators(response, etag, last_modified)
+
+    def add_validators(self, response, etag, last_modified):
+        if not getattr(response, 'outdated', False):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, **self.cache_control)
+        return response
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Максимальное число SQL-запросов на один запрос к странице,
+# включая чтение сессии и пользователя, точки сохранения транзакций
+# и пересчёт даты ближайшей отложенной публикации в лентах. Бюджет
+# не должен зависеть от количества публикаций и комментариев в базе.
+# У потоковых ответов (RSS/Atom, карта сайта) учитываются только
+# запросы до начала отдачи тела.
+QUERY_BUDGETS = {
+    'blog:index': 4,
+    'blog:category_posts': 6,
+    'blog:profile': 5,
+    'blog:edit_profile': 4,
+    'blog:create_post': 4,
+    'blog:post_detail': 4,
+    'blog:comments': 4,
+    'blog:edit_post': 5,
+    'blog:delete_post': 3,
+    'blog:add_comment': 8,
+    'blog:edit_comment': 4,
+    'blog:delete_comment': 3,
+    'blog:feed': 1,
+    'blog:category_feed': 2,
+    'blog:author_feed': 2,
+    'blog:search': 4,
+    'blog:api_posts': 4,
+    'blog:api_post': 4,
+    'blog:api_comments': 4,
+    'blog:api_category_posts': 4,
+    'blog:sitemap_index': 1,
+    'blog:sitemap_shard': 2,
+    'pages:about': 2,
+    'pages:rules': 2,
+}
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with self.lock:
+                self.count += 1
+                self.duration += time.perf_counter() - start
+
+
+# Счётчики текущего запроса по псевдонимам баз. Контекстная переменная,
+# а не execute_wrapper на соединениях потока запроса: асинхронные view
+# выполняют запросы в потоках пула (blogicum.asynchronous).
+request_counters = ContextVar('request_counters', default=None)
+
+
+def count_queries(execute, sql, params, many, context):
+    counters = request_counters.get()
+    if counters is None:
+        return execute(sql, params, many, context)
+    alias = context['connection'].alias
+    return counters[alias](execute, sql, params, many, context)
+
+
+def query_counting_enabled():
+    """Подключён ли QueryBudgetMiddleware — единственный читатель счётчиков.
+
+    Без него (в prod) count_queries не ставится на соединения, и
+    запросы не проходят через лишнюю обёртку.
+    """
+    return f'{__name__}.QueryBudgetMiddleware' in settings.MIDDLEWARE
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """Обработчик connection_created: подключает count_queries."""
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+class QueryBudgetMiddleware:
+    """Считает и замеряет SQL-запросы каждого запроса (dev/test).
+
+    Результат отдаётся в заголовках X-Query-Count и X-Query-Time, а
+    разбивка по базам (основная, реплики) — в X-Query-Count-By-Alias;
+    превышение бюджета из QUERY_BUDGETS пишется в лог, а при
+    QUERY_BUDGET_STRICT = True приводит к исключению.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        counters = defaultdict(QueryCounter)
+        token = request_counters.set(counters)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_counters.reset(token)
+        return self.report(request, response, counters)
+
+    async def __acall__(self, request):
+        counters = defaultdict(QueryCounter)
+        token = request_counters.set(counters)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_counters.reset(token)
+        return self.report(request, response, counters)
+
+    def report(self, request, response, counters):
+        count = sum(counter.count for counter in counters.values())
+        duration = sum(counter.duration for counter in counters.values())
+        response['X-Query-Count'] = str(count)
+        response['X-Query-Time'] = f'{duration * 1000:.1f}ms'
+        response['X-Query-Count-By-Alias'] = ', '.join(
+            f'{alias}={counter.count}'
+            for alias, counter in counters.items() if counter.count
+        )
+        match = request.resolver_match
+        budget = QUERY_BUDGETS.get(match.view_name) if match else None
+        if budget is not None and count > budget:
+            message = (
+                f'{request.method} {request.path} ({match.view_name}): '
+                f'{count} SQL-запросов при бюджете {budget}'
+            )
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
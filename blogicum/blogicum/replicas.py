@@ -0,0 +1,215 @@
+import asyncio
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+POSITION_KEY = 'replica:{alias}:position'
+STICKY_COOKIE = 'primary_until'
+DEFAULT_STICKY_SECONDS = 10
+DEFAULT_POSITION_MARGIN = 1.0
+# Приложения, чьи чтения может обслужить реплика: их данные покрыты
+# версиями страниц. Сессии, пользователи и задания читаются только из
+# основной базы — отставшая реплика разлогинила бы пользователя.
+REPLICA_APPS = ('blog',)
+
+
+class ReplicaError(Exception):
+    pass
+
+
+class RoutingState:
+    """Куда читать в рамках одного запроса.
+
+    replica — выбранная реплика или None (читать с основной базы).
+    wrote — запрос уже что-то записал; после этого он читает только
+    основную базу. pinned — пользователь недавно писал (cookie
+    STICKY_COOKIE), и реплики для него закрыты на весь запрос.
+    """
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+        self.replica = None
+
+
+routing_state = ContextVar('routing_state', default=None)
+# Служебные записи запроса чтения (см. service_writes). Отдельная
+# переменная, а не поле RoutingState: асинхронные view выполняют их
+# одновременно с другими частями запроса, у которых состояние общее.
+in_service_write = ContextVar('in_service_write', default=False)
+
+
+@contextmanager
+def service_writes():
+    """Записи в блоке не прилепляют пользователя к основной базе.
+
+    Для записей, которые запрос чтения делает не по воле пользователя,
+    например вывода отложенных публикаций в ленту. Иначе любой
+    анонимный читатель, попавший на такой запрос, получал бы cookie
+    STICKY_COOKIE и читал только основную базу. Чтения внутри блока
+    идут в основную базу.
+    """
+    token = in_service_write.set(True)
+    try:
+        yield
+    finally:
+        in_service_write.reset(token)
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def set_replica_position(alias, position):
+    cache.set(POSITION_KEY.format(alias=alias), position, None)
+
+
+def replica_positions(aliases):
+    """Время снимка основной базы, который содержит каждая реплика."""
+    keys = {alias: POSITION_KEY.format(alias=alias) for alias in aliases}
+    values = cache.get_many(keys.values())
+    return {alias: values.get(key) for alias, key in keys.items()}
+
+
+def fresh_replica(changed_at):
+    """Случайная реплика, в которой уже есть изменения до changed_at."""
+    fresh = [
+        alias
+        for alias, position in replica_positions(replica_aliases()).items()
+        if position is not None and position >= changed_at
+    ]
+    return random.choice(fresh) if fresh else None
+
+
+def read_from_replica(changed_at):
+    """Переводит чтение текущего запроса на свежую реплику, если можно.
+
+    changed_at — время последнего изменения данных страницы (по версиям
+    в кэше). Реплика, снятая раньше, показала бы устаревшую страницу,
+    поэтому такой запрос остаётся на основной базе.
+    """
+    state = routing_state.get()
+    if state is None or state.pinned or state.wrote or not replica_aliases():
+        return None
+    state.replica = fresh_replica(changed_at)
+    return state.replica
+
+
+class ReplicaRouter:
+    """Чтение с реплики только по явному выбору, запись — в основную базу.
+
+    Запросы, для которых view не вызвал read_from_replica(), модели
+    вне REPLICA_APPS и все запросы после первой записи идут в основную
+    базу, как без маршрутизатора.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if model._meta.app_label not in REPLICA_APPS:
+            return None
+        if state is not None and state.replica and not (
+            state.wrote or in_service_write.get()
+        ):
+            return state.replica
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None and not in_service_write.get():
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Заводит RoutingState на каждый запрос и прилипание к основной базе.
+
+    После запроса с записью ставится cookie STICKY_COOKIE на
+    REPLICA_STICKY_SECONDS секунд: пока она жива, этот пользователь
+    читает только основную базу и видит свои изменения, даже если
+    реплика ещё не догнала её. Работает и в WSGI, и в ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        state = self.start(request)
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        state = self.start(request)
+        token = routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(state, response)
+
+    def start(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(STICKY_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0.0
+        return RoutingState(pinned=pinned_until > time.time())
+
+    def finish(self, state, response):
+        if state.wrote and replica_aliases():
+            sticky = getattr(
+                settings, 'REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS
+            )
+            response.set_cookie(
+                STICKY_COOKIE, f'{time.time() + sticky:.3f}',
+                max_age=sticky, httponly=True, samesite='Lax',
+            )
+        return response
+
+
+def sync_replica(alias, using=DEFAULT_DB_ALIAS):
+    """Копирует основную базу SQLite в реплику alias.
+
+    Копия делается backup API SQLite поверх открытой реплики, поэтому
+    её читатели видят либо старый, либо новый снимок целиком. Позиция
+    реплики — время начала копии за вычетом REPLICA_POSITION_MARGIN:
+    запас на расхождение часов процессов, которые меняют версии в кэше
+    после коммита, и процесса, который копирует базу.
+    """
+    source, target = connections[using], connections[alias]
+    if source.vendor != 'sqlite' or target.vendor != 'sqlite':
+        raise ReplicaError('Копировать можно только базу SQLite в SQLite.')
+    started = time.time()
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
+    position = started - getattr(
+        settings, 'REPLICA_POSITION_MARGIN', DEFAULT_POSITION_MARGIN
+    )
+    set_replica_position(alias, position)
+    return position
@@ -0,0 +1,20 @@
+"""
+Settings for the environment named in BLOGICUM_ENV.
+
+dev (the default) is for local work and tests; prod is for deployment:
+    BLOGICUM_ENV=prod DJANGO_SECRET_KEY=... gunicorn blogicum.wsgi
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+ENVIRONMENT = os.environ.get('BLOGICUM_ENV', 'dev')
+
+if ENVIRONMENT == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif ENVIRONMENT == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(
+        f'BLOGICUM_ENV={ENVIRONMENT!r}: ожидается dev или prod.'
+    )
@@ -1,7 +1,9 @@
 """
-Django settings for blogicum project.
+Django settings for blogicum project: common to all environments.
 
-Generated by 'django-admin startproject' using Django 3.2.16.
+Generated by 'django-admin startproject' using Django 3.2.16. The
+environment-specific modules (dev, prod) import everything from here;
+blogicum.settings picks one of them by the BLOGICUM_ENV variable.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/topics/settings/
@@ -12,7 +14,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 
 # Quick-start development settings - unsuitable for production
@@ -22,7 +24,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-wa)8)&k_x6o$s0g8l2t873(1ed2m9+@g!+vzushvdqb6l=p52s'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = False
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -34,13 +36,13 @@ ALLOWED_HOSTS = [
 INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
+    'jobs.apps.JobsConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'debug_toolbar',
     'django_bootstrap5',
 ]
 
@@ -52,6 +54,9 @@ STATICFILES_DIRS = [
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Карта сайта, заранее собранная командой build_sitemaps.
+SITEMAP_ROOT = BASE_DIR / 'sitemaps'
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
@@ -61,22 +66,27 @@ LOGIN_REDIRECT_URL = 'blog:index'
 LOGIN_URL = 'login'
 
 MIDDLEWARE = [
+    'blogicum.asynchronous.AsyncUrlconfMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'blogicum.replicas.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
-INTERNAL_IPS = [
-    '127.0.0.1',
-]
+QUERY_BUDGET_STRICT = False
 
 ROOT_URLCONF = 'blogicum.urls'
 
+# Адреса для запросов через ASGI: страницы чтения — асинхронные view.
+ASGI_ROOT_URLCONF = 'blogicum.urls_async'
+
+# Потоков, в которых асинхронные view работают с базой и шаблонами.
+ASYNC_ORM_WORKERS = 8
+
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
@@ -108,6 +118,44 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения (blogicum/replicas.py): псевдонимы из DATABASES,
+# с которых читают ленту, категории, профили и публикации, если реплика
+# не отстала от версий страницы. Реплику SQLite обновляет команда
+# sync_replica.
+DATABASE_ROUTERS = ['blogicum.replicas.ReplicaRouter']
+DATABASE_REPLICAS = []
+# Сколько секунд после записи пользователь читает только основную базу.
+REPLICA_STICKY_SECONDS = 10
+# На сколько секунд позиция реплики считается раньше начала копии.
+REPLICA_POSITION_MARGIN = 1.0
+
+# PRAGMA для каждого нового соединения с SQLite (blogicum/sqlite.py).
+# WAL пускает читателей параллельно с писателем; synchronous=NORMAL в
+# режиме WAL не теряет целостность при сбое, только последние
+# транзакции при отключении питания; cache_size — в КиБ со знаком минус.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'memory',
+}
+
+# Транзакции записи (blogicum.sqlite.write_transaction) начинаются с
+# BEGIN IMMEDIATE; транзакции только для чтения — как обычно.
+SQLITE_IMMEDIATE_TRANSACTIONS = True
+
+# Очередь записи (blogicum/write_queue.py): комментарии, правка
+# публикаций и list_editable в админке сохраняются одним потоком на
+# процесс, пачками по WRITE_QUEUE_BATCH_SIZE за одну транзакцию.
+WRITE_QUEUE_ENABLED = False
+WRITE_QUEUE_BATCH_SIZE = 50
+# Сколько секунд ждать попутные записи после первой в пачке.
+WRITE_QUEUE_MAX_DELAY = 0.002
+# Сколько секунд запрос ждёт начала своей записи; дальше — ответ 503.
+WRITE_QUEUE_TIMEOUT = 5.0
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
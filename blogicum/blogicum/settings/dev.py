@@ -0,0 +1,36 @@
+"""Development settings: debug mode, django-debug-toolbar, query budgets.
+
+BLOGICUM_REPLICA=1 adds a local read replica, a copy of db.sqlite3
+refreshed by ``manage.py sync_replica --interval 5``.
+"""
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, DATABASES, INSTALLED_APPS, MIDDLEWARE
+
+ENVIRONMENT = 'dev'
+
+DEBUG = True
+
+INSTALLED_APPS = [*INSTALLED_APPS, 'debug_toolbar']
+
+MIDDLEWARE = [
+    'blogicum.query_budget.QueryBudgetMiddleware',
+    *MIDDLEWARE,
+    'debug_toolbar.middleware.DebugToolbarMiddleware',
+]
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
+
+if os.environ.get('BLOGICUM_REPLICA'):
+    DATABASES = {
+        **DATABASES,
+        'replica': {
+            **DATABASES['default'],
+            'NAME': BASE_DIR / 'db.replica.sqlite3',
+            'TEST': {'MIRROR': 'default'},
+        },
+    }
+    DATABASE_REPLICAS = ['replica']
@@ -0,0 +1,83 @@
+"""
+Production settings.
+
+Configured through the environment:
+    DJANGO_SECRET_KEY      required;
+    DJANGO_ALLOWED_HOSTS   comma-separated host names;
+    CONN_MAX_AGE           seconds to keep database connections open;
+    MEMCACHED_LOCATION     host:port of memcached (needs pymemcache),
+                           otherwise a file-based cache in BASE_DIR/cache.
+"""
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, DATABASES, TEMPLATES
+
+ENVIRONMENT = 'prod'
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost').split(',')
+    if host.strip()
+]
+
+# Соединение с базой живёт между запросами: не нужно каждый раз
+# открывать файл и заново выполнять SQLITE_PRAGMAS.
+DATABASES = {
+    **DATABASES,
+    'default': {
+        **DATABASES['default'],
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 600)),
+    },
+}
+
+# Шаблоны компилируются один раз на процесс.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# Версии страниц и фрагментов (blog/caching.py) должны быть общими для
+# всех процессов сервера, поэтому локальный кэш процесса не подходит.
+if os.environ.get('MEMCACHED_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.environ['MEMCACHED_LOCATION'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'cache',
+            'OPTIONS': {'MAX_ENTRIES': 100000},
+        }
+    }
+
+# Сессия читается из кэша, в базу пишется только при изменении.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_COOKIE_SECURE = True
+CSRF_COOKIE_SECURE = True
+
+# Имена файлов статики с хешем содержимого: браузеры кэшируют их навсегда.
+STATIC_ROOT = BASE_DIR / 'static'
+STATICFILES_STORAGE = (
+    'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+)
@@ -0,0 +1,98 @@
+import re
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+# Значения SQLite по умолчанию для тех же PRAGMA — чтобы замерить,
+# что дают настройки SQLITE_PRAGMAS (см. benchmark_concurrency).
+SQLITE_DEFAULTS = {
+    'journal_mode': 'delete',
+    'synchronous': 'full',
+    'mmap_size': 0,
+    'cache_size': -2000,
+    'busy_timeout': 5000,
+    'temp_store': 'default',
+}
+PRAGMA_TOKEN = re.compile(r'^[\w-]+$')
+
+
+def pragma_statements(pragmas):
+    """PRAGMA-запросы из словаря имя → значение.
+
+    Значения подставляются в текст запроса (у PRAGMA нет параметров),
+    поэтому допускаются только слова и числа.
+    """
+    statements = []
+    for name, value in pragmas.items():
+        if not (PRAGMA_TOKEN.match(name) and PRAGMA_TOKEN.match(str(value))):
+            raise ImproperlyConfigured(
+                f'Недопустимая настройка SQLite: {name} = {value!r}'
+            )
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Настраивает новое соединение с SQLite (обработчик connection_created).
+
+    Применяет SQLITE_PRAGMAS.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(
+            getattr(settings, 'SQLITE_PRAGMAS', {})
+        ):
+            cursor.execute(statement)
+
+
+@contextmanager
+def write_transaction(using=None):
+    """transaction.atomic() для блока, который будет писать в базу.
+
+    На SQLite при SQLITE_IMMEDIATE_TRANSACTIONS внешняя транзакция
+    начинается с BEGIN IMMEDIATE: блокировка записи берётся сразу и ждёт
+    busy_timeout. Иначе транзакция, которая сначала читает, а потом
+    пишет, при занятой записи сразу падает с «database is locked»:
+    SQLite не может повысить её блокировку, не нарушив уже прочитанный
+    снимок. Транзакции только для чтения остаются на transaction.atomic()
+    и не спорят с писателем за блокировку. Вложенный блок — обычная
+    точка сохранения.
+    """
+    connection = transaction.get_connection(using)
+    if (
+        connection.vendor != 'sqlite'
+        or connection.in_atomic_block
+        or not connection.get_autocommit()
+        or not getattr(settings, 'SQLITE_IMMEDIATE_TRANSACTIONS', False)
+    ):
+        with transaction.atomic(using=using):
+            yield
+        return
+    # Транзакция открывается вручную; atomic() внутри видит выключенный
+    # autocommit и только ведёт учёт блоков и колбэков on_commit.
+    connection.set_autocommit(False)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('BEGIN IMMEDIATE')
+        with transaction.atomic(using=using, savepoint=False):
+            yield
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        connection.set_autocommit(True)
+
+
+def current_pragmas(connection, names):
+    """Действующие значения PRAGMA соединения: {имя: значение}."""
+    values = {}
+    with connection.cursor() as cursor:
+        for name in names:
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    return values
@@ -14,31 +14,46 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.views import PasswordResetView
 from django.views.generic.edit import CreateView
 from django.contrib import admin
 from django.urls import include, path, reverse_lazy
 from django.conf import settings
 
-import debug_toolbar
+from blog.forms import QueuedPasswordResetForm
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
 
-urlpatterns = [
-    path(
-        'auth/registration/',
-        CreateView.as_view(
-            template_name='registration/registration_form.html',
-            form_class=UserCreationForm,
-            success_url=reverse_lazy('blog:index'),
+
+def site_urlpatterns(blog_urls='blog.urls', pages_urls='pages.urls'):
+    """Адреса сайта; blogicum.urls_async подставляет асинхронные view."""
+    urlpatterns = [
+        path(
+            'auth/registration/',
+            CreateView.as_view(
+                template_name='registration/registration_form.html',
+                form_class=UserCreationForm,
+                success_url=reverse_lazy('blog:index'),
+            ),
+            name='registration',
+        ),
+        path(
+            'auth/password_reset/',
+            PasswordResetView.as_view(form_class=QueuedPasswordResetForm),
+            name='password_reset',
         ),
-        name='registration',
-    ),
-    path('auth/', include('django.contrib.auth.urls')),
-    path('pages/', include('pages.urls')),
-    path('admin/', admin.site.urls),
-    path('', include('blog.urls')),
-]
-
-if settings.DEBUG:
-    urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
+        path('auth/', include('django.contrib.auth.urls')),
+        path('pages/', include(pages_urls)),
+        path('admin/', admin.site.urls),
+        path('', include(blog_urls)),
+    ]
+
+    if 'debug_toolbar' in settings.INSTALLED_APPS:
+        import debug_toolbar
+
+        urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
+    return urlpatterns
+
+
+urlpatterns = site_urlpatterns()
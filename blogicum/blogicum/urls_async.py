@@ -0,0 +1,8 @@
+"""Адреса для запросов через ASGI (см. AsyncUrlconfMiddleware).
+
+Те же, что в blogicum.urls, но ленты, страницы категорий, профилей,
+публикаций и статические страницы обслуживают асинхронные view.
+"""
+from .urls import handler404, handler500, site_urlpatterns  # noqa: F401
+
+urlpatterns = site_urlpatterns('blog.async_urls', 'pages.async_urls')
@@ -0,0 +1,219 @@
+import contextvars
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.http import HttpResponse
+
+from blogicum.sqlite import write_transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_DELAY = 0.002
+DEFAULT_TIMEOUT = 5.0
+STATS_KEY = 'writes:stats:{name}'
+# Счётчики в кэше: пачки, записи, записи с ошибкой, запросы, не
+# дождавшиеся очереди, и суммарное ожидание в очереди и время пачек.
+STATS = ('batches', 'writes', 'failures', 'timeouts', 'wait_us', 'commit_us')
+
+
+class WriteTimeout(Exception):
+    pass
+
+
+def record_stats(**counts):
+    for name, value in counts.items():
+        key = STATS_KEY.format(name=name)
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            cache.set(key, value, None)
+
+
+def write_stats():
+    values = cache.get_many([STATS_KEY.format(name=name) for name in STATS])
+    stats = {
+        name: values.get(STATS_KEY.format(name=name), 0) for name in STATS
+    }
+    batches, writes = stats['batches'], stats['writes']
+    stats['batch_size'] = writes / batches if batches else 0.0
+    stats['wait_ms'] = stats['wait_us'] / writes / 1000 if writes else 0.0
+    stats['commit_ms'] = (
+        stats['commit_us'] / batches / 1000 if batches else 0.0
+    )
+    return stats
+
+
+def reset_write_stats():
+    cache.delete_many([STATS_KEY.format(name=name) for name in STATS])
+
+
+class WriteQueue:
+    """Один поток записи на процесс с групповым коммитом.
+
+    Вызовы из submit() выполняются по очереди в отдельном потоке. Всё,
+    что накопилось за max_delay секунд после первого вызова (не больше
+    batch_size), выполняется в одной транзакции, каждый вызов — в своей
+    точке сохранения: ошибка одного откатывает только его. Так
+    писатели процесса не спорят за блокировку записи SQLite, а
+    fsync делается один раз на пачку, а не на каждую запись.
+    """
+
+    def __init__(self, using='default', batch_size=DEFAULT_BATCH_SIZE,
+                 max_delay=DEFAULT_MAX_DELAY):
+        self.using = using
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.requests = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, function, *args, **kwargs):
+        future = Future()
+        # Вызов видит контекст отправившего запроса (например, RoutingState
+        # из blogicum.replicas), хотя выполняется в потоке записи.
+        context = contextvars.copy_context()
+        self.requests.put((
+            future, context.run, (function, *args), kwargs,
+            time.perf_counter()
+        ))
+        self.start()
+        return future
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.serve, name=f'write-queue-{self.using}',
+                    daemon=True,
+                )
+                self.thread.start()
+
+    def serve(self):
+        while True:
+            self.commit(self.next_batch())
+
+    def next_batch(self):
+        batch = [self.requests.get()]
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.requests.get(
+                    timeout=max(0.0, deadline - time.perf_counter())
+                ))
+            except queue.Empty:
+                break
+        return batch
+
+    def commit(self, batch):
+        started = time.perf_counter()
+        outcomes = []
+        try:
+            connections[self.using].close_if_unusable_or_obsolete()
+            with write_transaction(using=self.using):
+                for future, function, args, kwargs, _ in batch:
+                    # Вызов, который не дождались и отменили, пропускается.
+                    if future.set_running_or_notify_cancel():
+                        outcomes.append(
+                            (future, *self.call(function, args, kwargs))
+                        )
+        except Exception as error:
+            logger.exception('Пачка записей не сохранена')
+            # Откатилась вся пачка, а если транзакция не открылась
+            # (например, database is locked), вызовы даже не начинались.
+            # Ошибку получает каждый, кто ещё ждёт результата.
+            outcomes = [
+                (future, False, error) for future, *_ in batch
+                if future.running() or (
+                    not future.cancelled()
+                    and future.set_running_or_notify_cancel()
+                )
+            ]
+        for future, succeeded, value in outcomes:
+            if succeeded:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+        if outcomes:
+            record_stats(
+                batches=1,
+                writes=len(outcomes),
+                failures=sum(1 for _, succeeded, _ in outcomes
+                             if not succeeded),
+                wait_us=round(sum(
+                    started - queued for *_, queued in batch
+                ) * 1e6),
+                commit_us=round((time.perf_counter() - started) * 1e6),
+            )
+
+    def call(self, function, args, kwargs):
+        try:
+            with transaction.atomic(using=self.using):
+                return True, function(*args, **kwargs)
+        except Exception as error:
+            return False, error
+
+
+write_queues = {}
+write_queues_lock = threading.Lock()
+
+
+def get_write_queue(using='default'):
+    with write_queues_lock:
+        if using not in write_queues:
+            write_queues[using] = WriteQueue(
+                using,
+                getattr(settings, 'WRITE_QUEUE_BATCH_SIZE',
+                        DEFAULT_BATCH_SIZE),
+                getattr(settings, 'WRITE_QUEUE_MAX_DELAY', DEFAULT_MAX_DELAY),
+            )
+        return write_queues[using]
+
+
+def run_write(function, *args, **kwargs):
+    """Выполняет запись function(*args, **kwargs) и возвращает результат.
+
+    При WRITE_QUEUE_ENABLED вызов уходит в поток записи, а текущий
+    поток ждёт результат. Если запись не началась за
+    WRITE_QUEUE_TIMEOUT секунд, она отменяется и поднимается
+    WriteTimeout; уже начатая запись дожидается завершения. Без
+    очереди function просто вызывается в текущем потоке.
+    """
+    if not getattr(settings, 'WRITE_QUEUE_ENABLED', False):
+        return function(*args, **kwargs)
+    future = get_write_queue().submit(function, *args, **kwargs)
+    try:
+        return future.result(
+            getattr(settings, 'WRITE_QUEUE_TIMEOUT', DEFAULT_TIMEOUT)
+        )
+    except FutureTimeout:
+        if not future.cancel():
+            return future.result()
+        record_stats(timeouts=1)
+        raise WriteTimeout('Очередь записи не успела принять запрос.')
+
+
+def overloaded_response():
+    """Ответ 503 на запрос, запись которого не дождалась очереди."""
+    return HttpResponse(
+        'Сервер перегружен записью, повторите попытку.',
+        status=503,
+        headers={'Retry-After': '1'},
+        content_type='text/plain; charset=utf-8',
+    )
+
+
+def run_write_view(view, request, *args, **kwargs):
+    """run_write() для обработчика запроса: 503 при WriteTimeout."""
+    try:
+        return run_write(view, request, *args, **kwargs)
+    except WriteTimeout:
+        return overloaded_response()
@@ -0,0 +1,31 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = [
+        'name',
+        'status',
+        'attempts',
+        'run_at',
+        'created_at'
+    ]
+    list_filter = [
+        'status',
+        'name'
+    ]
+    readonly_fields = [
+        'locked_by',
+        'locked_until',
+        'last_error'
+    ]
+    actions = ['retry_now']
+
+    @admin.action(description='Повторить сейчас')
+    def retry_now(self, request, queryset):
+        queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, attempts=0, run_at=timezone.now()
+        )
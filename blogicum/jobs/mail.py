@@ -0,0 +1,16 @@
+from django.core.mail import EmailMultiAlternatives
+
+from .queue import enqueue
+
+
+def deliver(subject, body, from_email, to, html_message=None):
+    message = EmailMultiAlternatives(subject, body, from_email, to)
+    if html_message:
+        message.attach_alternative(html_message, 'text/html')
+    message.send()
+
+
+def send_mail_later(subject, body, from_email, to, html_message=None):
+    """Отправляет письмо из фоновой задачи через EMAIL_BACKEND."""
+    return enqueue(deliver, subject, body, from_email, list(to),
+                   html_message=html_message)
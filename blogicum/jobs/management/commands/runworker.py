@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.queue import VISIBILITY_TIMEOUT
+from jobs.worker import POLL_INTERVAL, POOLS, THREAD, Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает обработчик фоновых задач из таблицы jobs_job. '
+        'Задачи выполняются в пуле потоков или процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Сколько задач выполнять одновременно.'
+        )
+        parser.add_argument(
+            '--pool', choices=POOLS, default=THREAD,
+            help='Пул потоков (по умолчанию) или процессов.'
+        )
+        parser.add_argument(
+            '--visibility-timeout', type=int, default=VISIBILITY_TIMEOUT,
+            help='Через сколько секунд незавершённая задача снова '
+                 'становится доступной другим обработчикам.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=POLL_INTERVAL,
+            help='Пауза между опросами пустой очереди, в секундах.'
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Выполнить готовые задачи и завершиться.'
+        )
+
+    def handle(self, *args, concurrency, pool, visibility_timeout,
+               poll_interval, burst, **options):
+        if concurrency < 1:
+            raise CommandError('--concurrency должен быть положительным.')
+        if visibility_timeout < 1 or poll_interval <= 0:
+            raise CommandError(
+                '--visibility-timeout и --poll-interval должны быть '
+                'положительными.'
+            )
+        worker = Worker(concurrency, pool, visibility_timeout, poll_interval)
+        worker.run(burst=burst)
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {worker.succeeded}, '
+            f'с ошибками: {worker.failed}.'
+        ))
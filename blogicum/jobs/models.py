@@ -0,0 +1,92 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+NAME_MAX_LENGTH = 256
+WORKER_MAX_LENGTH = 64
+DEFAULT_MAX_ATTEMPTS = 5
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Завершилась ошибкой'),
+    )
+
+    name = models.CharField(
+        max_length=NAME_MAX_LENGTH,
+        verbose_name='Задача',
+        help_text='Полный путь к функции, например blog.tasks.func.'
+    )
+    args = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Позиционные аргументы'
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Именованные аргументы'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=DEFAULT_MAX_ATTEMPTS,
+        verbose_name='Максимум попыток'
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Выполнить не раньше'
+    )
+    locked_by = models.CharField(
+        max_length=WORKER_MAX_LENGTH,
+        blank=True,
+        verbose_name='Захвачена обработчиком'
+    )
+    locked_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Захвачена до',
+        help_text='Если обработчик не завершил задачу к этому времени, '
+                  'она снова становится доступной.'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+
+    class Meta:
+        verbose_name = 'задача'
+        verbose_name_plural = 'Задачи'
+        ordering = ('run_at', 'id')
+        indexes = [
+            models.Index(
+                fields=['run_at', 'id'],
+                name='job_queued_idx',
+                condition=Q(status='queued'),
+            ),
+            models.Index(
+                fields=['locked_until'],
+                name='job_running_idx',
+                condition=Q(status='running'),
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
@@ -0,0 +1,145 @@
+import logging
+import random
+import traceback
+from datetime import timedelta
+from uuid import uuid4
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import DEFAULT_MAX_ATTEMPTS, Job
+from .runner import execute
+
+logger = logging.getLogger(__name__)
+
+# Сколько секунд задача числится за обработчиком. Если он упал или
+# завис, по истечении срока задачу заберёт другой обработчик.
+VISIBILITY_TIMEOUT = 300
+# Пауза перед повтором: RETRY_BACKOFF * 2 ** (попытка - 1) секунд,
+# но не больше RETRY_BACKOFF_MAX, плюс до 10% случайного разброса.
+RETRY_BACKOFF = 5
+RETRY_BACKOFF_MAX = 3600
+RETRY_JITTER = 0.1
+
+
+def task_name(task):
+    if isinstance(task, str):
+        return task
+    return f'{task.__module__}.{task.__qualname__}'
+
+
+def enqueue(task, *args, delay=None, max_attempts=DEFAULT_MAX_ATTEMPTS,
+            **kwargs):
+    """Ставит вызов task(*args, **kwargs) в очередь.
+
+    task — функция уровня модуля или полный путь к ней. Аргументы
+    должны сериализоваться в JSON. Задача пишется в ту же транзакцию,
+    что и данные, поэтому при откате пропадает вместе с ними.
+    """
+    return Job.objects.create(
+        name=task_name(task),
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay or 0),
+    )
+
+
+def retry_delay(attempt):
+    delay = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** (attempt - 1))
+    return delay + random.uniform(0, delay * RETRY_JITTER)
+
+
+def available(now):
+    return (
+        Q(status=Job.QUEUED, run_at__lte=now)
+        | Q(status=Job.RUNNING, locked_until__lt=now)
+    )
+
+
+def claim_jobs(limit, visibility_timeout=VISIBILITY_TIMEOUT, now=None):
+    """Захватывает до limit готовых к выполнению задач.
+
+    Захват — условный UPDATE по каждой задаче: если её успел забрать
+    другой обработчик, строка не обновится и задача пропускается.
+    Захваченные задачи помечаются общим токеном и возвращаются списком.
+    Задачи, исчерпавшие попытки из-за зависших обработчиков, сразу
+    переводятся в ошибку.
+    """
+    now = now or timezone.now()
+    token = uuid4().hex
+    candidates = Job.objects.filter(available(now)).order_by(
+        'run_at', 'id'
+    ).values_list('pk', flat=True)[:limit * 2]
+    claimed = 0
+    for pk in candidates:
+        claimed += Job.objects.filter(available(now), pk=pk).update(
+            status=Job.RUNNING,
+            locked_by=token,
+            locked_until=now + timedelta(seconds=visibility_timeout),
+            attempts=F('attempts') + 1,
+        )
+        if claimed == limit:
+            break
+    jobs = []
+    for job in Job.objects.filter(locked_by=token):
+        if job.attempts > job.max_attempts:
+            fail_job(job, 'Превышено время выполнения.')
+        else:
+            jobs.append(job)
+    return jobs
+
+
+def finish_job(job):
+    """Удаляет выполненную задачу, если её не перехватил другой обработчик.
+
+    Возвращает False, если срок захвата истёк и задача уже чужая.
+    """
+    deleted, _ = Job.objects.filter(
+        pk=job.pk, locked_by=job.locked_by
+    ).delete()
+    return bool(deleted)
+
+
+def fail_job(job, error):
+    owned = Job.objects.filter(pk=job.pk, locked_by=job.locked_by)
+    if job.attempts >= job.max_attempts:
+        owned.update(
+            status=Job.FAILED, locked_by='', locked_until=None,
+            last_error=error,
+        )
+        logger.error('Задача %s не выполнена: %s', job, error)
+        return
+    owned.update(
+        status=Job.QUEUED, locked_by='', locked_until=None,
+        last_error=error,
+        run_at=timezone.now() + timedelta(
+            seconds=retry_delay(job.attempts)
+        ),
+    )
+    logger.warning('Задача %s будет повторена: %s', job, error)
+
+
+def format_error(error):
+    return ''.join(traceback.format_exception(
+        type(error), error, error.__traceback__
+    ))
+
+
+def run_job(job):
+    """Выполняет захваченную задачу в текущем потоке."""
+    try:
+        execute(job.name, job.args, job.kwargs)
+    except Exception as error:
+        fail_job(job, format_error(error))
+        return False
+    return finish_job(job)
+
+
+def run_pending(limit=100, now=None):
+    """Выполняет готовые задачи в текущем потоке.
+
+    Нужна для тестов и разовых прогонов; возвращает число успешно
+    выполненных задач.
+    """
+    return sum(run_job(job) for job in claim_jobs(limit, now=now))
@@ -0,0 +1,22 @@
+"""Функции, которые выполняются в потоках и процессах пула.
+
+Модуль не импортирует модели: процессы пула запускаются через spawn
+и загружают его до того, как инициализатор настроит Django.
+"""
+import django
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+
+def setup_process():
+    # Наследовать через fork открытые соединения с базой небезопасно,
+    # поэтому в новом процессе Django настраивается заново.
+    django.setup()
+
+
+def execute(name, args, kwargs):
+    """Вызывает функцию задачи по полному пути к ней."""
+    try:
+        import_string(name)(*args, **kwargs)
+    finally:
+        close_old_connections()
@@ -0,0 +1,93 @@
+import logging
+import multiprocessing
+import time
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+
+from django.db import connections
+
+from .queue import (VISIBILITY_TIMEOUT, claim_jobs, fail_job, finish_job,
+                    format_error)
+from .runner import execute, setup_process
+
+logger = logging.getLogger(__name__)
+
+THREAD = 'thread'
+PROCESS = 'process'
+POOLS = (THREAD, PROCESS)
+POLL_INTERVAL = 1.0
+
+
+def make_executor(pool, concurrency):
+    if pool == PROCESS:
+        return ProcessPoolExecutor(
+            concurrency,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=setup_process,
+        )
+    return ThreadPoolExecutor(concurrency, thread_name_prefix='jobs')
+
+
+class Worker:
+    """Забирает задачи из очереди и выполняет их в пуле.
+
+    Одновременно выполняется не больше concurrency задач; новые
+    захватываются только под свободные места в пуле. С таблицей задач
+    работает только основной поток, пул лишь вызывает функции задач.
+    """
+
+    def __init__(self, concurrency=1, pool=THREAD,
+                 visibility_timeout=VISIBILITY_TIMEOUT,
+                 poll_interval=POLL_INTERVAL):
+        self.concurrency = concurrency
+        self.pool = pool
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.succeeded = self.failed = 0
+
+    def run(self, burst=False):
+        """Работает до KeyboardInterrupt, с burst — пока есть задачи."""
+        running = {}
+        with make_executor(self.pool, self.concurrency) as executor:
+            try:
+                while True:
+                    running = self._collect(running)
+                    claimed = claim_jobs(
+                        self.concurrency - len(running),
+                        self.visibility_timeout,
+                    ) if len(running) < self.concurrency else []
+                    for job in claimed:
+                        future = executor.submit(
+                            execute, job.name, job.args, job.kwargs
+                        )
+                        running[future] = job
+                    if burst and not running:
+                        return
+                    if not claimed:
+                        self._idle(running)
+            except KeyboardInterrupt:
+                logger.info('Остановка: ждём %d задач.', len(running))
+                executor.shutdown(wait=True)
+                # Иначе завершённые задачи остались бы захваченными и
+                # после тайм-аута видимости выполнились бы ещё раз.
+                self._collect(running)
+            finally:
+                connections.close_all()
+
+    def _collect(self, running):
+        for future in [future for future in running if future.done()]:
+            job = running.pop(future)
+            error = future.exception()
+            if error is None and finish_job(job):
+                self.succeeded += 1
+                continue
+            if error is not None:
+                fail_job(job, format_error(error))
+            self.failed += 1
+        return running
+
+    def _idle(self, running):
+        if running:
+            wait(running, self.poll_interval, return_when=FIRST_COMPLETED)
+        else:
+            time.sleep(self.poll_interval)
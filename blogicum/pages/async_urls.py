@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'pages'
+
+urlpatterns = [
+    path('about/', views.AsyncAboutPage.as_view(), name='about'),
+    path('rules/', views.AsyncRulesPage.as_view(), name='rules'),
+]
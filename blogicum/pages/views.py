@@ -3,15 +3,33 @@ import http
 from django.shortcuts import render
 from django.views.generic import TemplateView
 
+from blogicum.asynchronous import AsyncViewMixin
+from blogicum.conditional import ConditionalGetMixin, templates_mtime
 
-class AboutPage(TemplateView):
+
+class StaticPageMixin(ConditionalGetMixin):
+
+    def get_validators(self):
+        changed_at = templates_mtime()
+        return (self.template_name, changed_at), changed_at
+
+
+class AboutPage(StaticPageMixin, TemplateView):
     template_name = 'pages/about.html'
 
 
-class RulesPage(TemplateView):
+class RulesPage(StaticPageMixin, TemplateView):
     template_name = 'pages/rules.html'
 
 
+class AsyncAboutPage(AsyncViewMixin, AboutPage):
+    pass
+
+
+class AsyncRulesPage(AsyncViewMixin, RulesPage):
+    pass
+
+
 def page_not_found(request, exception):
     return render(request, 'pages/404.html',
                   status=http.HTTPStatus.NOT_FOUND)
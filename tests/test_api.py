@@ -0,0 +1,124 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import api
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _json(response, status=HTTPStatus.OK):
+    assert response.status_code == status, response.content
+    assert response["Content-Type"] == "application/json"
+    return json.loads(response.content)
+
+
+@pytest.fixture
+def api_posts(mixer, user, published_category, published_location):
+    visible = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, title="Видимая", thumbnails={},
+    )
+    hidden = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False,
+    )
+    return visible, hidden
+
+
+def test_post_list(client, api_posts):
+    visible, hidden = api_posts
+    data = _json(client.get("/api/posts/"))
+    assert [post["id"] for post in data["results"]] == [visible.id]
+    post = data["results"][0]
+    assert post["title"] == "Видимая"
+    assert post["author"] == visible.author.username
+    assert post["category"] == visible.category.slug
+    assert post["location"] == visible.location.name
+    assert post["pub_date"] == visible.pub_date.isoformat()
+    assert data["next"] is None and data["previous"] is None
+
+
+def test_sparse_fieldsets_limit_select(client, api_posts):
+    with CaptureQueriesContext(connection) as queries:
+        data = _json(client.get("/api/posts/", {"fields": "id,title"}))
+    assert list(data["results"][0]) == ["id", "title"]
+    select = next(q["sql"] for q in queries if "FROM \"blog_post\"" in q[
+        "sql"] and "blog_post\".\"title" in q["sql"])
+    assert "\"text\"" not in select and "auth_user" not in select
+    response = client.get("/api/posts/", {"fields": "id,password"})
+    assert "password" in _json(response, HTTPStatus.BAD_REQUEST)["detail"]
+
+
+def test_cursor_pagination_keeps_fields(client, mixer, user,
+                                        published_category):
+    posts = mixer.cycle(13).blend(
+        "blog.Post", author=user, category=published_category,
+        thumbnails={},
+    )
+    first = _json(client.get("/api/posts/", {"fields": "id"}))
+    assert len(first["results"]) == 10
+    assert "fields=id" in first["next"]
+    second = _json(client.get(first["next"]))
+    assert {post["id"] for post in first["results"] + second["results"]} == {
+        post.id for post in posts
+    }
+    assert second["next"] is None and second["previous"]
+    _json(client.get("/api/posts/", {"cursor": "мусор"}),
+          HTTPStatus.BAD_REQUEST)
+
+
+def test_post_detail_and_comments(client, mixer, api_posts):
+    visible, hidden = api_posts
+    comment = mixer.blend("blog.Comment", post=visible, text="Отлично")
+    data = _json(client.get(f"/api/posts/{visible.id}/"))
+    assert data["id"] == visible.id and data["comment_count"] == 1
+    comments = _json(client.get(f"/api/posts/{visible.id}/comments/"))
+    assert comments["results"] == [{
+        "id": comment.id,
+        "post": visible.id,
+        "author": comment.author.username,
+        "text": "Отлично",
+        "created_at": comment.created_at.isoformat(),
+    }]
+    _json(client.get(f"/api/posts/{hidden.id}/"), HTTPStatus.NOT_FOUND)
+    _json(client.get(f"/api/posts/{hidden.id}/comments/"),
+          HTTPStatus.NOT_FOUND)
+
+
+def test_category_posts(client, mixer, api_posts, published_category):
+    other = mixer.blend("blog.Category", is_published=True)
+    mixer.blend("blog.Post", category=other, thumbnails={})
+    data = _json(client.get(
+        f"/api/categories/{published_category.slug}/posts/"
+    ))
+    assert [post["id"] for post in data["results"]] == [api_posts[0].id]
+    hidden = mixer.blend("blog.Category", is_published=False)
+    _json(client.get(f"/api/categories/{hidden.slug}/posts/"),
+          HTTPStatus.NOT_FOUND)
+
+
+def test_conditional_get(client, api_posts,
+                         django_capture_on_commit_callbacks):
+    visible, _ = api_posts
+    url = f"/api/posts/{visible.id}/"
+    first = client.get(url)
+    assert "public" in first["Cache-Control"]
+    response = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    other_fields = client.get(url, {"fields": "id"})
+    assert other_fields["ETag"] != first["ETag"]
+    visible.title = "Новый заголовок"
+    with django_capture_on_commit_callbacks(execute=True):
+        visible.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert _json(response)["title"] == "Новый заголовок"
+
+
+def test_stdlib_encoder_matches_orjson(monkeypatch, client, api_posts):
+    fast = client.get("/api/posts/").content
+    monkeypatch.setattr(api, "orjson", None)
+    assert json.loads(client.get("/api/posts/").content) == json.loads(fast)
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import threading
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncClient, Client
+from django.urls import resolve
+from django.utils import timezone
+
+from blog.models import Comment
+from blogicum.asynchronous import run_orm_together
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+ASYNC_URLCONF = "blogicum.urls_async"
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=None, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    Comment.objects.create(post=post, author=user, text="Асинхронный отзыв")
+    return post
+
+
+@pytest.fixture
+def urls(post):
+    return [
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+        f"/posts/{post.id}/comments/",
+        "/pages/about/",
+        "/pages/rules/",
+    ]
+
+
+def async_get(client, url, **headers):
+    return async_to_sync(client.get)(url, **headers)
+
+
+def test_asgi_urlconf_serves_async_views(urls, post):
+    for url in urls:
+        view = resolve(url, urlconf=ASYNC_URLCONF).func
+        assert asyncio.iscoroutinefunction(view), url
+        assert not asyncio.iscoroutinefunction(resolve(url).func), url
+    edit = f"/posts/{post.id}/edit/"
+    assert resolve(edit, urlconf=ASYNC_URLCONF).func is resolve(edit).func
+
+
+def test_async_page_number_redirects():
+    response = async_get(AsyncClient(), "/?page=5")
+    assert response.status_code == HTTPStatus.MOVED_PERMANENTLY
+    assert response["Location"] == "/"
+
+
+@pytest.mark.parametrize("logged_in", [False, True])
+def test_async_pages_match_sync(urls, post, user, logged_in):
+    sync_client, async_client = Client(), AsyncClient()
+    if logged_in:
+        sync_client.force_login(user)
+        async_client.force_login(user)
+    # Первый запрос ищет отложенные публикации и запоминает результат.
+    sync_client.get(urls[0])
+    for url in urls:
+        expected = sync_client.get(url)
+        response = async_get(async_client, url)
+        assert response.status_code == HTTPStatus.OK, url
+        assert response["ETag"] == expected["ETag"], url
+        if logged_in:
+            # Запросы из потоков пула тоже попадают в счётчик.
+            assert response["X-Query-Count"] == expected["X-Query-Count"]
+        content = response.content.decode()
+        if "/pages/" not in url and "comments" not in url:
+            assert post.title in content, url
+        if f"/posts/{post.id}/" in url:
+            assert "Асинхронный отзыв" in content, url
+
+
+def test_async_pages_answer_not_modified(urls):
+    client = AsyncClient()
+    for url in urls:
+        etag = async_get(client, url)["ETag"]
+        response = async_get(client, url, **{"if-none-match": etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, url
+
+
+def test_async_detail_hides_unpublished_post(post, another_user):
+    post.is_published = False
+    post.save()
+    client = AsyncClient()
+    client.force_login(another_user)
+    response = async_get(client, f"/posts/{post.id}/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_independent_queries_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    results = async_to_sync(run_orm_together)(barrier.wait, barrier.wait)
+    assert sorted(results) == [0, 1]
+
+
+def test_throughput_benchmark(post, tmp_path):
+    output = tmp_path / "throughput.json"
+    call_command("benchmark_asgi", concurrency=2, duration=0.3,
+                 output=str(output))
+    result = json.loads(output.read_text(encoding="utf-8"))
+    for kind in ("wsgi", "asgi"):
+        assert result[kind]["requests"] > 0, kind
+        assert result[kind]["errors"] == 0, kind
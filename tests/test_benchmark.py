@@ -0,0 +1,117 @@
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.urls import get_resolver
+from django.utils import timezone
+
+from blog.benchmark import (BENCHMARK_COMMENT, ClientTransport,
+                            local_server, percentile, run_benchmark,
+                            run_concurrent, sample_comment, targets)
+from blog.models import Comment, Post
+from blog.synthetic import DataGenerator
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def generated():
+    return DataGenerator(seed=1, batch_size=7).generate(
+        users=5, categories=3, locations=2, posts=30, comments=120
+    )
+
+
+def test_generate_data_counts_and_skew(generated):
+    assert generated == {
+        "users": 5, "categories": 3, "locations": 2,
+        "posts": 30, "comments": 120,
+    }
+    assert Comment.objects.count() == 120
+    now = timezone.now()
+    counts = list(Post.objects.values_list("comment_count", flat=True))
+    assert sum(counts) == 120
+    assert max(counts) > 120 / 30 * 3
+    for post in Post.objects.all():
+        assert post.comment_count == post.comment_set.count()
+        assert post.is_visible == (post.is_published and post.is_due(now))
+
+
+def test_generate_data_indexes_comments(client, generated):
+    comment = Comment.objects.filter(
+        post__is_visible=True, post__category__is_published=True
+    ).first()
+    word = max(comment.text.split(), key=len).strip(".,")
+    response = client.get("/search/", {"q": word})
+    assert response.status_code == HTTPStatus.OK
+    assert comment.post in response.context["page_obj"]
+
+
+def test_generate_data_is_reproducible():
+    call_command("generate_data", "--users=2", "--posts=3", "--comments=4",
+                 "--seed=5", stdout=io.StringIO())
+    first = list(Post.objects.order_by("pk").values_list("title", "text"))
+    Post.objects.all().delete()
+    call_command("generate_data", "--users=2", "--posts=3", "--comments=4",
+                 "--seed=5", stdout=io.StringIO())
+    assert list(
+        Post.objects.order_by("pk").values_list("title", "text")
+    ) == first
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([3.0], 99) == 3.0
+
+
+def test_benchmark_covers_every_blog_view(generated):
+    names = {
+        f"blog:{name}"
+        for name in get_resolver().namespace_dict["blog"][1].reverse_dict
+        if isinstance(name, str)
+    }
+    comment = sample_comment()
+    results = run_benchmark(
+        ClientTransport(comment.post.author), targets(comment),
+        repeat=3, warmup=1
+    )
+    assert set(results) == names
+    for name, result in results.items():
+        assert result["status"] in (HTTPStatus.OK, HTTPStatus.FOUND), name
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        assert result["queries"] is not None, name
+        assert result["requests"] == 3
+    assert results["blog:post_detail"]["bytes"] > 0
+
+
+def test_benchmark_command_writes_and_compares(tmp_path, generated):
+    first, second = tmp_path / "first.json", tmp_path / "second.json"
+    call_command("benchmark_views", "--requests=2", "--warmup=0",
+                 f"--output={first}", stdout=io.StringIO(),
+                 stderr=io.StringIO())
+    output = io.StringIO()
+    call_command("benchmark_views", "--requests=2", "--warmup=0",
+                 "--user=author", f"--output={second}", f"--compare={first}",
+                 stdout=output, stderr=io.StringIO())
+    result = json.loads(second.read_text("utf-8"))
+    assert result["meta"]["user"] == "author"
+    assert result["meta"]["rows"]["post"] == 30
+    assert result["views"]["blog:index"]["status"] == HTTPStatus.OK
+    assert "blog:index" in output.getvalue().split("прогона:")[1]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_while_writing(generated):
+    comment = sample_comment()
+    with local_server() as url:
+        result = run_concurrent(
+            url, targets(comment), comment.post.author,
+            readers=2, writers=1, duration=1.0
+        )
+    assert result["reads"]["requests"] > 0
+    assert result["writes"]["requests"] > 0
+    assert set(result["reads"]) >= {"per_second", "p99_ms", "errors"}
+    assert Comment.objects.filter(text=BENCHMARK_COMMENT).exists()
@@ -0,0 +1,55 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count(post):
+    return Post.objects.values_list("comment_count", flat=True).get(
+        pk=post.pk
+    )
+
+
+def test_comment_views_keep_counter(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    for i in range(3):
+        user_client.post(
+            f"/posts/{post.id}/comment/", {"text": f"Comment {i}"}
+        )
+    assert _count(post) == 3
+
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    assert _count(post) == 2
+
+
+def test_reassigned_and_orphaned_comments(
+        mixer, post_with_published_location, post_of_another_author):
+    post, other = post_with_published_location, post_of_another_author
+    comment = mixer.blend("blog.Comment", post=post)
+    assert (_count(post), _count(other)) == (1, 0)
+
+    comment.post = other
+    comment.save()
+    assert (_count(post), _count(other)) == (0, 1)
+
+    comment.post = None
+    comment.save()
+    assert (_count(post), _count(other)) == (0, 0)
+
+
+def test_recount_command_repairs_drift(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=7)
+
+    with pytest.raises(CommandError):
+        call_command("recount_comments", "--check", stdout=None)
+    call_command("recount_comments", "--batch-size", "1")
+    assert _count(post) == 2
+    call_command("recount_comments", "--check")
@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog.views import COMMENTS_PAGINATE_VALUE
+
+pytestmark = [pytest.mark.django_db]
+
+N_COMMENTS = 25
+
+
+@pytest.fixture
+def commented_post(mixer, post_with_published_location):
+    mixer.cycle(N_COMMENTS).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+    return post_with_published_location
+
+
+def _ids(page):
+    return [comment.id for comment in page]
+
+
+def test_detail_renders_first_comment_page(user_client, commented_post):
+    response = user_client.get(f"/posts/{commented_post.id}/")
+    page = response.context["comments"]
+    assert len(page) == COMMENTS_PAGINATE_VALUE
+    assert page.has_next()
+    assert "data-comments-more" in response.content.decode("utf-8")
+
+
+def test_fragment_endpoint_walks_all_comments(user_client, commented_post):
+    expected = list(
+        commented_post.comment_set.order_by("created_at", "id").values_list(
+            "id", flat=True
+        )
+    )
+    first = user_client.get(f"/posts/{commented_post.id}/").context[
+        "comments"]
+    seen, cursor = _ids(first), first.next_cursor
+    while cursor:
+        response = user_client.get(
+            f"/posts/{commented_post.id}/comments/", {"cursor": cursor}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert "<html" not in response.content.decode("utf-8")
+        page = response.context["comments"]
+        seen.extend(_ids(page))
+        cursor = page.next_cursor
+    assert seen == expected
+
+
+def test_fragment_hidden_for_unpublished_post(
+        another_user_client, commented_post):
+    commented_post.is_published = False
+    commented_post.save()
+    response = another_user_client.get(
+        f"/posts/{commented_post.id}/comments/"
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,144 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blogicum import conditional
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def conditional_urls(post_with_published_location):
+    post = post_with_published_location
+    return [
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+        "/pages/about/",
+        "/pages/rules/",
+    ]
+
+
+def _revalidate(client, url, **headers):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, **headers)
+    return response, len(queries)
+
+
+@pytest.mark.parametrize("client_fixture", ["user_client", "unlogged_client"])
+def test_unchanged_pages_answer_not_modified(request, client_fixture,
+                                             conditional_urls):
+    client = request.getfixturevalue(client_fixture)
+    for url in conditional_urls:
+        first = client.get(url)
+        assert first.status_code == HTTPStatus.OK
+        assert first.has_header("ETag") and first.has_header("Last-Modified")
+        response, n_queries = _revalidate(
+            client, url, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, url
+        assert not response.content
+        assert response.templates == [], (
+            f"Ответ 304 для {url} не должен рендерить шаблон."
+        )
+        assert n_queries <= 2, (
+            f"Ответ 304 для {url} должен обходиться без запросов к "
+            f"публикациям, а выполнил {n_queries}."
+        )
+        response, _ = _revalidate(
+            client, url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, url
+
+
+def test_etag_depends_on_user(user_client, another_user_client,
+                              unlogged_client, conditional_urls):
+    for url in conditional_urls:
+        etags = {
+            client.get(url)["ETag"]
+            for client in (user_client, another_user_client, unlogged_client)
+        }
+        assert len(etags) == 3, url
+
+
+def _changes_etag(client, url, change, capture_on_commit):
+    etag = client.get(url)["ETag"]
+    with capture_on_commit(execute=True):
+        change()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    return response
+
+
+def test_new_comment_changes_detail_and_feeds(
+        mixer, user_client, conditional_urls, post_with_published_location,
+        django_capture_on_commit_callbacks):
+    for url in conditional_urls[:4]:
+        _changes_etag(user_client, url, lambda: mixer.blend(
+            "blog.Comment", post=post_with_published_location
+        ), django_capture_on_commit_callbacks)
+
+
+def test_edited_comment_changes_detail(mixer, user_client,
+                                       post_with_published_location,
+                                       django_capture_on_commit_callbacks):
+    comment = mixer.blend("blog.Comment", post=post_with_published_location)
+    url = f"/posts/{post_with_published_location.id}/"
+
+    def edit():
+        comment.text = "Исправленный комментарий"
+        comment.save()
+
+    response = _changes_etag(
+        user_client, url, edit, django_capture_on_commit_callbacks
+    )
+    assert "Исправленный комментарий" in response.content.decode("utf-8")
+
+
+def test_edited_post_changes_pages(user_client, conditional_urls,
+                                   post_with_published_location,
+                                   django_capture_on_commit_callbacks):
+    post = post_with_published_location
+    for url in conditional_urls[:4]:
+        def edit():
+            post.title = f"{post.title}!"
+            post.save()
+
+        response = _changes_etag(
+            user_client, url, edit, django_capture_on_commit_callbacks
+        )
+        assert post.title in response.content.decode("utf-8")
+
+
+def test_renamed_category_changes_detail(user_client,
+                                         post_with_published_location,
+                                         django_capture_on_commit_callbacks):
+    post = post_with_published_location
+
+    def rename():
+        post.category.title = "Переименованная категория"
+        post.category.save()
+
+    _changes_etag(user_client, f"/posts/{post.id}/", rename,
+                  django_capture_on_commit_callbacks)
+
+
+def test_templates_scanned_once_without_debug(monkeypatch, settings):
+    scans = []
+
+    def scan():
+        scans.append(len(scans))
+        return float(len(scans))
+
+    monkeypatch.setattr(conditional, "scan_templates_mtime", scan)
+    conditional.deployed_templates_mtime.cache_clear()
+    try:
+        assert conditional.templates_mtime() == conditional.templates_mtime()
+        assert len(scans) == 1
+        settings.DEBUG = True
+        assert conditional.templates_mtime() != conditional.templates_mtime()
+    finally:
+        conditional.deployed_templates_mtime.cache_clear()
@@ -544,7 +544,8 @@ class TestContent:
             expected_n = tester.n_or_page_size(len(posts))
             assert len(context_posts) == expected_n, pagination_err_msg
 
-    def test_image_visible(self, user_client, post_with_published_location):
+    def test_image_visible(self, user_client, post_with_published_location,
+                           django_capture_on_commit_callbacks):
         post = post_with_published_location
         post_adapter = PostModelAdapter(post)
 
@@ -564,7 +565,8 @@ class TestContent:
             img_n_with_post_img[i] = len(img_soup_with_post_img)
 
         post_adapter.image = None
-        post_adapter.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            post_adapter.save()
 
         for i, tester in enumerate(testers):
             img_soup_without_post_img = BeautifulSoup(
@@ -0,0 +1,84 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from blog.exports import Exporter
+
+pytestmark = [pytest.mark.django_db]
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def export_posts(mixer, user, published_category):
+    posts = mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category,
+        location=None, thumbnails={},
+    )
+    mixer.blend("blog.Comment", post=posts[0], text="Комментарий")
+    return posts
+
+
+def test_export_jsonl(tmp_path, export_posts):
+    path = tmp_path / "posts.jsonl"
+    call_command("export_blog", "posts", str(path), stdout=io.StringIO())
+    rows = [json.loads(line) for line in path.read_text("utf-8").splitlines()]
+    assert [row["id"] for row in rows] == [post.id for post in export_posts]
+    assert rows[0]["author"] == export_posts[0].author.username
+    assert rows[0]["comment_count"] == 1
+    assert rows[0]["pub_date"] == export_posts[0].pub_date.isoformat()
+    assert not (tmp_path / "posts.jsonl.checkpoint").exists()
+
+
+def test_export_csv_gzip(tmp_path, export_posts):
+    path = tmp_path / "comments.csv.gz"
+    call_command("export_blog", "comments", str(path), format="csv",
+                 compress=True, checkpoint_size=1, stdout=io.StringIO())
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as source:
+        rows = list(csv.reader(source))
+    assert rows[0] == ["id", "post", "author", "text", "created_at",
+                       "is_published"]
+    assert rows[1][3] == "Комментарий"
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_interrupted_export_resumes(tmp_path, export_posts, compress):
+    path = tmp_path / "posts.csv"
+    exporter = Exporter("posts", str(path), "csv", compress,
+                        chunk_size=1, checkpoint_size=2)
+
+    def stop(checkpoint):
+        raise Interrupted
+
+    with pytest.raises(Interrupted):
+        exporter.run(progress=stop)
+    # Строки, записанные после контрольной точки, должны быть отброшены.
+    with open(path, "ab") as output:
+        output.write(b"partial,row")
+    assert exporter.run(resume=True) == len(export_posts)
+    opener = gzip.open if compress else open
+    with opener(path, "rt", encoding="utf-8", newline="") as source:
+        rows = list(csv.reader(source))
+    assert [int(row[0]) for row in rows[1:]] == [
+        post.id for post in export_posts
+    ]
+
+
+def test_admin_export_action(admin_client, export_posts):
+    selected = export_posts[:2]
+    response = admin_client.post("/admin/blog/post/", {
+        "action": "export_jsonl",
+        "_selected_action": [post.id for post in selected],
+    })
+    assert response.streaming
+    assert "attachment" in response["Content-Disposition"]
+    body = b"".join(response.streaming_content).decode("utf-8")
+    assert [json.loads(line)["id"] for line in body.splitlines()] == [
+        post.id for post in selected
+    ]
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from http import HTTPStatus
+from xml.etree import ElementTree
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.feeds import FEED_ITEMS
+
+pytestmark = [pytest.mark.django_db]
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+def _titles(response):
+    assert response.streaming
+    root = ElementTree.fromstring(b"".join(response.streaming_content))
+    if root.tag == "rss":
+        return [item.findtext("title") for item in root.iter("item")]
+    return [entry.findtext(f"{ATOM}title") for entry in root.iter(
+        f"{ATOM}entry")]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category, another_category,
+               published_location):
+    visible = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, title="Видимая",
+    )
+    other = mixer.blend(
+        "blog.Post", category=another_category, title="Из другой категории",
+    )
+    hidden = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False, title="Снята с публикации",
+    )
+    future = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(days=1), title="Отложенная",
+    )
+    return visible, other, hidden, future
+
+
+@pytest.mark.parametrize("feed_format, content_type", [
+    ("rss", "application/rss+xml"),
+    ("atom", "application/atom+xml"),
+])
+def test_site_feed_lists_visible_posts(client, feed_posts, feed_format,
+                                       content_type):
+    response = client.get(f"/feed/{feed_format}/")
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Type"].startswith(content_type)
+    titles = _titles(response)
+    assert "Видимая" in titles
+    assert "Снята с публикации" not in titles
+    assert "Отложенная" not in titles
+
+
+def test_category_and_author_feeds(client, feed_posts, user):
+    visible, other, *_ = feed_posts
+    category_titles = _titles(
+        client.get(f"/category/{visible.category.slug}/feed/atom/")
+    )
+    assert category_titles == ["Видимая"]
+    author_titles = _titles(client.get(f"/profile/{user.username}/feed/rss/"))
+    assert author_titles == ["Видимая"]
+
+
+def test_unknown_feeds_not_found(client, mixer, feed_posts):
+    unpublished_category = mixer.blend("blog.Category", is_published=False)
+    assert client.get("/feed/json/").status_code == HTTPStatus.NOT_FOUND
+    assert client.get(
+        f"/category/{unpublished_category.slug}/feed/rss/"
+    ).status_code == HTTPStatus.NOT_FOUND
+    assert client.get(
+        "/profile/nobody/feed/rss/"
+    ).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_feed_limited(client, mixer, user, published_category):
+    mixer.cycle(FEED_ITEMS + 5).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    assert len(_titles(client.get("/feed/rss/"))) == FEED_ITEMS
+
+
+def test_feed_cached_and_invalidated(client, feed_posts,
+                                     django_capture_on_commit_callbacks):
+    visible, *_ = feed_posts
+    url = f"/category/{visible.category.slug}/feed/rss/"
+    first = b"".join(client.get(url).streaming_content)
+    with CaptureQueriesContext(connection) as queries:
+        second = b"".join(client.get(url).streaming_content)
+    assert second == first
+    assert len(queries) == 0, "Повторный запрос ленты должен идти из кэша."
+
+    visible.title = "Новый заголовок"
+    with django_capture_on_commit_callbacks(execute=True):
+        visible.save()
+    assert _titles(client.get(url)) == ["Новый заголовок"]
+
+    visible.category.title = "Новая категория"
+    with django_capture_on_commit_callbacks(execute=True):
+        visible.category.save()
+    body = b"".join(client.get(url).streaming_content).decode("utf-8")
+    assert "Новая категория" in body
+
+
+def test_feed_conditional_get(client, feed_posts,
+                              django_capture_on_commit_callbacks):
+    first = client.get("/feed/atom/")
+    assert "public" in first["Cache-Control"]
+    response = client.get("/feed/atom/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    with django_capture_on_commit_callbacks(execute=True):
+        feed_posts[0].save()
+    response = client.get("/feed/atom/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == HTTPStatus.OK
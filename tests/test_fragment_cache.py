@@ -0,0 +1,102 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+
+from blog.caching import get_version, lookup_stats
+from blog.templatetags.blog_cache import POST_CARD
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _index(client):
+    return client.get("/").content.decode("utf-8")
+
+
+def test_post_card_served_from_cache(
+        user_client, post_with_published_location):
+    _index(user_client)
+    before = lookup_stats(POST_CARD)
+    _index(user_client)
+    after = lookup_stats(POST_CARD)
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"]
+
+
+def test_page_of_cards_read_with_one_lookup(
+        user_client, many_posts_with_published_locations):
+    _index(user_client)
+    with mock.patch.object(cache, "get_many", wraps=cache.get_many) as \
+            get_many, mock.patch.object(cache, "incr", wraps=cache.incr) as \
+            incr:
+        _index(user_client)
+    fragment_reads = [
+        call for call in get_many.call_args_list
+        if "blog:fragment" in str(call)
+    ]
+    assert len(fragment_reads) == 1
+    assert incr.call_count == 1
+    stats = lookup_stats(POST_CARD)
+    assert stats["hits"] == stats["misses"] > 1
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda post: setattr(post, "title", "Новый заголовок поста"),
+        lambda post: setattr(post.category, "title", "Новая категория"),
+        lambda post: setattr(post.location, "name", "Новое место"),
+        lambda post: setattr(post.author, "username", "renamed_author"),
+    ],
+    ids=["post", "category", "location", "author"],
+)
+def test_post_card_invalidated_by_related_changes(
+        user_client, post_with_published_location, change,
+        django_capture_on_commit_callbacks):
+    post = post_with_published_location
+    _index(user_client)
+    change(post)
+    with django_capture_on_commit_callbacks(execute=True):
+        for obj in (post, post.category, post.location, post.author):
+            obj.save()
+    content = _index(user_client)
+    for expected in (
+        post.title, post.category.title, post.location.name,
+        post.author.username,
+    ):
+        assert expected in content
+
+
+def test_post_card_shows_new_comment_count(
+        user_client, mixer, post_with_published_location,
+        django_capture_on_commit_callbacks):
+    post = post_with_published_location
+    _index(user_client)
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.cycle(2).blend("blog.Comment", post=post)
+    assert "Комментарии (2)" in _index(user_client)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_versions_change_after_commit(post_with_published_location):
+    post = post_with_published_location
+    before = get_version(("post", post.pk))
+    with transaction.atomic():
+        post.title = "Ещё не закоммичен"
+        post.save()
+        assert get_version(("post", post.pk)) == before
+    assert get_version(("post", post.pk)) != before
+
+
+def test_rolled_back_write_keeps_version(post_with_published_location,
+                                         django_capture_on_commit_callbacks):
+    post = post_with_published_location
+    before = get_version(("post", post.pk))
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                post.title = "Откатится"
+                post.save()
+                raise RuntimeError
+    assert get_version(("post", post.pk)) == before
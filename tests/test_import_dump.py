@@ -0,0 +1,116 @@
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.imports import iter_json_array
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+CREATED_AT = "2022-12-18T23:06:18.993Z"
+
+
+def _dump(now):
+    future = (now + timedelta(days=1)).isoformat()
+    past = (now - timedelta(days=1)).isoformat()
+    # Комментарии идут раньше публикаций, публикации — раньше авторов.
+    return [
+        {"model": "blog.comment", "pk": 1, "fields": {
+            "text": "Первый", "author": 1, "post": 1,
+            "is_published": True, "created_at": CREATED_AT}},
+        {"model": "blog.comment", "pk": 2, "fields": {
+            "text": "Второй", "author": 1, "post": 1,
+            "is_published": True, "created_at": CREATED_AT}},
+        {"model": "blog.post", "pk": 1, "fields": {
+            "title": "Из дампа", "text": "Текст", "pub_date": past,
+            "author": 1, "category": 1, "location": None,
+            "is_published": True, "created_at": CREATED_AT}},
+        {"model": "blog.post", "pk": 2, "fields": {
+            "title": "Отложенная", "text": "Текст", "pub_date": future,
+            "author": 1, "category": 1, "location": None,
+            "is_published": True, "created_at": CREATED_AT}},
+        {"model": "auth.user", "pk": 1, "fields": {
+            "username": "imported", "password": "!", "groups": [],
+            "user_permissions": []}},
+        {"model": "blog.category", "pk": 1, "fields": {
+            "title": "Категория", "description": "Описание",
+            "slug": "imported", "is_published": True,
+            "created_at": CREATED_AT}},
+    ]
+
+
+def _write(tmp_path, objects):
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(objects, ensure_ascii=False), "utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 4096])
+def test_stream_parser_handles_chunk_boundaries(read_size):
+    text = '[1, {"a": [2, "]"]} , 345 ,"x"]'
+    assert list(iter_json_array(io.StringIO(text), read_size)) == [
+        1, {"a": [2, "]"]}, 345, "x"
+    ]
+
+
+def test_import_in_dependency_order(tmp_path):
+    path = _write(tmp_path, _dump(timezone.now()))
+    out = io.StringIO()
+    call_command("import_dump", path, batch_size=1, transaction_size=2,
+                 stdout=out)
+    assert "строк/с" in out.getvalue()
+    visible = Post.objects.get(pk=1)
+    assert visible.is_visible and visible.comment_count == 2
+    assert visible.created_at.isoformat().startswith("2022-12-18T23:06:18")
+    assert not Post.objects.get(pk=2).is_visible
+    assert Comment.objects.count() == 2
+
+
+def test_imported_comments_are_searchable(tmp_path, client):
+    call_command("import_dump", _write(tmp_path, _dump(timezone.now())),
+                 stdout=io.StringIO())
+    response = client.get("/search/", {"q": "второй"})
+    assert list(response.context["page_obj"]) == [Post.objects.get(pk=1)]
+
+
+def test_reimported_comment_reindexed(tmp_path, client):
+    objects = _dump(timezone.now())
+    call_command("import_dump", _write(tmp_path, objects),
+                 stdout=io.StringIO())
+    objects[1]["fields"]["text"] = "Исправленный"
+    call_command("import_dump", _write(tmp_path, objects),
+                 stdout=io.StringIO())
+    assert list(
+        client.get("/search/", {"q": "исправленный"}).context["page_obj"]
+    ) == [Post.objects.get(pk=1)]
+    assert not client.get("/search/", {"q": "второй"}).context["page_obj"]
+
+
+def test_reimport_updates_rows(tmp_path, client,
+                               django_capture_on_commit_callbacks):
+    objects = _dump(timezone.now())
+    call_command("import_dump", _write(tmp_path, objects),
+                 stdout=io.StringIO())
+    assert "Из дампа" in client.get("/").content.decode("utf-8")
+    objects[2]["fields"]["title"] = "Обновлена"
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("import_dump", _write(tmp_path, objects),
+                     stdout=io.StringIO())
+    assert Post.objects.count() == 2
+    assert "Обновлена" in client.get("/").content.decode("utf-8")
+    new = Post.objects.create(
+        title="Новая", text="Текст", pub_date=timezone.now(),
+        author_id=1, category_id=1,
+    )
+    assert new.pk == 3
+
+
+def test_broken_dump_rejected(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text(json.dumps(_dump(timezone.now()))[:-50], "utf-8")
+    with pytest.raises(CommandError):
+        call_command("import_dump", str(path), stdout=io.StringIO())
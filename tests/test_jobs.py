@@ -0,0 +1,146 @@
+import json
+import re
+import time
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import (VISIBILITY_TIMEOUT, claim_jobs, enqueue, finish_job,
+                        run_job, run_pending)
+from jobs.worker import Worker
+
+CALLS = []
+
+
+def record(value, suffix=""):
+    CALLS.append(f"{value}{suffix}")
+
+
+def slow_record(value):
+    time.sleep(0.2)
+    record(value)
+
+
+def explode():
+    raise RuntimeError("сбой задачи")
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    CALLS.clear()
+
+
+@pytest.mark.django_db
+def test_enqueued_job_runs_and_is_removed():
+    job = enqueue(record, "a", suffix="!")
+    assert job.name == f"{record.__module__}.record"
+    assert run_pending() == 1
+    assert CALLS == ["a!"]
+    assert not Job.objects.exists()
+
+
+@pytest.mark.django_db
+def test_delayed_job_waits():
+    enqueue(record, "later", delay=60)
+    assert run_pending() == 0
+    assert run_pending(now=timezone.now() + timedelta(seconds=61)) == 1
+    assert CALLS == ["later"]
+
+
+@pytest.mark.django_db
+def test_failed_job_retried_with_backoff_then_marked_failed():
+    job = enqueue(explode, max_attempts=2)
+    before = timezone.now()
+    assert run_pending() == 0
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED
+    assert job.attempts == 1
+    assert "сбой задачи" in job.last_error
+    assert job.run_at > before
+    assert run_pending() == 0, "Повтор не должен запускаться до паузы."
+
+    later = job.run_at + timedelta(seconds=1)
+    assert run_pending(now=later) == 0
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.attempts == 2
+    assert run_pending(now=later + timedelta(days=1)) == 0
+
+
+@pytest.mark.django_db
+def test_job_claimed_once():
+    enqueue(record, "once")
+    assert len(claim_jobs(10)) == 1
+    assert claim_jobs(10) == []
+
+
+@pytest.mark.django_db
+def test_abandoned_job_reclaimed_after_visibility_timeout():
+    enqueue(record, "again")
+    [stale] = claim_jobs(1)
+    expired = timezone.now() + timedelta(seconds=VISIBILITY_TIMEOUT + 1)
+    [reclaimed] = claim_jobs(1, now=expired)
+    assert reclaimed.pk == stale.pk
+    assert reclaimed.attempts == 2
+    assert not finish_job(stale), (
+        "Обработчик с просроченным захватом не должен завершать задачу."
+    )
+    assert run_job(reclaimed)
+    assert CALLS == ["again"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_thread_pool_worker_drains_queue():
+    for value in range(6):
+        enqueue(record, value)
+    worker = Worker(concurrency=3, poll_interval=0.01)
+    worker.run(burst=True)
+    assert worker.succeeded == 6
+    assert sorted(CALLS) == [str(value) for value in range(6)]
+    assert not Job.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_interrupted_worker_finishes_running_jobs(monkeypatch):
+    enqueue(slow_record, "last")
+
+    def interrupt(self, running):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(Worker, "_idle", interrupt)
+    worker = Worker(concurrency=2)
+    worker.run()
+    assert worker.succeeded == 1
+    assert CALLS == ["last"]
+    assert not Job.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_runworker_command(capsys):
+    enqueue(record, "cmd")
+    call_command("runworker", "--burst", "--concurrency", "2")
+    assert CALLS == ["cmd"]
+    assert "Выполнено задач: 1" in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_password_reset_email_sent_from_job(client, user):
+    user.email = "reader@example.com"
+    user.save()
+    client.post("/auth/password_reset/", {"email": user.email})
+    assert mail.outbox == []
+    job = Job.objects.get(name="blog.tasks.send_password_reset_email")
+    assert job.args[0] == user.pk
+    assert not {"uid", "token", "user"} & set(job.args[3])
+    run_pending()
+    assert [message.to for message in mail.outbox] == [[user.email]]
+    token = re.search(
+        r"/auth/reset/[^/]+/([^/]+)/", mail.outbox[0].body
+    ).group(1)
+    assert token not in json.dumps([job.args, job.kwargs])
+    assert default_token_generator.check_token(user, token)
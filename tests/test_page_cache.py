@@ -0,0 +1,157 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from blog import caching
+from blog.locks import get_lock
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _get(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        content = client.get(url).content.decode("utf-8")
+    return content, len(queries)
+
+
+@pytest.fixture
+def page_urls(post_with_published_location):
+    post = post_with_published_location
+    return [
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ]
+
+
+def test_anonymous_pages_served_from_cache(unlogged_client, page_urls):
+    for url in page_urls:
+        _get(unlogged_client, url)
+        _, n_queries = _get(unlogged_client, url)
+        assert n_queries == 0, (
+            f"Повторный анонимный запрос {url} должен отдаваться из кэша."
+        )
+
+
+def test_logged_in_pages_not_cached(user_client, page_urls):
+    for url in page_urls:
+        _get(user_client, url)
+        _, n_queries = _get(user_client, url)
+        assert n_queries > 0
+
+
+def test_new_post_invalidates_pages(
+        mixer, unlogged_client, page_urls, post_with_published_location,
+        django_capture_on_commit_callbacks):
+    old = post_with_published_location
+    for url in page_urls:
+        _get(unlogged_client, url)
+    with django_capture_on_commit_callbacks(execute=True):
+        new = mixer.blend(
+            "blog.Post",
+            author=old.author,
+            category=old.category,
+            location=old.location,
+        )
+    for url in page_urls:
+        content, _ = _get(unlogged_client, url)
+        assert new.title in content, (
+            f"Убедитесь, что новая публикация видна на {url} сразу после "
+            "сохранения."
+        )
+
+
+def test_unrelated_scope_kept(
+        mixer, unlogged_client, page_urls, post_with_published_location,
+        another_category, django_capture_on_commit_callbacks):
+    category_url = page_urls[1]
+    _get(unlogged_client, category_url)
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend(
+            "blog.Post",
+            author=post_with_published_location.author,
+            category=another_category,
+        )
+    _, n_queries = _get(unlogged_client, category_url)
+    assert n_queries == 0
+
+
+def test_comment_invalidates_pages(
+        mixer, unlogged_client, page_urls, post_with_published_location,
+        django_capture_on_commit_callbacks):
+    for url in page_urls:
+        _get(unlogged_client, url)
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend("blog.Comment", post=post_with_published_location)
+    for url in page_urls:
+        content, _ = _get(unlogged_client, url)
+        assert "Комментарии (1)" in content
+
+
+def test_versions_of_unknown_pages_expire(unlogged_client, monkeypatch):
+    timeouts = {}
+    add = caching.cache.add
+
+    def record(key, value, timeout):
+        timeouts[key] = timeout
+        return add(key, value, timeout)
+
+    monkeypatch.setattr(caching.cache, "add", record)
+    assert unlogged_client.get("/category/no-such-slug/").status_code == 404
+    key = caching.VERSION_KEY.format(
+        kind=caching.GENERATION, pk=caching.category_scope("no-such-slug")
+    )
+    assert timeouts[key] == caching.VERSION_TIMEOUT
+
+
+def test_stale_page_served_without_validators(unlogged_client, page_urls):
+    url = page_urls[0]
+    first = unlogged_client.get(url)
+    caching.cache.set(
+        caching.VERSION_KEY.format(kind=caching.GENERATION, pk=caching.FEED),
+        caching.new_token(), None
+    )
+    key = caching.page_cache_key(RequestFactory().get(url))
+    lock = get_lock(key, caching.LOCK_TIMEOUT)
+    assert lock.acquire()
+    try:
+        stale = unlogged_client.get(url)
+    finally:
+        lock.release()
+    assert stale.content == first.content
+    assert not stale.has_header("ETag")
+    assert not stale.has_header("Last-Modified")
+    response = unlogged_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == HTTPStatus.OK
+    assert response["ETag"] != first["ETag"]
+
+
+def _delete_author(mixer, category, n_posts):
+    author = mixer.blend("auth.User")
+    mixer.cycle(n_posts).blend("blog.Post", author=author, category=category)
+    author = type(author).objects.get(pk=author.pk)
+    with CaptureQueriesContext(connection) as queries:
+        author.delete()
+    return len(queries)
+
+
+def test_author_deletion_queries_do_not_grow_with_posts(
+        mixer, published_category):
+    assert _delete_author(mixer, published_category, 1) == _delete_author(
+        mixer, published_category, 5
+    )
+
+
+def test_author_deletion_invalidates_pages(
+        unlogged_client, post_with_published_location,
+        django_capture_on_commit_callbacks):
+    post = post_with_published_location
+    content, _ = _get(unlogged_client, "/")
+    assert post.title in content
+    with django_capture_on_commit_callbacks(execute=True):
+        post.author.delete()
+    content, _ = _get(unlogged_client, "/")
+    assert post.title not in content
@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+
+from conftest import N_PER_PAGE
+
+
+def _walk(client, url, cursor_attr):
+    seen = []
+    cursor = None
+    while True:
+        response = client.get(url, {"cursor": cursor} if cursor else {})
+        assert response.status_code == HTTPStatus.OK
+        page = response.context["page_obj"]
+        seen.append([post.id for post in page])
+        cursor = getattr(page, cursor_attr)
+        if cursor is None:
+            return seen, page
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_walks_feed(
+        user_client, many_posts_with_published_locations):
+    posts = many_posts_with_published_locations
+    expected = [
+        post.id for post in sorted(
+            posts, key=lambda post: (post.pub_date, post.id), reverse=True
+        )
+    ]
+
+    pages, last_page = _walk(user_client, "/", "next_cursor")
+    assert [post_id for page in pages for post_id in page] == expected, (
+        "Убедитесь, что курсорная пагинация проходит ленту целиком, "
+        "без пропусков и повторов."
+    )
+    assert all(len(page) <= N_PER_PAGE for page in pages)
+
+    response = user_client.get(
+        "/", {"cursor": last_page.previous_cursor}
+    )
+    previous_page = [post.id for post in response.context["page_obj"]]
+    assert previous_page == pages[-2], (
+        "Убедитесь, что ссылка «Новее» возвращает предыдущую страницу."
+    )
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_rejects_garbage(user_client):
+    response = user_client.get("/", {"cursor": "not-a-cursor"})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url, params, expected", [
+    ("/", {"page": 1000}, "/"),
+    ("/", {"page": 2, "cursor": "x"}, "/"),
+    ("/search/", {"q": "ежик", "page": 3},
+     "/search/?q=%D0%B5%D0%B6%D0%B8%D0%BA"),
+])
+def test_page_number_redirects_to_first_cursor_page(
+        client, django_assert_num_queries, url, params, expected):
+    with django_assert_num_queries(0):
+        response = client.get(url, params)
+    assert response.status_code == HTTPStatus.MOVED_PERMANENTLY
+    assert response["Location"] == expected
+
+
+@pytest.mark.django_db
+def test_only_cursor_links_rendered(
+        user_client, many_posts_with_published_locations):
+    content = user_client.get("/").content.decode("utf-8")
+    assert "?cursor=" in content
+    assert "?page=" not in content
@@ -0,0 +1,124 @@
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import publication
+from blog.locks import get_lock
+from blog.models import Post
+from blog.publication import posts_published, publish_if_due
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def _index_ids(client):
+    return [post.id for post in client.get("/").context["page_obj"]]
+
+
+def test_scheduled_post_is_published_on_time(
+        scheduled_post, another_user_client):
+    assert not scheduled_post.is_visible
+    assert scheduled_post.id not in _index_ids(another_user_client)
+
+    received = []
+
+    def receiver(sender, **kwargs):
+        received.append(kwargs)
+
+    posts_published.connect(receiver)
+    try:
+        assert publish_if_due(timezone.now()) == 0
+        later = scheduled_post.pub_date + timedelta(seconds=1)
+        assert publish_if_due(later) == 1
+    finally:
+        posts_published.disconnect(receiver)
+
+    assert received and received[0]["post_ids"] == [scheduled_post.id], (
+        "Убедитесь, что при выходе отложенной публикации "
+        "отправляется событие инвалидации."
+    )
+    assert Post.objects.get(pk=scheduled_post.pk).is_visible
+    assert scheduled_post.id in _index_ids(another_user_client)
+
+
+def test_command_publishes_due_posts(scheduled_post):
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    call_command("publish_scheduled")
+    assert Post.objects.get(pk=scheduled_post.pk).is_visible
+
+
+def test_unpublishing_hides_post(post_with_published_location):
+    post = post_with_published_location
+    assert post.is_visible
+    post.is_published = False
+    post.save(update_fields=["is_published"])
+    assert not Post.objects.get(pk=post.pk).is_visible
+
+
+def test_nothing_scheduled_marker_expires(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        publication.cache, "set", lambda *args: calls.append(args)
+    )
+    publication.forget_next_publication()
+    assert publish_if_due() == 0
+    assert calls == [(
+        publication.NEXT_PUBLICATION_KEY,
+        publication.NOTHING_SCHEDULED,
+        publication.PUBLISH_POLL_INTERVAL,
+    )]
+
+
+def test_concurrent_requests_publish_once(monkeypatch):
+    calls = []
+
+    def publish_due_posts(now):
+        calls.append(now)
+        time.sleep(0.2)
+        return 1
+
+    monkeypatch.setattr(publication, "publish_due_posts", publish_due_posts)
+    publication.cache.set(
+        publication.NEXT_PUBLICATION_KEY,
+        timezone.now() - timedelta(seconds=1),
+    )
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(publish_if_due()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert sorted(results) == [0] * 7 + [1]
+
+
+def test_locked_publication_is_skipped(scheduled_post):
+    later = scheduled_post.pub_date + timedelta(seconds=1)
+    lock = get_lock(
+        publication.NEXT_PUBLICATION_KEY, publication.PUBLISH_LOCK_TIMEOUT
+    )
+    assert lock.acquire()
+    try:
+        assert publish_if_due(later) == 0
+    finally:
+        lock.release()
+    assert not Post.objects.get(pk=scheduled_post.pk).is_visible
+    assert publish_if_due(later) == 1
@@ -0,0 +1,122 @@
+from http import HTTPStatus
+
+import pytest
+from django.urls import get_resolver, reverse
+
+from blog.publication import publish_if_due
+from blogicum.query_budget import QUERY_BUDGETS
+
+pytestmark = [pytest.mark.django_db]
+
+SEED_SIZES = (2, 20)
+COMMENTS_PER_POST = 3
+
+
+def _seed(mixer, user, category, location, n):
+    posts = mixer.cycle(n).blend(
+        "blog.Post", author=user, category=category, location=location
+    )
+    for post in posts:
+        mixer.cycle(COMMENTS_PER_POST).blend(
+            "blog.Comment", post=post, author=user
+        )
+    publish_if_due()
+    return posts
+
+
+def _requests(user, post, comment):
+    post_kw = {"pk": post.id}
+    comment_kw = {"pk": post.id, "comment_id": comment.id}
+    return [
+        ("get", "blog:index", reverse("blog:index"), None),
+        ("get", "blog:category_posts", reverse(
+            "blog:category_posts", args=[post.category.slug]), None),
+        ("get", "blog:profile", reverse(
+            "blog:profile", args=[user.username]), None),
+        ("get", "blog:edit_profile", reverse(
+            "blog:edit_profile", args=[user.username]), None),
+        ("get", "blog:create_post", reverse("blog:create_post"), None),
+        ("get", "blog:post_detail", reverse(
+            "blog:post_detail", kwargs=post_kw), None),
+        ("get", "blog:comments", reverse(
+            "blog:comments", kwargs=post_kw), None),
+        ("get", "blog:edit_post", reverse(
+            "blog:edit_post", kwargs=post_kw), None),
+        ("get", "blog:delete_post", reverse(
+            "blog:delete_post", kwargs=post_kw), None),
+        ("post", "blog:add_comment", reverse(
+            "blog:add_comment", kwargs=post_kw), {"text": "Новый"}),
+        ("get", "blog:edit_comment", reverse(
+            "blog:edit_comment", kwargs=comment_kw), None),
+        ("post", "blog:edit_comment", reverse(
+            "blog:edit_comment", kwargs=comment_kw), {"text": "Правка"}),
+        ("get", "blog:delete_comment", reverse(
+            "blog:delete_comment", kwargs=comment_kw), None),
+        ("get", "blog:feed", reverse("blog:feed", args=["rss"]), None),
+        ("get", "blog:category_feed", reverse(
+            "blog:category_feed", args=[post.category.slug, "atom"]), None),
+        ("get", "blog:author_feed", reverse(
+            "blog:author_feed", args=[user.username, "rss"]), None),
+        ("get", "blog:search", reverse("blog:search"), {"q": post.title}),
+        ("get", "blog:api_posts", reverse("blog:api_posts"), None),
+        ("get", "blog:api_post", reverse(
+            "blog:api_post", kwargs=post_kw), None),
+        ("get", "blog:api_comments", reverse(
+            "blog:api_comments", kwargs=post_kw), None),
+        ("get", "blog:api_category_posts", reverse(
+            "blog:api_category_posts", args=[post.category.slug]), None),
+        ("get", "blog:sitemap_index", reverse("blog:sitemap_index"), None),
+        ("get", "blog:sitemap_shard", reverse(
+            "blog:sitemap_shard", args=["posts", 0]), None),
+        ("get", "pages:about", reverse("pages:about"), None),
+        ("get", "pages:rules", reverse("pages:rules"), None),
+    ]
+
+
+def _measure(client, requests):
+    counts = {}
+    for method, name, url, data in requests:
+        response = getattr(client, method)(url, data or {})
+        assert response.status_code in (HTTPStatus.OK, HTTPStatus.FOUND), (
+            f"{method.upper()} {url} вернул {response.status_code}"
+        )
+        counts[(method, name)] = int(response["X-Query-Count"])
+    return counts
+
+
+def test_every_view_has_a_budget():
+    resolver = get_resolver()
+    names = {
+        f"{namespace}:{name}"
+        for namespace in ("blog", "pages")
+        for name in resolver.namespace_dict[namespace][1].reverse_dict
+        if isinstance(name, str)
+    }
+    missing = names - set(QUERY_BUDGETS)
+    assert not missing, f"Нет бюджета запросов для {sorted(missing)}"
+
+
+@pytest.mark.parametrize("client_fixture", ["user_client", "unlogged_client"])
+def test_views_within_budget_independent_of_data_size(
+        request, client_fixture, mixer, user, published_category,
+        published_location, django_capture_on_commit_callbacks):
+    client = request.getfixturevalue(client_fixture)
+    measured = []
+    for n in SEED_SIZES:
+        with django_capture_on_commit_callbacks(execute=True):
+            posts = _seed(
+                mixer, user, published_category, published_location, n
+            )
+        post = posts[0]
+        requests = _requests(user, post, post.comment_set.first())
+        counts = _measure(client, requests)
+        for (method, name), count in counts.items():
+            assert count <= QUERY_BUDGETS[name], (
+                f"{method.upper()} {name}: {count} запросов при бюджете "
+                f"{QUERY_BUDGETS[name]} (N={n})"
+            )
+        measured.append(counts)
+    assert measured[0] == measured[-1], (
+        "Число запросов к страницам не должно зависеть от количества "
+        f"публикаций и комментариев: {measured}"
+    )
@@ -0,0 +1,55 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+FULL_SCAN = re.compile(r"^SCAN (?!.*\bUSING\b)")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE")
+
+
+def _query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _assert_indexed(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    for query in queries.captured_queries:
+        sql = query["sql"]
+        if not sql.startswith("SELECT") or "blog_" not in sql:
+            continue
+        plan = _query_plan(sql)
+        bad_steps = [
+            step for step in plan
+            if FULL_SCAN.search(step) or TEMP_SORT.search(step)
+        ]
+        assert not bad_steps, (
+            f"Запрос страницы {url} не использует индекс: {bad_steps}\n{sql}"
+        )
+
+
+@pytest.fixture
+def feed_urls(
+        user, mixer, published_category, many_posts_with_published_locations,
+        user_client):
+    post = many_posts_with_published_locations[0]
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    next_cursor = user_client.get("/").context["page_obj"].next_cursor
+    return [
+        "/",
+        f"/?cursor={next_cursor}",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+        f"/posts/{post.id}/",
+    ]
+
+
+def test_feed_queries_use_indexes(feed_urls, user_client, another_user_client):
+    for url in feed_urls:
+        _assert_indexed(user_client, url)
+        _assert_indexed(another_user_client, url)
@@ -0,0 +1,175 @@
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Comment, Post
+from blog.publication import forget_next_publication
+from blogicum.replicas import (STICKY_COOKIE, ReplicaRouter, RoutingState,
+                               replica_positions, routing_state,
+                               service_writes, sync_replica)
+
+REPLICA = "replica"
+
+
+@pytest.fixture
+def replica(transactional_db, tmp_path, settings):
+    """Реплика — отдельный файл SQLite, отстающий до следующей копии."""
+    connections.settings[REPLICA] = {
+        **connections.settings["default"],
+        "NAME": str(tmp_path / "replica.sqlite3"),
+        "TEST": {},
+    }
+    settings.DATABASE_REPLICAS = [REPLICA]
+    settings.REPLICA_POSITION_MARGIN = 0
+    cache.clear()
+    yield REPLICA
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.settings[REPLICA]
+    cache.clear()
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=None, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def aliases(response):
+    return {
+        part.split("=")[0]
+        for part in response["X-Query-Count-By-Alias"].split(", ")
+    }
+
+
+def test_fresh_replica_serves_pages(replica, post, another_user_client):
+    urls = (
+        reverse("blog:index"),
+        reverse("blog:category_posts", args=[post.category.slug]),
+        reverse("blog:profile", args=[post.author.username]),
+        reverse("blog:post_detail", args=[post.pk]),
+    )
+    # Первый просмотр заводит версии страниц в кэше; новая версия
+    # моложе реплики, и страница читается из основной базы.
+    for url in urls:
+        assert aliases(another_user_client.get(url)) == {"default"}, url
+    sync_replica(replica)
+    for url in urls:
+        response = another_user_client.get(url)
+        assert post.title in response.content.decode(), url
+        assert REPLICA in aliases(response), url
+
+
+def test_lagging_replica_is_skipped(replica, post, another_user_client):
+    sync_replica(replica)
+    post.title = "Только в основной базе"
+    post.save()
+    response = another_user_client.get(reverse("blog:index"))
+    assert "Только в основной базе" in response.content.decode()
+    assert REPLICA not in aliases(response)
+    sync_replica(replica)
+    response = another_user_client.get(reverse("blog:index"))
+    assert REPLICA in aliases(response)
+
+
+def test_writer_reads_primary_until_sticky_window_ends(
+        replica, post, user_client):
+    url = reverse("blog:post_detail", args=[post.pk])
+    Client().get(url)
+    response = user_client.post(
+        reverse("blog:add_comment", args=[post.pk]), {"text": "Свой"}
+    )
+    assert float(response.cookies[STICKY_COOKIE].value) > 0
+    sync_replica(replica)
+    # Без сигналов: удаление через ORM сменило бы версии страницы.
+    with connections[replica].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {Comment._meta.db_table}")
+    assert "Свой" not in Client().get(url).content.decode()
+    response = user_client.get(url)
+    assert "Свой" in response.content.decode()
+    assert aliases(response) == {"default"}
+    user_client.cookies[STICKY_COOKIE] = "0"
+    assert REPLICA in aliases(user_client.get(url))
+
+
+def test_write_pins_request_to_primary(replica):
+    state = RoutingState()
+    state.replica = REPLICA
+    token = routing_state.set(state)
+    try:
+        router = ReplicaRouter()
+        assert router.db_for_read(Post) == REPLICA
+        assert router.db_for_read(Session) is None
+        assert router.db_for_write(Post) == "default"
+        assert router.db_for_read(Post) is None
+    finally:
+        routing_state.reset(token)
+    assert not router.allow_migrate(REPLICA, "blog")
+
+
+def test_lagging_replica_keeps_user_logged_in(replica, post, user):
+    url = reverse("blog:index")
+    Client().get(url)
+    sync_replica(replica)
+    # Сессия появилась после копии и есть только в основной базе.
+    client = Client()
+    client.force_login(user)
+    response = client.get(url)
+    assert REPLICA in aliases(response)
+    assert response.context["user"] == user
+    assert SESSION_KEY in client.session
+    assert client.cookies["sessionid"].value
+
+
+@pytest.mark.parametrize("client_class", [Client, AsyncClient])
+def test_scheduled_publication_does_not_pin_reader(
+        replica, post, mixer, client_class):
+    scheduled = mixer.blend(
+        "blog.Post", author=post.author, category=post.category,
+        location=None, is_published=True,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    Post.objects.filter(pk=scheduled.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    forget_next_publication()
+    client = client_class()
+    get = async_to_sync(client.get) if client_class is AsyncClient else (
+        client.get
+    )
+    response = get(reverse("blog:index"))
+    assert Post.objects.filter(is_visible=False).count() == 0
+    assert STICKY_COOKIE not in response.cookies
+
+
+def test_service_writes_are_not_sticky(replica):
+    state = RoutingState()
+    state.replica = REPLICA
+    token = routing_state.set(state)
+    try:
+        router = ReplicaRouter()
+        with service_writes():
+            assert router.db_for_write(Post) == "default"
+            assert router.db_for_read(Post) is None
+        assert not state.wrote
+        assert router.db_for_read(Post) == REPLICA
+    finally:
+        routing_state.reset(token)
+
+
+def test_sync_replica_command(replica, post):
+    call_command("sync_replica")
+    assert replica_positions([replica])[replica] is not None
+    assert Post.objects.using(replica).filter(pk=post.pk).exists()
@@ -0,0 +1,132 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from blog.models import Comment
+from blog.search import SEARCH_TABLE, comments_indexed_after
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _results(client, query, **params):
+    response = client.get("/search/", {"q": query, **params})
+    assert response.status_code == HTTPStatus.OK
+    return response, list(response.context["page_obj"])
+
+
+def _index_size():
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {SEARCH_TABLE}")
+        return cursor.fetchone()[0]
+
+
+@pytest.fixture
+def search_posts(mixer, user, published_category, published_location):
+    def blend(**fields):
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            location=published_location, **fields
+        )
+
+    return {
+        "title": blend(title="Ежики в тумане", text="Про лес."),
+        "text": blend(title="Прогулка", text="Видели ежиков у реки."),
+        "hidden": blend(title="Ежики", text="Черновик", is_published=False),
+    }
+
+
+def test_ranked_by_relevance(client, search_posts):
+    _, posts = _results(client, "ежик")
+    assert posts == [search_posts["title"], search_posts["text"]]
+
+
+def test_highlight_is_escaped(client, mixer, user, published_category):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="<script>елка</script>", text="елка",
+    )
+    response, _ = _results(client, "елка")
+    content = response.content.decode("utf-8")
+    assert "&lt;script&gt;<mark>елка</mark>&lt;/script&gt;" in content
+    assert "<script>елка" not in content
+
+
+def test_comments_are_searchable(client, mixer, search_posts):
+    post = search_posts["text"]
+    indexed = _index_size()
+    comment = mixer.blend("blog.Comment", post=post, text="Чудесная выдра")
+    # Комментарий — своя строка индекса, соседние строки не пишутся.
+    assert _index_size() == indexed + 1
+    response, posts = _results(client, "выдра")
+    assert posts == [post]
+    assert "Чудесная <mark>выдра</mark>" in response.content.decode("utf-8")
+    comment.text = "Бобер"
+    comment.save()
+    assert _results(client, "выдра")[1] == []
+    comment.delete()
+    assert _results(client, "бобер")[1] == []
+
+
+def test_edited_and_deleted_posts(client, search_posts):
+    post = search_posts["title"]
+    post.title = "Белки"
+    post.save()
+    assert _results(client, "белки")[1] == [post]
+    post.delete()
+    assert _results(client, "белки")[1] == []
+
+
+def test_cursor_pagination(client, mixer, user, published_category):
+    posts = mixer.cycle(13).blend(
+        "blog.Post", author=user, category=published_category,
+        text="одинаковый текст",
+    )
+    response, first = _results(client, "одинаковый")
+    page = response.context["page_obj"]
+    assert len(first) == 10 and page.has_next()
+    _, second = _results(client, "одинаковый", cursor=page.next_cursor)
+    assert set(first + second) == set(posts)
+    assert client.get(
+        "/search/", {"q": "одинаковый", "cursor": "мусор"}
+    ).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize("query", ["", "  ", '"*( OR', "NEAR(a b)"])
+def test_odd_queries(client, search_posts, query):
+    _results(client, query)
+
+
+def test_rebuild_command(search_posts, mixer):
+    mixer.blend("blog.Comment", post=search_posts["text"])
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, title, text, comments, "
+            "post_id) VALUES (100000, 'устаревшая', '', '', 100000), "
+            "(-100000, '', '', 'устаревший', 1)"
+        )
+    call_command("rebuild_search_index", batch_size=2)
+    assert _index_size() == len(search_posts) + 1
+
+
+def test_bulk_load_indexes_only_its_comments(client, search_posts, mixer):
+    post = search_posts["text"]
+    untouched, changed = mixer.cycle(2).blend(
+        "blog.Comment", post=post, text="обычный"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {SEARCH_TABLE} SET comments = 'устаревший' "
+            "WHERE rowid = %s", [-untouched.pk]
+        )
+    with comments_indexed_after() as changed_ids:
+        mixer.blend("blog.Comment", post=post, text="барсуки")
+        Comment.objects.filter(pk=changed.pk).update(text="выдры")
+        changed_ids.add(changed.pk)
+    assert _results(client, "барсуки")[1] == [post]
+    assert _results(client, "выдры")[1] == [post]
+    # Строки комментариев вне блока не перестраиваются.
+    assert _results(client, "устаревший")[1] == [post]
+    assert _index_size() == len(search_posts) + 3
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from django.test import override_settings
+
+from blogicum.checks import check_production_settings
+from blogicum.query_budget import query_counting_enabled
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / "blogicum"
+
+
+def test_dev_settings_are_not_checked(settings):
+    assert settings.ENVIRONMENT == "dev"
+    assert check_production_settings() == []
+
+
+@override_settings(
+    ENVIRONMENT="prod",
+    DEBUG=True,
+    CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }},
+)
+def test_debug_components_under_prod_are_reported(settings):
+    ids = {warning.id for warning in check_production_settings()}
+    assert ids == {
+        "blogicum.W001", "blogicum.W002", "blogicum.W003", "blogicum.W004",
+        "blogicum.W005",
+    }
+
+
+@pytest.mark.parametrize("environment", ["prod", "staging"])
+def test_prod_settings(environment):
+    result = subprocess.run(
+        [sys.executable, "manage.py", "check"],
+        cwd=PROJECT_DIR,
+        env={**os.environ, "BLOGICUM_ENV": environment,
+             "DJANGO_SECRET_KEY": "test",
+             "DJANGO_SETTINGS_MODULE": "blogicum.settings"},
+        capture_output=True,
+        text=True,
+    )
+    if environment == "staging":
+        assert result.returncode != 0
+        assert "BLOGICUM_ENV" in result.stderr
+        return
+    assert result.returncode == 0, result.stderr
+    assert "blogicum.W" not in result.stdout + result.stderr
+
+
+def test_queries_counted_only_with_budget_middleware():
+    result = subprocess.run(
+        [sys.executable, "manage.py", "shell", "-c",
+         "from blogicum.query_budget import query_counting_enabled; "
+         "print(query_counting_enabled())"],
+        cwd=PROJECT_DIR,
+        env={**os.environ, "BLOGICUM_ENV": "prod",
+             "DJANGO_SECRET_KEY": "test",
+             "DJANGO_SETTINGS_MODULE": "blogicum.settings"},
+        capture_output=True,
+        text=True,
+    )
+    assert result.stdout.strip() == "False", result.stderr
+    assert query_counting_enabled()
@@ -0,0 +1,99 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+LOOKUP_SQL = r'^SELECT .* FROM "blog_{table}" .*WHERE .*"blog_{table}"."id" = '
+
+
+@pytest.fixture
+def own_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+
+
+def _lookups(client, method, url, data, table):
+    lookup = re.compile(LOOKUP_SQL.format(table=table))
+    with CaptureQueriesContext(connection) as queries:
+        response = getattr(client, method)(url, data or {})
+    return response, [
+        query["sql"] for query in queries if lookup.match(query["sql"])
+    ]
+
+
+@pytest.mark.parametrize(
+    "method, url, data, table",
+    [
+        ("get", "/posts/{post}/", None, "post"),
+        ("get", "/posts/{post}/comments/", None, "post"),
+        ("get", "/posts/{post}/edit/", None, "post"),
+        ("post", "/posts/{post}/edit/", "post_form", "post"),
+        ("get", "/posts/{post}/delete/", None, "post"),
+        ("post", "/posts/{post}/delete/", None, "post"),
+        ("get", "/posts/{post}/edit_comment/{comment}/", None, "comment"),
+        ("post", "/posts/{post}/edit_comment/{comment}/",
+         {"text": "Правка"}, "comment"),
+        ("get", "/posts/{post}/delete_comment/{comment}/", None, "comment"),
+        ("post", "/posts/{post}/delete_comment/{comment}/", None, "comment"),
+    ],
+)
+def test_author_paths_fetch_object_once(user_client, own_comment, method,
+                                        url, data, table):
+    post = own_comment.post
+    if data == "post_form":
+        data = {
+            "title": "Новый заголовок",
+            "text": post.text,
+            "category": post.category_id,
+            "location": post.location_id,
+        }
+    url = url.format(post=post.id, comment=own_comment.id)
+    response, lookups = _lookups(user_client, method, url, data, table)
+    assert response.status_code in (HTTPStatus.OK, HTTPStatus.FOUND)
+    assert len(lookups) == 1, (
+        f"{method.upper()} {url} должен загружать объект одним запросом, "
+        f"а выполнил {len(lookups)}:\n" + "\n".join(lookups)
+    )
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/posts/{post}/edit/",
+        "/posts/{post}/delete/",
+        "/posts/{post}/edit_comment/{comment}/",
+        "/posts/{post}/delete_comment/{comment}/",
+    ],
+)
+def test_not_author_redirected_after_single_lookup(another_user_client,
+                                                   own_comment, url):
+    url = url.format(post=own_comment.post_id, comment=own_comment.id)
+    table = "comment" if "comment" in url else "post"
+    response, lookups = _lookups(another_user_client, "post", url, {}, table)
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.url == f"/posts/{own_comment.post_id}/"
+    assert len(lookups) == 1
+
+
+def test_unpublished_post_hidden_from_others(another_user_client, user_client,
+                                             post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f"/posts/{post.id}/"
+    response, lookups = _lookups(another_user_client, "get", url, None, "post")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert len(lookups) == 1
+    assert user_client.get(url).status_code == HTTPStatus.OK
+
+
+def test_comment_of_another_post_not_found(user_client, mixer, own_comment,
+                                           published_category):
+    other = mixer.blend("blog.Post", category=published_category)
+    url = f"/posts/{other.id}/edit_comment/{own_comment.id}/"
+    assert user_client.get(url).status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,157 @@
+import gzip
+from http import HTTPStatus
+from xml.etree import ElementTree
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import sitemaps
+
+pytestmark = [pytest.mark.django_db]
+
+NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+def _locations(body):
+    root = ElementTree.fromstring(body)
+    return [loc.text for loc in root.iter(f"{NS}loc")]
+
+
+def _body(response):
+    body = b"".join(response.streaming_content)
+    if response.get("Content-Encoding") == "gzip":
+        return gzip.decompress(body)
+    return body
+
+
+@pytest.fixture
+def no_prebuilt(settings, tmp_path):
+    settings.SITEMAP_ROOT = tmp_path
+
+
+@pytest.fixture
+def sitemap_posts(mixer, user, published_category, published_location):
+    visible = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location,
+    )
+    hidden = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False,
+    )
+    return visible, hidden
+
+
+def test_index_lists_shards(client, no_prebuilt, sitemap_posts):
+    response = client.get("/sitemap.xml")
+    assert response.status_code == HTTPStatus.OK
+    assert "Content-Encoding" not in response
+    assert _locations(_body(response)) == [
+        "http://testserver/sitemap-posts-0.xml",
+        "http://testserver/sitemap-categories-0.xml",
+        "http://testserver/sitemap-profiles-0.xml",
+    ]
+
+
+def test_shards_list_visible_objects(client, no_prebuilt, sitemap_posts,
+                                     user, published_category):
+    visible, hidden = sitemap_posts
+    response = client.get("/sitemap-posts-0.xml", HTTP_ACCEPT_ENCODING="gzip")
+    assert response.streaming
+    assert response["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response["Vary"]
+    posts = _locations(_body(response))
+    assert f"http://testserver/posts/{visible.id}/" in posts
+    assert f"http://testserver/posts/{hidden.id}/" not in posts
+    categories = _locations(_body(client.get("/sitemap-categories-0.xml")))
+    assert f"http://testserver/category/{published_category.slug}/" in (
+        categories
+    )
+    profiles = _locations(_body(client.get("/sitemap-profiles-0.xml")))
+    assert f"http://testserver/profile/{user.username}/" in profiles
+
+
+def test_shard_is_id_range(client, no_prebuilt, monkeypatch, mixer, user,
+                           published_category):
+    monkeypatch.setattr(sitemaps, "SHARD_SIZE", 2)
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    with CaptureQueriesContext(connection) as queries:
+        body = _body(client.get("/sitemap-posts-1.xml"))
+    assert _locations(body) == [
+        f"http://testserver/posts/{post.id}/"
+        for post in posts if 2 < post.id <= 4
+    ]
+    ranged = [q["sql"] for q in queries if "blog_post" in q["sql"]
+              and "LIMIT" not in q["sql"] and "MAX" not in q["sql"]]
+    assert len(ranged) == 1 and '"id" > 2' in ranged[0]
+
+
+def test_unknown_shards_not_found(client, no_prebuilt, sitemap_posts):
+    assert client.get("/sitemap-tags-0.xml").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    assert client.get("/sitemap-posts-1.xml").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+def test_prebuilt_files_served(client, settings, tmp_path, sitemap_posts):
+    settings.SITEMAP_ROOT = tmp_path
+    call_command("build_sitemaps", "https://blogicum.example/")
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "sitemap-categories-0.xml.gz",
+        "sitemap-posts-0.xml.gz",
+        "sitemap-profiles-0.xml.gz",
+        "sitemap.xml.gz",
+    ]
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/sitemap.xml", HTTP_ACCEPT_ENCODING="gzip")
+    assert len(queries) == 0
+    assert response["Content-Encoding"] == "gzip"
+    assert _locations(_body(response))[0] == (
+        "https://blogicum.example/sitemap-posts-0.xml"
+    )
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", True),
+    ("deflate, gzip;q=0.5", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.0, deflate", False),
+    ("*", True),
+    ("*;q=0", False),
+    ("gzip;q=0, *", False),
+    ("", False),
+])
+def test_accepts_gzip_weights(header, expected):
+    assert sitemaps.accepts_gzip(header) is expected
+
+
+def test_refused_gzip_not_compressed(client, no_prebuilt, sitemap_posts):
+    response = client.get("/sitemap.xml", HTTP_ACCEPT_ENCODING="gzip;q=0")
+    assert "Content-Encoding" not in response
+    assert _locations(_body(response))
+
+
+def test_rebuild_removes_only_indexed_files(settings, tmp_path, monkeypatch,
+                                            mixer, user, published_category):
+    settings.SITEMAP_ROOT = tmp_path
+    monkeypatch.setattr(sitemaps, "SHARD_SIZE", 1)
+    posts = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        location=None,
+    )
+    foreign = tmp_path / "sitemap-archive.xml.gz"
+    foreign.write_bytes(b"")
+    call_command("build_sitemaps", "https://blogicum.example")
+    stale = tmp_path / f"sitemap-posts-{posts[1].pk - 1}.xml.gz"
+    assert stale.exists()
+    posts[1].delete()
+    call_command("build_sitemaps", "https://blogicum.example")
+    assert not stale.exists()
+    assert (tmp_path / f"sitemap-posts-{posts[0].pk - 1}.xml.gz").exists()
+    assert foreign.exists()
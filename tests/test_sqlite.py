@@ -0,0 +1,115 @@
+import sqlite3
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import override_settings
+
+from blogicum.sqlite import (SQLITE_DEFAULTS, current_pragmas,
+                             pragma_statements, write_transaction)
+
+FILE_ALIAS = "sqlite_file"
+
+
+@pytest.fixture
+def file_connection(db, tmp_path):
+    wrapper = DatabaseWrapper(
+        {**connection.settings_dict, "NAME": str(tmp_path / "db.sqlite3")},
+        alias="sqlite_file",
+    )
+    yield wrapper
+    wrapper.close()
+
+
+def test_pragmas_applied_to_new_connections(settings, file_connection):
+    file_connection.ensure_connection()
+    assert current_pragmas(file_connection, SQLITE_DEFAULTS) == {
+        "journal_mode": "wal",
+        "synchronous": 1,
+        "busy_timeout": settings.SQLITE_PRAGMAS["busy_timeout"],
+        "mmap_size": settings.SQLITE_PRAGMAS["mmap_size"],
+        "cache_size": settings.SQLITE_PRAGMAS["cache_size"],
+        "temp_store": 2,
+    }
+
+
+def test_sqlite_defaults(file_connection):
+    with override_settings(SQLITE_PRAGMAS=SQLITE_DEFAULTS,
+                           SQLITE_IMMEDIATE_TRANSACTIONS=False):
+        file_connection.ensure_connection()
+        pragmas = current_pragmas(file_connection, ["journal_mode"])
+        assert pragmas == {"journal_mode": "delete"}
+
+
+@pytest.fixture
+def file_alias(db, tmp_path):
+    connections.settings[FILE_ALIAS] = {
+        **connection.settings_dict, "NAME": str(tmp_path / "db.sqlite3"),
+    }
+    with connections[FILE_ALIAS].cursor() as cursor:
+        cursor.execute("CREATE TABLE item (value TEXT)")
+    yield FILE_ALIAS
+    connections[FILE_ALIAS].close()
+    del connections[FILE_ALIAS]
+    del connections.settings[FILE_ALIAS]
+
+
+def _can_write(path):
+    other = sqlite3.connect(path, timeout=0)
+    try:
+        other.execute("BEGIN IMMEDIATE")
+    except sqlite3.OperationalError as error:
+        assert "locked" in str(error)
+        return False
+    finally:
+        other.close()
+    return True
+
+
+def test_write_transaction_takes_write_lock_immediately(tmp_path,
+                                                        file_alias):
+    path = tmp_path / "db.sqlite3"
+    with write_transaction(using=file_alias):
+        assert not _can_write(path)
+    assert _can_write(path)
+
+
+def test_read_transactions_leave_write_lock_free(tmp_path, file_alias):
+    with transaction.atomic(using=file_alias):
+        with connections[file_alias].cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM item")
+        assert _can_write(tmp_path / "db.sqlite3")
+
+
+def test_write_transaction_commits_and_rolls_back(file_alias):
+    committed = []
+    with write_transaction(using=file_alias):
+        with write_transaction(using=file_alias):
+            connections[file_alias].cursor().execute(
+                "INSERT INTO item VALUES ('saved')"
+            )
+        transaction.on_commit(lambda: committed.append(1), using=file_alias)
+        assert not committed
+    with pytest.raises(RuntimeError):
+        with write_transaction(using=file_alias):
+            connections[file_alias].cursor().execute(
+                "INSERT INTO item VALUES ('lost')"
+            )
+            transaction.on_commit(
+                lambda: committed.append(2), using=file_alias
+            )
+            raise RuntimeError
+    assert committed == [1]
+    with connections[file_alias].cursor() as cursor:
+        cursor.execute("SELECT value FROM item")
+        assert cursor.fetchall() == [("saved",)]
+    assert connections[file_alias].get_autocommit()
+
+
+def test_pragma_values_are_validated():
+    assert pragma_statements({"cache_size": -2000}) == [
+        "PRAGMA cache_size = -2000"
+    ]
+    with pytest.raises(ImproperlyConfigured):
+        pragma_statements({"journal_mode": "wal; DROP TABLE blog_post"})
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from blog.caching import get_or_set_fresh
+from blog.locks import get_lock
+
+
+@pytest.fixture(params=["locmem", "filebased"])
+def lock_backend(request, tmp_path):
+    if request.param == "locmem":
+        return LocMemCache("stampede-tests", {})
+    return FileBasedCache(str(tmp_path), {})
+
+
+def test_lock_is_exclusive(lock_backend):
+    first = get_lock("page", timeout=30, cache=lock_backend)
+    second = get_lock("page", timeout=30, cache=lock_backend)
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+def test_expired_lock_is_taken_over(lock_backend):
+    stale = get_lock("page", timeout=0, cache=lock_backend)
+    assert stale.acquire()
+    time.sleep(1.1)
+    assert get_lock("page", timeout=0, cache=lock_backend).acquire()
+
+
+def test_concurrent_misses_regenerate_once():
+    key = "stampede:test:concurrent"
+    cache.delete(key)
+    calls = []
+
+    def producer():
+        calls.append(1)
+        time.sleep(0.2)
+        return "page"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(get_or_set_fresh(key, producer))
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["page"] * 8
+    assert len(calls) == 1
+
+
+def test_stale_copy_served_while_revalidating():
+    key = "stampede:test:stale"
+    cache.set(key, ("v1", time.time() - 1, "old page"))
+    lock = get_lock(key, timeout=30)
+    assert lock.acquire()
+    try:
+        value = get_or_set_fresh(key, lambda: "new page", version="v1")
+    finally:
+        lock.release()
+    assert value == "old page"
+    assert get_or_set_fresh(key, lambda: "new page", version="v1") == (
+        "new page"
+    )
+
+
+def test_version_change_makes_entry_stale():
+    key = "stampede:test:version"
+    get_or_set_fresh(key, lambda: "first", version="v1")
+    assert get_or_set_fresh(key, lambda: "second", version="v1") == "first"
+    assert get_or_set_fresh(key, lambda: "second", version="v2") == "second"
+
+
+def test_copy_of_other_version_passed_to_on_stale():
+    key = "stampede:test:on-stale"
+    cache.set(key, ("v1", time.time() + 60, "old page"))
+    lock = get_lock(key, timeout=30)
+    assert lock.acquire()
+    try:
+        value = get_or_set_fresh(
+            key, lambda: "new page", version="v2",
+            on_stale=lambda value: f"stale {value}",
+        )
+        fresh = get_or_set_fresh(
+            key, lambda: "new page", version="v1",
+            on_stale=lambda value: f"stale {value}",
+        )
+    finally:
+        lock.release()
+    assert value == "stale old page"
+    assert fresh == "old page"
@@ -0,0 +1,124 @@
+from io import BytesIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import Post
+from blog.thumbnails import THUMBNAIL_WIDTHS, thumbnail_name
+from jobs.queue import run_pending
+
+pytestmark = [pytest.mark.django_db]
+
+ORIGINAL_SIZE = (1000, 500)
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def _upload(name="photo.jpg", size=ORIGINAL_SIZE):
+    data = BytesIO()
+    Image.new("RGB", size, "red").save(data, "JPEG")
+    return SimpleUploadedFile(name, data.getvalue(), "image/jpeg")
+
+
+def _create(client, category, name="photo.jpg"):
+    client.post("/posts/create/", {
+        "title": "С фото",
+        "text": "Текст",
+        "pub_date": "2020-01-01T00:00",
+        "is_published": True,
+        "category": category.id,
+        "image": _upload(name),
+    })
+    run_pending()
+    return Post.objects.get(title="С фото")
+
+
+def _expected_widths(original_width):
+    return [width for width in THUMBNAIL_WIDTHS if width < original_width]
+
+
+def test_thumbnails_created_with_post(user_client, published_category,
+                                      media_root):
+    post = _create(user_client, published_category)
+    assert post.thumbnails == {
+        "width": ORIGINAL_SIZE[0],
+        "height": ORIGINAL_SIZE[1],
+        "widths": _expected_widths(ORIGINAL_SIZE[0]),
+    }
+    for width in _expected_widths(ORIGINAL_SIZE[0]):
+        for ext, image_format in (("webp", "WEBP"), ("jpg", "JPEG")):
+            path = media_root / thumbnail_name(post.image.name, width, ext)
+            with Image.open(path) as thumbnail:
+                assert thumbnail.format == image_format
+                assert thumbnail.size == (width, width // 2)
+
+
+def test_feed_emits_srcset_and_dimensions(user_client, published_category):
+    post = _create(user_client, published_category)
+    for url in ("/", f"/posts/{post.id}/"):
+        soup = BeautifulSoup(user_client.get(url).content, "html.parser")
+        img = soup.find("picture").find("img")
+        assert img["width"] == str(ORIGINAL_SIZE[0])
+        assert img["height"] == str(ORIGINAL_SIZE[1])
+        assert img["srcset"].endswith(f"{post.image.url} {ORIGINAL_SIZE[0]}w")
+        webp = soup.find("source", type="image/webp")
+        assert len(webp["srcset"].split(", ")) == len(
+            _expected_widths(ORIGINAL_SIZE[0])
+        )
+
+
+def test_replaced_image_drops_old_thumbnails(user_client, published_category,
+                                             media_root):
+    post = _create(user_client, published_category)
+    old_name = post.image.name
+    user_client.post(f"/posts/{post.id}/edit/", {
+        "title": post.title,
+        "text": post.text,
+        "category": published_category.id,
+        "image": _upload("other.jpg", (400, 400)),
+    })
+    run_pending()
+    post.refresh_from_db()
+    assert post.thumbnails["widths"] == [320]
+    assert not list(media_root.glob(thumbnail_name(old_name, "*", "*")))
+    assert (media_root / thumbnail_name(post.image.name, 320, "webp")).exists()
+    assert not (
+        media_root / thumbnail_name(post.image.name, 640, "webp")
+    ).exists()
+
+
+def test_command_backfills_missing_thumbnails(mixer, media_root,
+                                              published_category):
+    post = mixer.blend("blog.Post", category=published_category,
+                       image=_upload(), thumbnails={})
+    call_command("make_thumbnails")
+    post.refresh_from_db()
+    assert post.thumbnails["width"] == ORIGINAL_SIZE[0]
+    assert (media_root / thumbnail_name(post.image.name, 320, "jpg")).exists()
+
+
+def test_same_stem_images_keep_own_thumbnails(user_client, published_category,
+                                              media_root):
+    first = _create(user_client, published_category, "photo.jpg")
+    first.title = "Первая"
+    first.save()
+    second = _create(user_client, published_category, "photo.png")
+    assert thumbnail_name(first.image.name, 320, "webp") != thumbnail_name(
+        second.image.name, 320, "webp"
+    )
+    user_client.post(f"/posts/{first.id}/edit/", {
+        "title": first.title,
+        "text": first.text,
+        "category": published_category.id,
+        "image": _upload("other.jpg"),
+    })
+    run_pending()
+    kept = media_root / thumbnail_name(second.image.name, 320, "webp")
+    assert kept.exists()
@@ -0,0 +1,127 @@
+import threading
+
+import pytest
+from django.db.utils import ConnectionDoesNotExist
+from django.test import override_settings
+from django.urls import reverse
+
+from blog.forms import AddCommentForm
+from blog.models import Category, Comment
+from blogicum.write_queue import (WriteQueue, WriteTimeout, get_write_queue,
+                                  reset_write_stats, run_write, write_stats)
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_write_stats()
+
+
+def create_category(slug):
+    return Category.objects.create(title=slug, description="", slug=slug).pk
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def test_writes_are_grouped_into_batches():
+    writer = WriteQueue(batch_size=10, max_delay=0.2)
+    futures = [writer.submit(create_category, f"c{index}")
+               for index in range(5)]
+    ids = [future.result(timeout=5) for future in futures]
+    assert sorted(
+        Category.objects.values_list("pk", flat=True)
+    ) == sorted(ids)
+    stats = write_stats()
+    assert stats["writes"] == 5
+    assert stats["batches"] < 5
+
+
+def test_failed_write_rolls_back_only_itself():
+    writer = WriteQueue(batch_size=10, max_delay=0.2)
+    first = writer.submit(create_category, "first")
+    failed = writer.submit(fail, "ошибка")
+    last = writer.submit(create_category, "last")
+    with pytest.raises(ValueError, match="ошибка"):
+        failed.result(timeout=5)
+    assert first.result(timeout=5) and last.result(timeout=5)
+    assert Category.objects.count() == 2
+    assert write_stats()["failures"] == 1
+
+
+def test_failed_batch_resolves_every_write():
+    writer = WriteQueue(using="missing", batch_size=10, max_delay=0.2)
+    futures = [writer.submit(create_category, f"c{index}")
+               for index in range(3)]
+    for future in futures:
+        with pytest.raises(ConnectionDoesNotExist):
+            future.result(timeout=5)
+
+
+@override_settings(WRITE_QUEUE_ENABLED=True, WRITE_QUEUE_TIMEOUT=0.1)
+def test_timed_out_write_is_cancelled():
+    release = threading.Event()
+    blocking = get_write_queue().submit(release.wait, 5)
+    try:
+        with pytest.raises(WriteTimeout):
+            run_write(create_category, "late")
+    finally:
+        release.set()
+    assert blocking.result(timeout=5) is True
+    assert get_write_queue().submit(Category.objects.count).result(5) == 0
+    assert write_stats()["timeouts"] == 1
+
+
+@override_settings(WRITE_QUEUE_ENABLED=True)
+def test_comment_is_saved_through_queue(user_client,
+                                        post_with_published_location):
+    post = post_with_published_location
+    response = user_client.post(
+        reverse("blog:add_comment", args=[post.pk]), {"text": "Через очередь"}
+    )
+    assert response.status_code == 302
+    assert Comment.objects.filter(post=post, text="Через очередь").exists()
+    assert write_stats()["writes"] == 1
+
+
+@override_settings(WRITE_QUEUE_ENABLED=True)
+def test_only_save_runs_in_writer_thread(monkeypatch, user_client,
+                                         post_with_published_location):
+    threads = {}
+    clean, save = AddCommentForm.clean, AddCommentForm.save
+
+    def record(name, method):
+        def wrapper(form, *args, **kwargs):
+            threads[name] = threading.current_thread().name
+            return method(form, *args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(AddCommentForm, "clean", record("clean", clean))
+    monkeypatch.setattr(AddCommentForm, "save", record("save", save))
+    url = reverse("blog:add_comment", args=[post_with_published_location.pk])
+    assert user_client.post(url, {"text": ""}).status_code == 200
+    assert write_stats()["writes"] == 0
+    assert user_client.post(url, {"text": "Текст"}).status_code == 302
+    assert threads["clean"] == threading.current_thread().name
+    assert threads["save"].startswith("write-queue-")
+
+
+@override_settings(WRITE_QUEUE_ENABLED=True)
+def test_admin_list_editable_saved_through_queue(
+        admin_client, post_with_published_location):
+    post = post_with_published_location
+    response = admin_client.post(reverse("admin:blog_post_changelist"), {
+        "form-TOTAL_FORMS": "1",
+        "form-INITIAL_FORMS": "1",
+        "form-0-id": str(post.pk),
+        "form-0-is_published": "",
+        "form-0-pub_date_0": post.pub_date.strftime("%d.%m.%Y"),
+        "form-0-pub_date_1": post.pub_date.strftime("%H:%M:%S"),
+        "_save": "Сохранить",
+    })
+    assert response.status_code == 302
+    post.refresh_from_db()
+    assert not post.is_published
+    assert write_stats()["writes"] == 1